@@ -2,6 +2,8 @@
 Configuration module for SecureLocker application
 """
 
+import os
+
 class AppConfig:
     """Configuration class containing app settings"""
     
@@ -29,6 +31,104 @@ class AppConfig:
         
         # Default QR code settings
         self.default_expiry_days = 7
+        # QR code version and error correction: 'auto' uses the smallest
+        # symbol that met the target read rate for the payload format (measured
+        # with main.py --tune-qr-policy), None always uses level H
+        self.qr_policy = 'auto'
+        self.qr_policy_path = os.path.join(
+            os.path.expanduser('~'), '.securelocker', 'qr_policy.json'
+        )
+        self.qr_policy_target_read_rate = 0.95
+        self.qr_policy_samples = 20  # Frames per degraded condition
         
         # Security settings
-        self.qr_code_length = 8  # Length of generated QR code IDs
\ No newline at end of file
+        self.qr_code_length = 8  # Length of generated QR code IDs
+        
+        # QR payload format for new codes: 'token' (compact, signed) or 'json'.
+        # Both formats are accepted by the scanner.
+        self.qr_payload_format = 'token'
+        # Token signing key file (SECURELOCKER_QR_KEY overrides it)
+        self.qr_token_key_path = os.path.join(
+            os.path.expanduser('~'), '.securelocker', 'qr_token.key'
+        )
+        
+        # Issued codes, for single use and revocation
+        self.credential_db_path = os.path.join(
+            os.path.expanduser('~'), '.securelocker', 'credentials.db'
+        )
+        # Accept valid codes that are not in the store (issued before it
+        # existed). They are recorded as redeemed, so they still work only once.
+        # On while such codes are still in circulation; set to False once they
+        # have all expired, to refuse every code the store does not know.
+        self.credential_allow_unregistered = True
+        
+        # In-memory revocation filter in front of the credential store
+        self.revocation_filter_capacity = 10000
+        self.revocation_filter_max_capacity = 1000000
+        self.revocation_filter_fp_rate = 0.01
+        # Most recent revocations kept exactly
+        self.revocation_exact_size = 4096
+        
+        # Expired code purging (seconds between passes, codes per batch,
+        # seconds one batch may take)
+        self.expiry_purge_interval = 60
+        self.expiry_batch_size = 500
+        self.expiry_batch_budget = 0.02
+        # Seconds between reads of codes changed by other processes
+        self.credential_sync_interval = 5
+        
+        # Scanner settings
+        # Camera ID, video file or image directory (None = camera 0), or a list
+        # of them to scan with several cameras at once (the first is previewed)
+        self.scanner_source = None
+        self.scanner_source_realtime = True  # Replay recorded sources at their frame rate
+        self.scanner_source_loop = True  # Restart recorded sources when they end
+        
+        # Camera capture profile: a name from CAPTURE_PROFILES, 'auto' to probe
+        # once for the lowest-latency profile, or None for driver defaults
+        self.scanner_capture_profile = 'hd_mjpeg'
+        self.capture_profile_cache_path = os.path.join(
+            os.path.expanduser('~'), '.securelocker', 'capture_profile.json'
+        )
+        self.scanner_pipeline = True  # Capture and decode on separate threads
+        self.scanner_decode_workers = 1  # Decode threads used in pipeline mode
+        self.scanner_pool_workers = 2  # Decode threads shared by all cameras when there are several
+        self.scanner_pyramid_scales = (0.5, 1.0)  # Grayscale levels tried in order
+        self.scanner_roi_padding = 0.5  # Padding around the last detection
+        self.scanner_roi_full_scan_interval = 10  # Region scans between full scans
+        
+        # Decoder backend: 'auto' calibrates once per machine, or 'pyzbar'/'opencv'
+        self.scanner_decoder = 'auto'
+        self.scanner_decoder_min_success_rate = 0.9
+        self.decoder_cache_path = os.path.join(
+            os.path.expanduser('~'), '.securelocker', 'decoder_calibration.json'
+        )
+        
+        # Decode in worker processes fed through a shared-memory frame ring,
+        # so decoding does not compete with the UI for the GIL (Python 3.8+)
+        self.scanner_decode_processes = 0  # Worker processes (0 = decode in-process)
+        
+        # Detection confirmation settings
+        self.scanner_confirm_frames = 2  # Frames a code must be read in...
+        self.scanner_confirm_window = 3  # ...out of this many decoded frames
+        self.scanner_dedup_seconds = 3.0  # Ignore the same code again within this time
+        
+        # Frame gate settings (skip unchanged or blurry frames before decoding)
+        self.scanner_gate_enabled = True
+        self.scanner_gate_diff_threshold = 4.0  # Mean thumbnail difference
+        self.scanner_gate_sharpness_threshold = 60.0  # Laplacian variance
+        
+        # Idle mode settings (low frame rate and no decoding while nothing moves)
+        self.scanner_idle_enabled = True
+        self.scanner_idle_timeout = 30.0  # Seconds without motion before going idle
+        self.scanner_idle_fps = 2  # Frame rate while idle
+        self.scanner_motion_threshold = 3.0  # Mean thumbnail difference that wakes up
+        
+        # Camera session settings: keep the camera open between scans so it
+        # does not have to open and settle its exposure every time
+        self.camera_keep_open = True
+        self.camera_preopen = True  # Open the camera while the home screen is shown
+        self.camera_keep_alive_fps = 2  # Frames read per second while no scan runs
+        
+        # Camera preview settings
+        self.preview_fps = 30  # Refresh rate of the camera preview
\ No newline at end of file
@@ -3,6 +3,7 @@ Main controller for the SecureLocker application.
 Manages screens and user interface flow.
 """
 
+import threading
 import tkinter as tk
 from tkinter import ttk
 
@@ -12,6 +13,15 @@ from app.ui.screens.package_screen import PackageScreen
 from app.ui.screens.demo_screen import DemoScreen
 from app.ui.screens.door_open_screen import DoorOpenScreen
 from app.ui.screens.error_screen import ErrorScreen
+from app.utils.qr_decoders import create_decoder, select_decoder
+from app.utils.process_decoder import ProcessDecoder
+from app.utils.frame_sources import create_frame_source
+from app.utils.camera_session import CameraSession
+from app.utils.qr_token import QRTokenCodec, load_token_key
+from app.utils.credential_store import CredentialStore
+from app.utils.revocation_filter import RevocationFilter
+from app.utils.expiry_scheduler import ExpiryScheduler
+from app.utils.id_allocator import IDAllocator
 
 class AppController:
     """Main application controller class"""
@@ -27,6 +37,47 @@ class AppController:
         self.config = config
         self.current_screen = None
         
+        # Pick the QR decoder backend for this machine
+        self.qr_decoder = self._create_qr_decoder()
+        
+        # Signs new QR tokens and verifies scanned ones
+        self.qr_token_codec = QRTokenCodec(load_token_key(self.config.qr_token_key_path))
+        
+        # Issued codes
+        self.credential_store = CredentialStore(self.config.credential_db_path)
+        
+        # Answers "not revoked" without a store lookup, kept up to date by the
+        # store, including revocations made by other processes
+        self.revocation_filter = RevocationFilter(
+            capacity=self.config.revocation_filter_capacity,
+            fp_rate=self.config.revocation_filter_fp_rate,
+            max_capacity=self.config.revocation_filter_max_capacity,
+            exact_size=self.config.revocation_exact_size,
+            source=self.credential_store.revoked_ids
+        )
+        self.revocation_filter.load()
+        self.credential_store.add_revoke_listener(self.revocation_filter.add)
+        self.credential_store.add_sync_listener(self.revocation_filter.add_changes)
+        
+        # Live counts per door, and purging of expired codes in the background
+        self.expiry_scheduler = ExpiryScheduler(
+            self.credential_store,
+            interval=self.config.expiry_purge_interval,
+            batch_size=self.config.expiry_batch_size,
+            batch_budget=self.config.expiry_batch_budget,
+            sync_interval=self.config.credential_sync_interval
+        )
+        self.expiry_scheduler.start()
+        
+        # New QR code IDs, never one already in the store
+        self.id_allocator = IDAllocator(
+            reserved=(qr_id for qr_id, _, _, _ in self.credential_store.codes())
+        )
+        
+        # Scanner frame sources, live cameras kept open between scans
+        self.camera_sources = self._create_camera_sources()
+        self._preopen_thread = None
+        
         # Create styles for the application
         self._setup_styles()
         
@@ -43,9 +94,97 @@ class AppController:
             'error': ErrorScreen(self.content_container, self)
         }
         
+        # Release the cameras and decoder processes when the window closes
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        
         # Start with home screen
         self.show_screen('home')
     
+    def _create_qr_decoder(self):
+        """Create the QR decoder backend used by the scanner
+        
+        Returns:
+            QRDecoder: Configured decoder, or the calibrated fastest one,
+                       run in worker processes if configured
+        """
+        if self.config.scanner_decoder != 'auto':
+            decoder = create_decoder(self.config.scanner_decoder)
+        else:
+            decoder = select_decoder(
+                cache_path=self.config.decoder_cache_path,
+                min_success_rate=self.config.scanner_decoder_min_success_rate
+            )
+        
+        if self.config.scanner_decode_processes and ProcessDecoder.is_available():
+            decoder = ProcessDecoder(decoder.name, processes=self.config.scanner_decode_processes)
+            decoder.start()
+        
+        return decoder
+    
+    def _create_camera_sources(self):
+        """Create the frame sources of the configured scanner cameras
+        
+        Returns:
+            list: Frame sources, primary camera first
+        """
+        specs = self.config.scanner_source
+        if not isinstance(specs, (list, tuple)):
+            specs = [specs]
+        
+        sources = []
+        for spec in specs:
+            # Camera, recorded video or image directory
+            source = create_frame_source(
+                spec,
+                realtime=self.config.scanner_source_realtime,
+                loop=self.config.scanner_source_loop,
+                capture_profile=self.config.scanner_capture_profile,
+                profile_cache_path=self.config.capture_profile_cache_path
+            )
+            if source.live and self.config.camera_keep_open:
+                source = CameraSession(source, keep_alive_fps=self.config.camera_keep_alive_fps)
+            sources.append(source)
+        
+        return sources
+    
+    def preopen_cameras(self):
+        """Open the camera sessions in the background so scanning starts warm"""
+        sessions = [
+            source for source in self.camera_sources
+            if isinstance(source, CameraSession) and not source.is_open
+        ]
+        if not sessions:
+            return
+        if self._preopen_thread is not None and self._preopen_thread.is_alive():
+            return
+        
+        def preopen():
+            for session in sessions:
+                session.preopen()
+        
+        self._preopen_thread = threading.Thread(target=preopen, daemon=True)
+        self._preopen_thread.start()
+    
+    def close(self):
+        """Stop scanning, release the cameras and close the window"""
+        if self.current_screen:
+            self.current_screen.hide()
+            self.current_screen = None
+        
+        for source in self.camera_sources:
+            if isinstance(source, CameraSession):
+                source.close()
+            else:
+                source.release()
+        
+        if isinstance(self.qr_decoder, ProcessDecoder):
+            self.qr_decoder.close()
+        
+        self.expiry_scheduler.stop()
+        self.credential_store.close()
+        
+        self.root.destroy()
+    
     def _setup_styles(self):
         """Set up TTK styles for the application"""
         self.style = ttk.Style()
@@ -0,0 +1,130 @@
+"""
+Main-thread camera frame presenter for SecureLocker application
+"""
+
+import threading
+import time
+from collections import deque
+
+class FramePresenter:
+    """Shows camera frames on the Tk main thread at a fixed refresh rate
+    
+    Background threads hand frames over with submit(); only the newest one is
+    kept. A timer scheduled with after() on the main thread displays it, so
+    the display rate does not depend on how fast frames are captured or
+    decoded, and Tk is only touched from the main thread.
+    """
+    
+    def __init__(self, widget, renderer, fps=30):
+        """Initialize the frame presenter
+        
+        Args:
+            widget (tk.Widget): Widget used to schedule the refresh timer
+            renderer (PreviewRenderer): Renderer that displays a frame
+            fps (float, optional): Target refresh rate. Defaults to 30.
+        """
+        self.widget = widget
+        self.renderer = renderer
+        self.interval = 1.0 / fps
+        
+        self._lock = threading.Lock()
+        self._frame = None
+        self._after_id = None
+        self._next_due = None
+        self._ticks = deque(maxlen=120)
+        self.reset_stats()
+    
+    @property
+    def running(self):
+        """bool: True while the refresh timer is scheduled"""
+        return self._after_id is not None
+    
+    def reset_stats(self):
+        """Clear the presenter statistics"""
+        with self._lock:
+            self._submitted = 0
+            self._displayed = 0
+            self._skipped = 0
+            self._ticks.clear()
+    
+    def submit(self, frame):
+        """Hand over a new frame; safe to call from any thread
+        
+        Args:
+            frame (numpy.ndarray): BGR camera frame
+        """
+        with self._lock:
+            # The previous frame was never shown
+            if self._frame is not None:
+                self._skipped += 1
+            self._frame = frame
+            self._submitted += 1
+    
+    def start(self):
+        """Start the refresh timer (main thread only)"""
+        if self._after_id is None:
+            self._next_due = time.monotonic()
+            self._after_id = self.widget.after(0, self._tick)
+    
+    def stop(self):
+        """Stop the refresh timer and drop any pending frame (main thread only)"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        
+        with self._lock:
+            self._frame = None
+    
+    def get_stats(self):
+        """Get display statistics
+        
+        Returns:
+            dict: Frames submitted, displayed and skipped, plus the achieved
+                  refresh rate and timer jitter in milliseconds
+        """
+        with self._lock:
+            ticks = list(self._ticks)
+            stats = {
+                'submitted': self._submitted,
+                'displayed': self._displayed,
+                'skipped': self._skipped,
+                'target_fps': round(1.0 / self.interval, 2),
+                'achieved_fps': 0.0,
+                'jitter_ms': 0.0
+            }
+        
+        if len(ticks) > 1:
+            intervals = [b - a for a, b in zip(ticks, ticks[1:])]
+            mean = sum(intervals) / len(intervals)
+            variance = sum((value - mean) ** 2 for value in intervals) / len(intervals)
+            stats['achieved_fps'] = round(1.0 / mean, 2) if mean else 0.0
+            stats['jitter_ms'] = round(variance ** 0.5 * 1000, 2)
+        
+        return stats
+    
+    def _tick(self):
+        """Timer callback: display the newest frame and schedule the next tick"""
+        now = time.monotonic()
+        
+        # Schedule against a fixed timeline so delays do not accumulate
+        self._next_due += self.interval
+        if self._next_due < now:
+            self._next_due = now + self.interval
+        delay = max(1, int((self._next_due - now) * 1000))
+        self._after_id = self.widget.after(delay, self._tick)
+        
+        with self._lock:
+            frame, self._frame = self._frame, None
+        
+        if frame is None:
+            return
+        
+        try:
+            self.renderer.render(frame)
+        except Exception:
+            # The widget may have been destroyed; skip this frame
+            return
+        
+        with self._lock:
+            self._displayed += 1
+            self._ticks.append(now)
\ No newline at end of file
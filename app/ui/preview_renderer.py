@@ -0,0 +1,137 @@
+"""
+Camera preview rendering for SecureLocker application
+"""
+
+import time
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+class PreviewRenderer:
+    """Renders camera frames into a Tk label with as few copies as possible
+    
+    Each frame is scaled down once to the label's size while still in the
+    camera's BGR order, so the colour conversion only touches pixels that are
+    displayed. The scaled and converted pixels go into buffers that are reused
+    between frames, and a single PhotoImage is updated in place with paste()
+    instead of creating a new Tk image per frame.
+    """
+    
+    def __init__(self, label):
+        """Initialize the preview renderer
+        
+        Args:
+            label (tk.Label): Label that displays the preview
+        """
+        self.label = label
+        self._photo = None
+        self._small = None
+        self._rgb = None
+        self._image = None
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Clear the rendering statistics"""
+        self._frames = 0
+        self._cpu_time = 0.0
+        self._allocated_bytes = 0
+        self._allocations = 0
+        self._photos_created = 0
+    
+    def get_stats(self):
+        """Get rendering statistics
+        
+        Returns:
+            dict: Frames rendered, CPU time and buffer allocations per frame
+        """
+        frames = max(1, self._frames)
+        return {
+            'frames': self._frames,
+            'cpu_ms_per_frame': round(self._cpu_time * 1000 / frames, 3),
+            'allocations_per_frame': round(self._allocations / frames, 3),
+            'bytes_allocated_per_frame': round(self._allocated_bytes / frames, 1),
+            'photo_images_created': self._photos_created
+        }
+    
+    def _target_size(self, frame_width, frame_height):
+        """Get the display size that fits the frame into the label
+        
+        Args:
+            frame_width (int): Frame width
+            frame_height (int): Frame height
+        
+        Returns:
+            tuple: (width, height) of the displayed image
+        """
+        # Inner size of the label, so the image never makes the label grow
+        inset = 2 * (int(self.label.cget('bd')) + int(self.label.cget('highlightthickness'))
+                     + int(self.label.cget('padx')))
+        width = self.label.winfo_width() - inset
+        height = self.label.winfo_height() - inset
+        
+        # Label not laid out yet
+        if width <= 1 or height <= 1:
+            return frame_width, frame_height
+        
+        scale = min(width / frame_width, height / frame_height)
+        return max(1, int(frame_width * scale)), max(1, int(frame_height * scale))
+    
+    def _buffer(self, current, shape):
+        """Reuse a pixel buffer, allocating a new one only when the shape changes
+        
+        Args:
+            current (numpy.ndarray): Current buffer (or None)
+            shape (tuple): Required shape
+        
+        Returns:
+            numpy.ndarray: Buffer with the required shape
+        """
+        if current is not None and current.shape == shape:
+            return current
+        
+        buffer = np.empty(shape, np.uint8)
+        self._allocations += 1
+        self._allocated_bytes += buffer.nbytes
+        return buffer
+    
+    def render(self, frame, bgr=True):
+        """Display a frame in the label
+        
+        Args:
+            frame (numpy.ndarray): Camera frame
+            bgr (bool, optional): Frame is in OpenCV BGR order. Defaults to True.
+        """
+        start = time.thread_time()
+        
+        frame_height, frame_width = frame.shape[:2]
+        width, height = self._target_size(frame_width, frame_height)
+        
+        # Scale first, so colour conversion only runs on displayed pixels
+        if (width, height) != (frame_width, frame_height):
+            self._small = self._buffer(self._small, (height, width, 3))
+            interpolation = cv2.INTER_AREA if width < frame_width else cv2.INTER_LINEAR
+            cv2.resize(frame, (width, height), dst=self._small, interpolation=interpolation)
+            small = self._small
+        else:
+            small = frame
+        
+        if bgr:
+            self._rgb = self._buffer(self._rgb, (height, width, 3))
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            rgb = self._rgb
+        else:
+            rgb = np.ascontiguousarray(small)
+        
+        # Wrap the pixels without copying them
+        self._image = Image.frombuffer('RGB', (width, height), rgb, 'raw', 'RGB', 0, 1)
+        
+        if self._photo is None or (self._photo.width(), self._photo.height()) != (width, height):
+            self._photo = ImageTk.PhotoImage(image=self._image)
+            self._photos_created += 1
+            self.label.configure(image=self._photo)
+            self.label.imgtk = self._photo  # Keep a reference
+        else:
+            self._photo.paste(self._image)
+        
+        self._cpu_time += time.thread_time() - start
+        self._frames += 1
\ No newline at end of file
@@ -16,6 +16,7 @@ from PIL import Image, ImageTk
 
 from app.ui.screens.base_screen import BaseScreen
 from app.utils.qr_generator import QRGenerator
+from app.utils.qr_policy import configured_qr_policy
 
 class AdminScreen(BaseScreen):
     """Admin screen for QR code generation"""
@@ -39,7 +40,26 @@ class AdminScreen(BaseScreen):
         
         # Store QR data
         self.current_qr_data = None
-        self.qr_generator = QRGenerator()
+        token_codec = None
+        if self.config.qr_payload_format == 'token':
+            token_codec = self.controller.qr_token_codec
+        self.qr_generator = QRGenerator(
+            token_codec=token_codec,
+            id_allocator=self.controller.id_allocator,
+            policy=configured_qr_policy(self.config)
+        )
+    
+    def show(self, *args, **kwargs):
+        """Show the admin screen with up-to-date live code counts"""
+        super().show(*args, **kwargs)
+        self._update_live_counts()
+    
+    def _update_live_counts(self):
+        """Show the number of live codes of every door"""
+        # Kept in memory by the expiry scheduler, no store query
+        counts = self.controller.expiry_scheduler.live_counts()
+        text = "   ".join(f"Door {door_id}: {counts.get(door_id, 0)}" for door_id in self.door_ids)
+        self.live_counts_label.configure(text=f"Active codes\n{text}")
     
     def _create_form_panel(self, parent):
         """Create the QR code generation form panel
@@ -74,11 +94,12 @@ class AdminScreen(BaseScreen):
         door_label.pack(anchor=tk.W, pady=(0, 5))
         
         self.door_var = tk.StringVar()
+        self.door_ids = ["1", "2", "3", "4"]
         door_select = ttk.Combobox(
             form_fields, 
             textvariable=self.door_var,
             state="readonly",
-            values=["1", "2", "3", "4"]
+            values=self.door_ids
         )
         door_select.pack(fill=tk.X, pady=(0, 15))
         
@@ -107,6 +128,16 @@ class AdminScreen(BaseScreen):
         )
         help_text.pack(anchor=tk.W, pady=(0, 15))
         
+        # Live codes per door
+        self.live_counts_label = tk.Label(
+            form_fields,
+            text="",
+            font=("Helvetica", 9),
+            fg=self.config.gray,
+            justify=tk.LEFT
+        )
+        self.live_counts_label.pack(anchor=tk.W, pady=(0, 15))
+        
         # Generate button
         generate_btn = tk.Button(
             form_fields,
@@ -228,15 +259,13 @@ class AdminScreen(BaseScreen):
             # Validate date format
             datetime.strptime(expiry_date, '%Y-%m-%d')
             
-            # Generate QR code using QRGenerator
-            self.current_qr_data = self.qr_generator.generate_qr_data(door_id, expiry_date)
+            # Generate QR code using QRGenerator and register it
+            self.current_qr_data = self._issue_qr_data(door_id, expiry_date)
             qr_id = self.current_qr_data['id']
+            self._update_live_counts()
             
-            # Generate QR code image
-            qr_image = self.qr_generator.generate_qr_image(self.current_qr_data)
-            
-            # Resize for display
-            qr_image = qr_image.resize((250, 250))
+            # Generate QR code image, rendered at the display size
+            qr_image = self.qr_generator.generate_qr_image(self.current_qr_data, size=250)
             self.qr_photoimage = ImageTk.PhotoImage(qr_image)
             
             # Update QR display
@@ -253,6 +282,29 @@ class AdminScreen(BaseScreen):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate QR code: {str(e)}")
     
+    def _issue_qr_data(self, door_id, expiry_date, attempts=5):
+        """Generate QR code data and record it in the credential store
+        
+        Args:
+            door_id (str): Door ID for the locker
+            expiry_date (str): Expiry date in YYYY-MM-DD format
+            attempts (int, optional): IDs tried if one is already taken
+        
+        Returns:
+            dict: QR code data
+        """
+        for attempt in range(attempts):
+            qr_data = self.qr_generator.generate_qr_data(door_id, expiry_date)
+            try:
+                self.controller.credential_store.issue(
+                    qr_data['id'], door_id, expiry_date, qr_data['created']
+                )
+                return qr_data
+            except ValueError:
+                # The random ID is already in use
+                if attempt == attempts - 1:
+                    raise
+    
     def _copy_qr_id(self):
         """Copy QR ID to clipboard"""
         if self.current_qr_data:
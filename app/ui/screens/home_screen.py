@@ -42,6 +42,12 @@ class HomeScreen(BaseScreen):
             lambda: self.controller.show_screen('package')
         )
     
+    def show(self, *args, **kwargs):
+        """Show the home screen and warm up the camera for the next scan"""
+        super().show(*args, **kwargs)
+        if self.config.camera_preopen:
+            self.controller.preopen_cameras()
+    
     def _create_option_button(self, parent, text, icon_text, command):
         """Create a styled option button with icon
         
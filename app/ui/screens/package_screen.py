@@ -4,19 +4,51 @@ Package retrieval screen with QR scanner for SecureLocker application
 
 import tkinter as tk
 from tkinter import ttk
+import functools
 import threading
+import queue
+import time
 import json
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
+import hashlib
+from collections import OrderedDict
 from datetime import datetime
 
 from app.ui.screens.base_screen import BaseScreen
+from app.ui.preview_renderer import PreviewRenderer
+from app.ui.frame_presenter import FramePresenter
 from app.utils.qr_scanner import QRScanner
+from app.utils.frame_gate import FrameGate
+from app.utils.idle_monitor import IdleMonitor
+from app.utils.detection_filter import DetectionConfirmer
+from app.utils.decoder_pool import DecoderPool
+from app.utils.camera_session import CameraSession
+from app.utils import credential_store
+
+# Number of parsed QR payloads kept in the cache
+PARSED_CACHE_SIZE = 64
+
+# Milliseconds between checks for scanner events on the main thread
+EVENT_POLL_INTERVAL = 50
+
+# Longest wait (in seconds) after the scanner returned no frame
+NO_FRAME_BACKOFF_MAX = 1.0
 
 class PackageScreen(BaseScreen):
     """Package screen with QR scanning functionality"""
     
+    def __init__(self, parent, controller, frame_source=None):
+        """Initialize the package screen
+        
+        Args:
+            parent (tk.Widget): Parent widget for this screen
+            controller (AppController): Main application controller
+            frame_source (FrameSource, optional): Source of scanner frames.
+                                                Defaults to the camera
+                                                sources of the controller.
+        """
+        self.frame_source = frame_source
+        super().__init__(parent, controller)
+    
     def _create_widgets(self):
         """Create the package screen widgets"""
         self.frame = ttk.Frame(self.parent)
@@ -41,6 +73,16 @@ class PackageScreen(BaseScreen):
         self.video_frame = tk.Label(video_container, bg="black")
         self.video_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Renders camera frames into the video label
+        self.preview_renderer = PreviewRenderer(self.video_frame)
+        
+        # Shows the newest scanner frame on the main thread at a fixed rate
+        self.presenter = FramePresenter(
+            self.video_frame,
+            self.preview_renderer,
+            fps=self.config.preview_fps
+        )
+        
         # Scanning indicator (animated line)
         self.scanning_line = tk.Frame(video_container, bg=self.config.primary_color, height=3)
         
@@ -54,8 +96,21 @@ class PackageScreen(BaseScreen):
         
         # Initialize scanner variables
         self.camera_active = False
-        self.scanner = None
+        self.scanner = None  # Primary scanner, shown in the preview
+        self.scanners = []
+        self.decoder_pool = None
         
+        # Scanner callbacks run on scanner threads; they are queued here
+        # and handled on the main thread
+        self._scanner_events = queue.Queue()
+        self._event_poll_id = None
+        
+        # One per camera, kept across scanner restarts so repeats stay suppressed
+        self.confirmers = []
+        
+        # Parsed QR payloads by payload hash
+        self._parsed_cache = OrderedDict()
+    
     def show(self, *args, **kwargs):
         """Show the package screen and start QR scanner"""
         super().show(*args, **kwargs)
@@ -67,63 +122,182 @@ class PackageScreen(BaseScreen):
         super().hide()
     
     def _start_scanner(self):
-        """Start the QR code scanner"""
+        """Start the QR code scanner on every configured camera"""
         if not self.camera_active:
             self.camera_active = True
             
-            # Initialize QR scanner
-            self.scanner = QRScanner(
-                on_qr_detected=self._on_qr_detected,
-                on_error=self._on_scanner_error
-            )
+            # Camera sessions kept open by the controller, recorded video,
+            # image directory or generated frames
+            if self.frame_source is not None:
+                sources = [self.frame_source]
+            else:
+                sources = self.controller.camera_sources
+            
+            # Several cameras share one bounded set of decode threads
+            self.decoder_pool = None
+            if len(sources) > 1:
+                self.decoder_pool = DecoderPool(
+                    workers=max(self.config.scanner_pool_workers, self.controller.qr_decoder.parallel)
+                )
+                self.decoder_pool.start()
+            
+            self.scanners = [
+                self._create_scanner(source, index)
+                for index, source in enumerate(sources)
+            ]
+            self.scanner = self.scanners[0]
+            
+            # Drop events left over from an earlier scanner
+            while not self._scanner_events.empty():
+                self._scanner_events.get_nowait()
             
             # Start scanner in a separate thread
-            self.scanner_thread = threading.Thread(target=self._scanner_loop)
+            self.scanner_thread = threading.Thread(target=self._scanner_loop, args=(self.scanners,))
             self.scanner_thread.daemon = True
             self.scanner_thread.start()
             
+            # Display frames and handle scanner events on the main thread
+            self.presenter.start()
+            self._event_poll_id = self.frame.after(EVENT_POLL_INTERVAL, self._poll_scanner_events)
+            
             # Start scanning line animation
             self._animate_scanning_line()
     
+    def _create_scanner(self, source, index):
+        """Create the QR scanner for one camera
+        
+        Args:
+            source (FrameSource): Frames of the camera
+            index (int): Position of the camera in the configuration
+        
+        Returns:
+            QRScanner: Scanner that is not started yet
+        """
+        # Gate that skips unchanged or blurry frames
+        frame_gate = None
+        if self.config.scanner_gate_enabled:
+            frame_gate = FrameGate(
+                diff_threshold=self.config.scanner_gate_diff_threshold,
+                sharpness_threshold=self.config.scanner_gate_sharpness_threshold
+            )
+        
+        # Drops the frame rate and stops decoding while nothing moves
+        idle_monitor = None
+        if self.config.scanner_idle_enabled:
+            idle_monitor = IdleMonitor(
+                idle_timeout=self.config.scanner_idle_timeout,
+                motion_threshold=self.config.scanner_motion_threshold,
+                idle_fps=self.config.scanner_idle_fps
+            )
+        
+        while len(self.confirmers) <= index:
+            self.confirmers.append(DetectionConfirmer(
+                confirm_frames=self.config.scanner_confirm_frames,
+                window_frames=self.config.scanner_confirm_window,
+                dedup_seconds=self.config.scanner_dedup_seconds
+            ))
+        
+        return QRScanner(
+            on_qr_detected=self._on_qr_detected,
+            on_error=lambda error_message: self._on_scanner_error(error_message, source.live),
+            pipeline=self.config.scanner_pipeline,
+            decode_workers=max(self.config.scanner_decode_workers, self.controller.qr_decoder.parallel),
+            pyramid_scales=self.config.scanner_pyramid_scales,
+            roi_padding=self.config.scanner_roi_padding,
+            roi_full_scan_interval=self.config.scanner_roi_full_scan_interval,
+            frame_gate=frame_gate,
+            decoder=self.controller.qr_decoder,
+            confirmer=self.confirmers[index],
+            source=source,
+            idle_monitor=idle_monitor,
+            decoder_pool=self.decoder_pool
+        )
+    
     def _stop_scanner(self):
         """Stop the QR code scanner"""
         if self.camera_active:
             self.camera_active = False
-            if self.scanner:
-                self.scanner.stop()
-                self.scanner = None
+            for scanner in self.scanners:
+                scanner.stop()
+            self.scanners = []
+            self.scanner = None
+            
+            if self.decoder_pool is not None:
+                self.decoder_pool.stop()
+                self.decoder_pool = None
+            
+            self.presenter.stop()
+            if self._event_poll_id is not None:
+                self.frame.after_cancel(self._event_poll_id)
+                self._event_poll_id = None
             
             # Stop scanning line animation
             if hasattr(self, '_animation_id'):
                 self.frame.after_cancel(self._animation_id)
     
-    def _scanner_loop(self):
-        """Camera processing loop to update UI with camera feed"""
-        if not self.scanner.start():
-            return
+    def _scanner_loop(self, scanners):
+        """Camera processing loop that hands frames to the presenter
         
-        while self.camera_active:
-            # Get the current frame from scanner
-            frame = self.scanner.get_frame()
+        Runs on a background thread and never touches Tk; the presenter
+        displays the frames on the main thread. The other cameras capture
+        and decode on their own threads; only the first one is previewed.
+        
+        Args:
+            scanners (list): Scanners started by this thread, primary first
+        """
+        for scanner in scanners:
+            if not self.camera_active or not scanner.start():
+                return
+        
+        scanner = scanners[0]
+        
+        backoff = 0.01
+        while self.camera_active and scanner.running and not scanner.finished:
+            # Get the current frame from scanner (BGR, converted by the renderer)
+            frame = scanner.get_frame(rgb=False)
             if frame is None:
+                # Back off instead of spinning while no frames arrive
+                time.sleep(backoff)
+                backoff = min(backoff * 2, NO_FRAME_BACKOFF_MAX)
                 continue
             
-            # Convert to PhotoImage for display
-            img = Image.fromarray(frame)
-            imgtk = ImageTk.PhotoImage(image=img)
-            
-            # Update the video feed if it still exists
-            # Since this runs in a thread, we need to check if video_frame still exists
-            if hasattr(self, 'video_frame') and self.video_frame.winfo_exists():
-                self.video_frame.imgtk = imgtk  # Keep a reference
-                self.video_frame.configure(image=imgtk)
-                
-                # Process tkinter events
-                try:
-                    self.video_frame.update()
-                except:
-                    # If update fails, the window may have been closed
-                    break
+            backoff = 0.01
+            self.presenter.submit(frame)
+    
+    def get_scanner_stats(self):
+        """Get scanner statistics for every camera
+        
+        Returns:
+            dict: Stats of each camera's scanner in configuration order,
+                  including the camera session startup times, plus the
+                  preview presenter stats
+        """
+        cameras = []
+        for scanner in self.scanners:
+            stats = dict(scanner.get_stats(), source=scanner.source.describe())
+            if isinstance(scanner.source, CameraSession):
+                stats['session'] = scanner.source.get_stats()
+            cameras.append(stats)
+        
+        return {
+            'cameras': cameras,
+            'preview': self.presenter.get_stats()
+        }
+    
+    def _poll_scanner_events(self):
+        """Handle queued scanner callbacks on the main thread"""
+        self._event_poll_id = None
+        
+        while self.camera_active:
+            try:
+                handler, arg = self._scanner_events.get_nowait()
+            except queue.Empty:
+                break
+            handler(arg)
+        
+        # A handler may have stopped the scanner
+        if self.camera_active:
+            self._event_poll_id = self.frame.after(EVENT_POLL_INTERVAL, self._poll_scanner_events)
     
     def _animate_scanning_line(self):
         """Animate the scanning line to provide visual feedback"""
@@ -149,10 +323,20 @@ class PackageScreen(BaseScreen):
             # Update position
             self.scanning_line.place(x=0, y=y, width=width)
         
-        # Schedule next animation frame
-        self._animation_id = self.frame.after(30, self._animate_scanning_line)
+        # Schedule next animation frame (slowly while the scanner is idle)
+        scanner = self.scanner
+        delay = 500 if scanner is not None and scanner.idle else 30
+        self._animation_id = self.frame.after(delay, self._animate_scanning_line)
     
     def _on_qr_detected(self, qr_data):
+        """Queue a detected QR code for the main thread (scanner thread)
+        
+        Args:
+            qr_data (str): QR code data
+        """
+        self._scanner_events.put((self._handle_qr_detected, qr_data))
+    
+    def _handle_qr_detected(self, qr_data):
         """Handle detected QR code
         
         Args:
@@ -162,28 +346,93 @@ class PackageScreen(BaseScreen):
         self._stop_scanner()
         
         try:
-            # Parse QR code data
-            qr_content = json.loads(qr_data)
+            # Parse QR code data (cached by payload hash)
+            qr_content, expiry_date = self._parse_qr_data(qr_data)
             
-            # Validate QR code
-            if self._validate_qr_code(qr_content):
-                # Show door open screen
-                self.controller.show_screen('door_open', qr_content['doorId'])
+            if qr_content is None:
+                # Invalid QR code format
+                self.controller.show_screen('error', "Invalid QR code format")
+            elif self._validate_qr_code(qr_content, expiry_date):
+                # Consume the code, so it only opens the door once
+                error = self._redeem_qr_code(qr_content)
+                if error is None:
+                    # Show door open screen
+                    self.controller.show_screen('door_open', qr_content['doorId'])
+                else:
+                    self.controller.show_screen('error', error)
             else:
                 # Show error screen
                 self.controller.show_screen('error', "QR code has expired or is invalid")
-        except json.JSONDecodeError:
-            # Invalid QR code format
-            self.controller.show_screen('error', "Invalid QR code format")
         except Exception as e:
             # Other errors
             self.controller.show_screen('error', f"Error processing QR code: {str(e)}")
     
-    def _validate_qr_code(self, qr_data):
+    def _parse_qr_data(self, qr_data):
+        """Parse QR code data, reusing earlier results for the same payload
+        
+        Accepts both compact signed tokens and the JSON format.
+        
+        Args:
+            qr_data (str): Raw QR code payload
+        
+        Returns:
+            tuple: (QR content dict or None if malformed or not signed by
+                    this installation, expiry datetime or None if missing
+                    or invalid)
+        """
+        # Signed tokens verify in microseconds, no need for the cache
+        if not qr_data.startswith('{'):
+            token = self.controller.qr_token_codec.decode(qr_data)
+            if token is None:
+                return None, None
+            return self.controller.qr_token_codec.to_qr_data(token)
+        
+        key = hashlib.sha1(qr_data.encode('utf-8')).digest()
+        
+        cached = self._parsed_cache.get(key)
+        if cached is not None:
+            self._parsed_cache.move_to_end(key)
+            return cached
+        
+        try:
+            qr_content = json.loads(qr_data)
+            if not isinstance(qr_content, dict):
+                qr_content = None
+        except json.JSONDecodeError:
+            qr_content = None
+        
+        expiry_date = None
+        if qr_content is not None:
+            expiry_date = self._parse_expiry_date(qr_content)
+        
+        result = (qr_content, expiry_date)
+        self._parsed_cache[key] = result
+        if len(self._parsed_cache) > PARSED_CACHE_SIZE:
+            self._parsed_cache.popitem(last=False)
+        
+        return result
+    
+    def _parse_expiry_date(self, qr_data):
+        """Parse the expiry date of QR code data
+        
+        Args:
+            qr_data (dict): QR code data
+        
+        Returns:
+            datetime: Expiry date (or None if missing or invalid)
+        """
+        try:
+            return datetime.fromisoformat(qr_data['expiryDate'].replace('Z', '+00:00'))
+        except (KeyError, AttributeError, ValueError):
+            return None
+    
+    def _validate_qr_code(self, qr_data, expiry_date=None):
         """Validate if QR code is valid and not expired
         
         Args:
             qr_data (dict): QR code data
+            expiry_date (datetime, optional): Already parsed expiry date.
+                                            Parsed from qr_data if None.
             
         Returns:
             bool: True if QR code is valid
@@ -192,25 +441,77 @@ class PackageScreen(BaseScreen):
         if not all(key in qr_data for key in ['id', 'doorId', 'expiryDate']):
             return False
         
+        if expiry_date is None:
+            expiry_date = self._parse_expiry_date(qr_data)
+            if expiry_date is None:
+                return False
+        
         # Check if QR code has expired
         try:
-            expiry_date = datetime.fromisoformat(qr_data['expiryDate'].replace('Z', '+00:00'))
             now = datetime.now()
             return expiry_date > now
-        except ValueError:
+        except TypeError:
+            # Offset-aware expiry compared with naive local time
             return False
     
-    def _on_scanner_error(self, error_message):
+    def _redeem_qr_code(self, qr_data):
+        """Redeem a valid QR code in the credential store
+        
+        Args:
+            qr_data (dict): Validated QR code data
+        
+        Returns:
+            str: Error message, or None if the door may open
+        """
+        # Known revocations are refused without touching the store; "not
+        # revoked" goes straight to redemption without a revocation lookup.
+        # The redemption still refuses revocations the filter has not seen.
+        if self.controller.revocation_filter.is_revoked(qr_data['id']):
+            return "QR code has been revoked"
+        
+        store = self.controller.credential_store
+        result = store.redeem(qr_data['id'], qr_data['doorId'])
+        
+        if result == credential_store.UNKNOWN and self.config.credential_allow_unregistered:
+            # Recorded as redeemed, so the code cannot be used a second time
+            expiry_date = self._parse_expiry_date(qr_data).date().isoformat()
+            result = store.redeem_unregistered(qr_data['id'], qr_data['doorId'], expiry_date)
+        
+        if result == credential_store.REDEEMED:
+            return None
+        if result == credential_store.UNKNOWN:
+            return "QR code is not registered"
+        if result == credential_store.ALREADY_REDEEMED:
+            return "QR code has already been used"
+        if result == credential_store.REVOKED:
+            return "QR code has been revoked"
+        return "QR code has expired or is invalid"
+    
+    def _on_scanner_error(self, error_message, live=True):
+        """Queue a scanner error for the main thread (scanner thread)
+        
+        Args:
+            error_message (str): Error message
+            live (bool, optional): The error came from a live camera rather
+                                 than a recorded source. Defaults to True.
+        """
+        self._scanner_events.put((functools.partial(self._handle_scanner_error, live=live), error_message))
+    
+    def _handle_scanner_error(self, error_message, live=True):
         """Handle scanner errors
         
         Args:
             error_message (str): Error message
+            live (bool, optional): The error came from a live camera rather
+                                 than a recorded source. Defaults to True.
         """
-        self.camera_active = False
-        self.scan_message.configure(
-            text=f"Camera error: {error_message}. Please check your permissions.",
-            fg=self.config.red
-        )
+        self._stop_scanner()
+        if live:
+            text = f"Camera error: {error_message}. Please check your permissions."
+        else:
+            # A video or image directory ran out of frames; no camera involved
+            text = f"Scanner stopped: {error_message}."
+        self.scan_message.configure(text=text, fg=self.config.red)
         
         # Add a retry button
         retry_btn = tk.Button(
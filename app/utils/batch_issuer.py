@@ -0,0 +1,297 @@
+"""
+Batch QR code issuance for SecureLocker application
+
+Issues thousands of codes at once, e.g. for a weekly courier manifest,
+without the Tk UI. QR code data (and so the IDs) is created in the parent
+process, where the ID allocator lives; rendering and saving the images,
+which is where the time goes, runs in a pool of worker processes.
+
+Every finished code is appended to a JSON Lines manifest in the output
+directory as soon as its image is on disk. Images are named after the job
+number, so a batch that was interrupted is resumed by running it again:
+jobs already in the manifest are skipped and the others are redone.
+
+With an archive format the workers return PNG data instead of saving
+files, and the parent streams it into a single ZIP, tar or pack file (see
+app.utils.qr_archive); the manifest then records each image's offset in
+the archive. A pack is resumed where the manifest ends. A ZIP or tar
+archive cut short is unreadable, so on resume it is written again, with
+the codes of the earlier run rendered from their manifest entries.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+
+from app.utils.qr_archive import ARCHIVE_EXTENSIONS, QRArchiveWriter, encode_png
+from app.utils.qr_generator import QRGenerator
+from app.utils.qr_token import QRTokenCodec
+
+# Manifest file name in the output directory
+MANIFEST_NAME = 'manifest.jsonl'
+
+# Archive file name in the output directory, without extension
+ARCHIVE_NAME = 'codes'
+
+# Jobs sent to a worker at a time
+DEFAULT_CHUNK_SIZE = 16
+
+# Finished codes registered in the credential store per transaction
+REGISTER_BATCH_SIZE = 200
+
+# Set in each worker process by _init_worker()
+_worker_generator = None
+
+def _init_worker(token_key, policy):
+    """Worker process: create the QR generator
+    
+    Args:
+        token_key (bytes): Token signing key, or None for JSON payloads
+        policy (QRPolicy): QR code version and error correction level, or
+                           None for the default
+    """
+    global _worker_generator
+    token_codec = QRTokenCodec(token_key) if token_key is not None else None
+    _worker_generator = QRGenerator(token_codec=token_codec, policy=policy)
+
+def _render_job(job):
+    """Worker process: render and save one QR code image
+    
+    The image is written to a temporary file first, so an interrupted
+    batch never leaves a half-written image under the final name.
+    
+    Args:
+        job (tuple): (job index, QR code data, image path, or None to
+                     return the PNG data instead)
+    
+    Returns:
+        tuple: (job index, QR code data, payload, image path or PNG data)
+    """
+    index, qr_data, path = job
+    image = _worker_generator.generate_qr_image(qr_data)
+    payload = _worker_generator.encode_payload(qr_data)
+    
+    if path is None:
+        # The parent writes it into the archive
+        return index, qr_data, payload, encode_png(image)
+    
+    temp_path = path + '.tmp'
+    image.save(temp_path, format='PNG')
+    os.replace(temp_path, path)
+    return index, qr_data, payload, path
+
+class BatchIssuer:
+    """Issues a batch of QR codes into an output directory"""
+    
+    def __init__(self, output_dir, id_allocator=None, token_key=None, store=None,
+                 processes=None, chunk_size=DEFAULT_CHUNK_SIZE, policy=None,
+                 archive_format=None):
+        """Initialize the batch issuer
+        
+        Args:
+            output_dir (str): Directory for the images and the manifest
+            id_allocator (IDAllocator, optional): Source of unique IDs.
+                                                Defaults to a private one.
+            token_key (bytes, optional): Token signing key. Payloads are JSON
+                                       if None.
+            store (CredentialStore, optional): Register the issued codes here
+            processes (int, optional): Worker processes. Defaults to the
+                                     number of CPU cores.
+            chunk_size (int, optional): Jobs sent to a worker at a time
+            policy (QRPolicy, optional): QR code version and error correction
+                                       level. Defaults to the generator's.
+            archive_format (str, optional): 'zip', 'tar' or 'pack' to write
+                                          the images into one archive instead
+                                          of a file each
+        
+        Raises:
+            ValueError: If the archive format is unknown
+        """
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.token_key = token_key
+        self.store = store
+        self.processes = max(1, processes or multiprocessing.cpu_count())
+        self.chunk_size = max(1, chunk_size)
+        self.policy = policy
+        
+        if archive_format is not None and archive_format not in ARCHIVE_EXTENSIONS:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        self.archive_format = archive_format
+        self.archive_path = None
+        if archive_format is not None:
+            self.archive_path = os.path.join(output_dir, ARCHIVE_NAME + ARCHIVE_EXTENSIONS[archive_format])
+        
+        # IDs are created here, in the parent, so they are unique across workers
+        self.generator = QRGenerator(id_allocator=id_allocator)
+    
+    def load_manifest(self):
+        """Read the codes finished by an earlier run
+        
+        A last line cut short by an interruption is removed; its job is
+        simply done again. So are entries whose image is missing or lies
+        beyond the end of the archive.
+        
+        Returns:
+            dict: Job index to manifest entry
+        """
+        entries = {}
+        if not os.path.exists(self.manifest_path):
+            return entries
+        
+        archive_size = 0
+        if self.archive_path is not None and os.path.exists(self.archive_path):
+            archive_size = os.path.getsize(self.archive_path)
+        
+        with open(self.manifest_path, 'r+b') as f:
+            complete = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                complete += len(line)
+                
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if self.archive_path is not None:
+                    if 'offset' in entry and entry['offset'] + entry['size'] <= archive_size:
+                        entries[entry['index']] = entry
+                elif os.path.exists(os.path.join(self.output_dir, entry['image'])):
+                    entries[entry['index']] = entry
+            
+            # New entries must start on a line of their own
+            f.truncate(complete)
+        
+        return entries
+    
+    def issue(self, requests, on_progress=None):
+        """Issue a QR code for every request
+        
+        Args:
+            requests (list): (door_id, expiry_date) pairs; the position in
+                             the list is the job index used for resuming
+            on_progress (callable, optional): Called with (done, total)
+                                            after each finished code
+        
+        Returns:
+            dict: Codes issued, skipped (already done) and total, elapsed
+                  seconds and codes per second
+        
+        Raises:
+            ValueError: If the output directory holds another batch
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        finished = self.load_manifest()
+        
+        for index, entry in finished.items():
+            if (index >= len(requests)
+                    or (str(requests[index][0]), requests[index][1]) != (entry['doorId'], entry['expiryDate'])):
+                raise ValueError(f"{self.output_dir} holds a different batch; use a new output directory")
+        
+        # Keep IDs of an earlier run out of the new codes
+        self.generator.id_allocator.reserve(entry['id'] for entry in finished.values())
+        self._register(finished.values())
+        
+        # An unfinished ZIP or tar archive is written again, earlier codes included
+        rewrite = self.archive_format in ('zip', 'tar') and len(finished) < len(requests)
+        
+        jobs = []
+        for index, (door_id, expiry_date) in enumerate(requests):
+            if index in finished:
+                if not rewrite:
+                    continue
+                entry = finished[index]
+                qr_data = {key: entry[key] for key in ('id', 'doorId', 'expiryDate', 'created')}
+            else:
+                qr_data = self.generator.generate_qr_data(str(door_id), expiry_date)
+            
+            path = None
+            if self.archive_path is None:
+                path = os.path.join(self.output_dir, f"{index:06d}.png")
+            jobs.append((index, qr_data, path))
+        
+        start = time.perf_counter()
+        issued = 0
+        done = 0 if rewrite else len(finished)
+        unregistered = []
+        
+        if jobs:
+            archive = None
+            if self.archive_path is not None:
+                # Keep the pack up to the last image in the manifest
+                keep_bytes = None
+                if self.archive_format == 'pack':
+                    keep_bytes = max((entry['offset'] + entry['size'] for entry in finished.values()), default=0)
+                archive = QRArchiveWriter(self.archive_path, self.archive_format, keep_bytes=keep_bytes)
+            
+            # Spawned workers do not inherit the parent's threads or Tk state
+            context = multiprocessing.get_context('spawn')
+            try:
+                with open(self.manifest_path, 'w' if rewrite else 'a', encoding='utf-8') as manifest, \
+                        context.Pool(self.processes, _init_worker, (self.token_key, self.policy)) as pool:
+                    for index, qr_data, payload, image in pool.imap_unordered(
+                            _render_job, jobs, chunksize=self.chunk_size):
+                        entry = {
+                            'index': index,
+                            'id': qr_data['id'],
+                            'doorId': qr_data['doorId'],
+                            'expiryDate': qr_data['expiryDate'],
+                            'created': qr_data['created'],
+                            'payload': payload
+                        }
+                        if archive is not None:
+                            entry['image'] = f"{index:06d}.png"
+                            entry['offset'] = archive.add_bytes(entry['image'], image)
+                            entry['size'] = len(image)
+                        else:
+                            entry['image'] = os.path.basename(image)
+                        manifest.write(json.dumps(entry) + '\n')
+                        manifest.flush()
+                        
+                        unregistered.append(entry)
+                        if len(unregistered) >= REGISTER_BATCH_SIZE:
+                            self._register(unregistered)
+                            unregistered = []
+                        
+                        if index not in finished:
+                            issued += 1
+                        done += 1
+                        if on_progress:
+                            on_progress(done, len(requests))
+            finally:
+                if archive is not None:
+                    archive.close()
+            
+            self._register(unregistered)
+        
+        elapsed = time.perf_counter() - start
+        return {
+            'issued': issued,
+            'skipped': len(finished),
+            'total': len(requests),
+            'processes': self.processes,
+            'elapsed_s': round(elapsed, 2),
+            'codes_per_sec': round(issued / elapsed, 1) if issued and elapsed else 0.0
+        }
+    
+    def _register(self, entries):
+        """Record manifest entries in the credential store, if there is one
+        
+        Entries already in the store (e.g. registered before an interruption)
+        are left alone.
+        
+        Args:
+            entries (iterable): Manifest entries
+        """
+        if self.store is None:
+            return
+        
+        codes = [
+            (entry['id'], entry['doorId'], entry['expiryDate'], entry['created'])
+            for entry in entries
+            if self.store.get(entry['id']) is None
+        ]
+        if codes:
+            self.store.issue_many(codes)
\ No newline at end of file
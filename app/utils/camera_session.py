@@ -0,0 +1,250 @@
+"""
+Persistent camera session for SecureLocker application
+
+Opening a camera and letting auto-exposure settle takes a second or two.
+A CameraSession opens the camera once and keeps it open for the lifetime of
+the application: scanners pause and resume it instead of releasing it, and
+while paused it keeps reading a few frames per second so exposure stays
+adjusted to the scene.
+"""
+
+import threading
+import time
+import cv2
+
+from app.utils.frame_sources import FrameSource
+
+class CameraSession(FrameSource):
+    """Frame source that keeps a live camera open between scanner runs
+    
+    Scanners use the session like any other frame source. open() resumes an
+    already open camera, and release() only pauses it; close() really
+    releases the camera.
+    """
+    
+    def __init__(self, source, keep_alive_fps=2.0, settle_tolerance=2.0,
+                 brightness_range=(30, 225), thumb_size=(32, 24)):
+        """Initialize the camera session
+        
+        Args:
+            source (FrameSource): Live camera source to keep open
+            keep_alive_fps (float, optional): Frames read per second while
+                                            paused. Defaults to 2.
+            settle_tolerance (float, optional): Largest change in mean
+                                              brightness between frames once
+                                              exposure has settled. Defaults to 2.
+            brightness_range (tuple, optional): Mean brightness of a usable
+                                              frame. Defaults to (30, 225).
+            thumb_size (tuple, optional): Thumbnail size used to measure
+                                        brightness. Defaults to (32, 24).
+        """
+        self.source = source
+        self.keep_alive_interval = 1.0 / keep_alive_fps
+        self.settle_tolerance = settle_tolerance
+        self.brightness_range = brightness_range
+        self.thumb_size = thumb_size
+        
+        self._open_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._closing = threading.Event()
+        self._keeper = None
+        self._opened = False
+        self._paused = True
+        self._failed = False
+        
+        # Startup timing of the most recent open or resume
+        self._resumed_at = None
+        self._previous_brightness = None
+        self.opens = 0
+        self.resumes = 0
+        self.open_ms = None
+        self.first_frame_ms = None
+        self.exposure_settled_ms = None
+        self.first_decode_ms = None
+        self.warm_start = False
+    
+    @property
+    def live(self):
+        """bool: Same as the wrapped source"""
+        return self.source.live
+    
+    @property
+    def realtime(self):
+        """bool: Same as the wrapped source"""
+        return self.source.realtime
+    
+    @property
+    def negotiated(self):
+        """dict: Capture settings the driver accepted (or None)"""
+        return getattr(self.source, 'negotiated', None)
+    
+    @property
+    def is_open(self):
+        """bool: True while the camera is open"""
+        return self._opened
+    
+    @property
+    def paused(self):
+        """bool: True while no scanner is reading from the session"""
+        return self._paused
+    
+    def open(self):
+        """Open the camera, or resume it if it is already open
+        
+        Returns:
+            bool: True if the camera is open
+        """
+        start = time.monotonic()
+        warm = self._ensure_open()
+        if not self._opened:
+            return False
+        
+        with self._read_lock:
+            self._paused = False
+            self.warm_start = warm
+            self._resumed_at = start
+            self._previous_brightness = None
+            self.first_frame_ms = None
+            self.exposure_settled_ms = None
+            self.first_decode_ms = None
+            if warm:
+                self.resumes += 1
+        
+        return True
+    
+    def preopen(self):
+        """Open the camera ahead of time and leave it paused
+        
+        Meant to run on a background thread, e.g. while the home screen is
+        shown, so the camera is warm once a customer starts scanning.
+        
+        Returns:
+            bool: True if the camera is open
+        """
+        self._ensure_open()
+        return self._opened
+    
+    def read(self):
+        """Read the next camera frame"""
+        with self._read_lock:
+            ret, frame = self.source.read()
+            self._failed = not ret
+            if ret and self.exposure_settled_ms is None and self._resumed_at is not None:
+                self._measure_startup(frame)
+        return ret, frame
+    
+    def frame_decoded(self):
+        """Record the first QR code decoded after the last open or resume"""
+        if self.first_decode_ms is None and self._resumed_at is not None:
+            self.first_decode_ms = round((time.monotonic() - self._resumed_at) * 1000, 1)
+    
+    def release(self):
+        """Pause the session; the camera stays open"""
+        self._paused = True
+    
+    def close(self):
+        """Release the camera and stop the keep-alive thread"""
+        self._closing.set()
+        if self._keeper is not None:
+            self._keeper.join(timeout=2.0)
+            self._keeper = None
+        
+        with self._open_lock, self._read_lock:
+            self.source.release()
+            self._opened = False
+            self._paused = True
+    
+    def read_error_message(self):
+        """Get the error reported when the camera returns no frame"""
+        return self.source.read_error_message()
+    
+    def describe(self):
+        """Describe the camera source"""
+        return self.source.describe()
+    
+    def get_stats(self):
+        """Get session statistics
+        
+        Returns:
+            dict: Cold open time; time to the first frame, to settled
+                  exposure and to the first decoded QR code after the last
+                  open or resume; and counters
+        """
+        return {
+            'open': self._opened,
+            'paused': self._paused,
+            'opens': self.opens,
+            'resumes': self.resumes,
+            'warm_start': self.warm_start,
+            'open_ms': self.open_ms,
+            'first_frame_ms': self.first_frame_ms,
+            'exposure_settled_ms': self.exposure_settled_ms,
+            'first_decode_ms': self.first_decode_ms
+        }
+    
+    def _ensure_open(self):
+        """Open the camera unless it is already open and working
+        
+        Returns:
+            bool: True if the camera was already open (warm start)
+        """
+        with self._open_lock:
+            if self._opened and not self._failed:
+                return True
+            
+            # The last read failed (e.g. the camera was unplugged): reopen it
+            if self._opened:
+                with self._read_lock:
+                    self.source.release()
+                    self._opened = False
+            
+            start = time.monotonic()
+            if not self.source.open():
+                self.source.release()
+                return False
+            
+            self.open_ms = round((time.monotonic() - start) * 1000, 1)
+            self.opens += 1
+            self._opened = True
+            self._failed = False
+            self._closing.clear()
+            
+            if self._keeper is None:
+                self._keeper = threading.Thread(target=self._keep_alive_loop, daemon=True)
+                self._keeper.start()
+            
+            return False
+    
+    def _measure_startup(self, frame):
+        """Record when the first frame arrives and when exposure has settled
+        
+        Exposure counts as settled once the frame brightness is in range and
+        has stopped changing. The time to the first decodable frame is
+        recorded separately, by frame_decoded().
+        
+        Args:
+            frame (numpy.ndarray): BGR frame
+        """
+        elapsed = round((time.monotonic() - self._resumed_at) * 1000, 1)
+        if self.first_frame_ms is None:
+            self.first_frame_ms = elapsed
+        
+        thumb = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        brightness = float(thumb.mean())
+        previous, self._previous_brightness = self._previous_brightness, brightness
+        
+        low, high = self.brightness_range
+        if (previous is not None and low <= brightness <= high
+                and abs(brightness - previous) <= self.settle_tolerance):
+            self.exposure_settled_ms = elapsed
+    
+    def _keep_alive_loop(self):
+        """Keep-alive thread: read a few frames per second while paused"""
+        while not self._closing.wait(self.keep_alive_interval):
+            if not self._paused or not self._opened:
+                continue
+            
+            with self._read_lock:
+                # A scanner may have resumed the session in the meantime
+                if self._paused and self._opened:
+                    self.source.read()
\ No newline at end of file
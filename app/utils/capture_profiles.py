@@ -0,0 +1,292 @@
+"""
+Camera capture profiles for SecureLocker application
+
+A capture profile asks the camera driver for a resolution, frame rate,
+pixel format and driver buffer depth, then reads back what the driver
+actually accepted. The probe measures delivered frame rate and frame age
+for each profile so the lowest-latency profile can be picked per kiosk.
+"""
+
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+import cv2
+
+# Requested capture settings; fourcc None keeps the driver's pixel format
+CaptureProfile = namedtuple('CaptureProfile', ['width', 'height', 'fps', 'fourcc', 'buffer_size'])
+
+# Named capture profiles
+CAPTURE_PROFILES = {
+    'low_latency': CaptureProfile(640, 480, 30, 'MJPG', 1),
+    'hd_mjpeg': CaptureProfile(1280, 720, 30, 'MJPG', 1),
+    'full_hd_mjpeg': CaptureProfile(1920, 1080, 30, 'MJPG', 1),
+    'vga_raw': CaptureProfile(640, 480, 30, 'YUYV', 1),
+    'hd_raw': CaptureProfile(1280, 720, 10, 'YUYV', 1)
+}
+
+def get_capture_profile(profile):
+    """Look up a capture profile
+    
+    Args:
+        profile (str or CaptureProfile): Profile name or profile
+    
+    Returns:
+        CaptureProfile: The profile
+    """
+    if isinstance(profile, CaptureProfile):
+        return profile
+    if profile not in CAPTURE_PROFILES:
+        raise ValueError(f"Unknown capture profile '{profile}'")
+    return CAPTURE_PROFILES[profile]
+
+def _fourcc_to_str(value):
+    """Convert a numeric FOURCC code to its four-character string"""
+    value = int(value)
+    if value <= 0:
+        return None
+    return ''.join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+def apply_capture_profile(cap, profile):
+    """Apply a capture profile to an open camera and verify it
+    
+    Args:
+        cap (cv2.VideoCapture): Open camera
+        profile (CaptureProfile): Requested settings
+    
+    Returns:
+        dict: Settings the driver reports, plus a 'mismatches' list naming
+              every setting it did not accept
+    """
+    # The pixel format has to be set before the resolution on most drivers
+    if profile.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    cap.set(cv2.CAP_PROP_FPS, profile.fps)
+    if profile.buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, profile.buffer_size)
+    
+    negotiated = {
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': round(cap.get(cv2.CAP_PROP_FPS), 2),
+        'fourcc': _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        'buffer_size': int(cap.get(cv2.CAP_PROP_BUFFERSIZE))
+    }
+    
+    mismatches = []
+    if (negotiated['width'], negotiated['height']) != (profile.width, profile.height):
+        mismatches.append('resolution')
+    if negotiated['fps'] and abs(negotiated['fps'] - profile.fps) > 1:
+        mismatches.append('fps')
+    if profile.fourcc and negotiated['fourcc'] != profile.fourcc:
+        mismatches.append('fourcc')
+    # Backends that do not support the property report 0
+    if profile.buffer_size and negotiated['buffer_size'] not in (0, profile.buffer_size):
+        mismatches.append('buffer_size')
+    
+    negotiated['mismatches'] = mismatches
+    return negotiated
+
+def _measure_queued_frames(cap, interval, rounds=5):
+    """Estimate how many stale frames the driver queues
+    
+    After an idle period a buffering driver returns its queued frames
+    immediately; only then does read() block for a fresh frame. The number
+    of immediate reads is the queue depth.
+    
+    Args:
+        cap (cv2.VideoCapture): Open camera
+        interval (float): Nominal frame interval in seconds
+        rounds (int, optional): Number of measurements. Defaults to 5.
+    
+    Returns:
+        float: Average number of queued frames
+    """
+    counts = []
+    for _ in range(rounds):
+        time.sleep(interval * 4)
+        
+        queued = 0
+        while queued < 10:
+            start = time.perf_counter()
+            ok, _ = cap.read()
+            if not ok or time.perf_counter() - start > interval / 2:
+                break
+            queued += 1
+        
+        counts.append(queued)
+    
+    return sum(counts) / len(counts)
+
+def probe_capture_profile(camera_id, profile, duration=2.0, warmup_frames=10):
+    """Measure what a capture profile really delivers
+    
+    Args:
+        camera_id (int): Camera device ID
+        profile (str or CaptureProfile): Profile to measure
+        duration (float, optional): Seconds of frames to time. Defaults to 2.
+        warmup_frames (int, optional): Frames discarded first. Defaults to 10.
+    
+    Returns:
+        dict: Negotiated settings, delivered fps, queued frames and the
+              estimated frame age in milliseconds (None values if the
+              camera delivered nothing)
+    """
+    profile = get_capture_profile(profile)
+    cap = cv2.VideoCapture(camera_id)
+    
+    try:
+        if not cap.isOpened():
+            return {'opened': False}
+        
+        result = {'opened': True, 'negotiated': apply_capture_profile(cap, profile)}
+        
+        for _ in range(warmup_frames):
+            cap.read()
+        
+        frames = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            ok, _ = cap.read()
+            if not ok:
+                break
+            frames += 1
+        elapsed = time.perf_counter() - start
+        
+        if not frames:
+            result.update({'delivered_fps': 0.0, 'queued_frames': None, 'frame_age_ms': None})
+            return result
+        
+        delivered_fps = frames / elapsed
+        interval = 1.0 / delivered_fps
+        queued = _measure_queued_frames(cap, interval)
+        
+        # A fresh frame is on average half an interval old when read,
+        # plus one full interval for every frame queued ahead of it
+        result.update({
+            'delivered_fps': round(delivered_fps, 2),
+            'queued_frames': round(queued, 2),
+            'frame_age_ms': round((queued + 0.5) * interval * 1000, 1)
+        })
+        return result
+    finally:
+        cap.release()
+
+def probe_capture_profiles(camera_id=0, profiles=None, duration=2.0):
+    """Probe several capture profiles
+    
+    Args:
+        camera_id (int, optional): Camera device ID. Defaults to 0.
+        profiles (list, optional): Profile names. Defaults to all profiles.
+        duration (float, optional): Seconds measured per profile.
+    
+    Returns:
+        dict: Probe result per profile name
+    """
+    return {
+        name: probe_capture_profile(camera_id, name, duration)
+        for name in (profiles or CAPTURE_PROFILES)
+    }
+
+def choose_capture_profile(results):
+    """Choose the profile with the lowest frame age from probe results
+    
+    Args:
+        results (dict): Probe result per profile name
+    
+    Returns:
+        str: Name of the best profile (None if no profile delivered frames)
+    """
+    usable = [
+        name for name, result in results.items()
+        if result.get('opened') and result.get('frame_age_ms') is not None
+    ]
+    if not usable:
+        return None
+    return min(usable, key=lambda name: results[name]['frame_age_ms'])
+
+def _capture_cache_key(camera_id):
+    """Key identifying a camera in the profile cache"""
+    return f"camera{camera_id}"
+
+def load_cached_capture_profile(cache_path, camera_id=0):
+    """Read the cached profile choice for a camera
+    
+    Args:
+        cache_path (str): JSON file caching probe results
+        camera_id (int, optional): Camera device ID. Defaults to 0.
+    
+    Returns:
+        str: Cached profile name (None if nothing usable is cached)
+    """
+    if not cache_path or not os.path.exists(cache_path):
+        return None
+    
+    try:
+        with open(cache_path) as f:
+            name = json.load(f).get(_capture_cache_key(camera_id), {}).get('profile')
+    except (OSError, ValueError, AttributeError):
+        return None
+    
+    return name if name in CAPTURE_PROFILES else None
+
+def store_capture_profile(cache_path, camera_id, profile, results):
+    """Cache the profile choice and probe results for a camera
+    
+    Args:
+        cache_path (str): JSON file caching probe results
+        camera_id (int): Camera device ID
+        profile (str): Selected profile name
+        results (dict): Probe result per profile name
+    """
+    cache = {}
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+    
+    cache[_capture_cache_key(camera_id)] = {
+        'profile': profile,
+        'results': results,
+        'probed': datetime.now().isoformat()
+    }
+    
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        # The probe simply runs again next time
+        pass
+
+def select_capture_profile(camera_id=0, cache_path=None, profiles=None, duration=2.0):
+    """Pick the capture profile with the lowest frame age
+    
+    The choice is cached per camera in cache_path, so the probe only runs
+    once per kiosk.
+    
+    Args:
+        camera_id (int, optional): Camera device ID. Defaults to 0.
+        cache_path (str, optional): JSON file caching the probe result
+        profiles (list, optional): Profile names. Defaults to all profiles.
+        duration (float, optional): Seconds measured per profile.
+    
+    Returns:
+        str: Name of the selected profile (None if no profile worked)
+    """
+    cached = load_cached_capture_profile(cache_path, camera_id)
+    if cached is not None:
+        return cached
+    
+    results = probe_capture_profiles(camera_id, profiles, duration)
+    selected = choose_capture_profile(results)
+    
+    if cache_path and selected is not None:
+        store_capture_profile(cache_path, camera_id, selected, results)
+    
+    return selected
\ No newline at end of file
@@ -0,0 +1,524 @@
+"""
+Credential store for SecureLocker application
+
+Issued QR codes are kept in an embedded SQLite database in WAL mode, so the
+kiosk can look a code up by ID, revoke it and consume it exactly once.
+
+Triggers log every new code and every redemption or revocation, whichever
+process made it, into a change table. In-memory indexes follow changes made
+by other processes (batch_issue.py, a second kiosk) by reading that log
+from their last position, a few hundred rows at a time.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import date, datetime
+
+# A stored credential
+Credential = namedtuple('Credential', ['id', 'door_id', 'expiry_date', 'created_at',
+                                       'redeemed_at', 'revoked'])
+
+# Redemption results
+REDEEMED = 'redeemed'
+UNKNOWN = 'unknown'
+ALREADY_REDEEMED = 'already_redeemed'
+REVOKED = 'revoked'
+EXPIRED = 'expired'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS credentials (
+    id TEXT PRIMARY KEY,
+    door_id TEXT NOT NULL,
+    expiry_date TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    redeemed_at TEXT,
+    revoked INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_credentials_door ON credentials (door_id);
+CREATE INDEX IF NOT EXISTS idx_credentials_expiry ON credentials (expiry_date);
+
+CREATE TABLE IF NOT EXISTS credential_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    door_id TEXT NOT NULL,
+    expiry_date TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    revoked INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_credential_changes_id ON credential_changes (id);
+
+CREATE TRIGGER IF NOT EXISTS credentials_inserted AFTER INSERT ON credentials
+BEGIN
+    INSERT INTO credential_changes (id, door_id, expiry_date, active, revoked)
+    VALUES (NEW.id, NEW.door_id, NEW.expiry_date,
+            NEW.redeemed_at IS NULL AND NEW.revoked = 0, NEW.revoked);
+END;
+
+CREATE TRIGGER IF NOT EXISTS credentials_updated AFTER UPDATE OF redeemed_at, revoked ON credentials
+BEGIN
+    INSERT INTO credential_changes (id, door_id, expiry_date, active, revoked)
+    VALUES (NEW.id, NEW.door_id, NEW.expiry_date,
+            NEW.redeemed_at IS NULL AND NEW.revoked = 0, NEW.revoked);
+END;
+"""
+
+class CredentialStore:
+    """SQLite store of issued QR codes
+    
+    Expiry dates are stored as YYYY-MM-DD text, which sorts by date. As with
+    the QR code itself, a code is valid until the start of its expiry date.
+    The connection is shared between threads behind a lock; every operation
+    is a short transaction. Listeners are called in the order the changes
+    were made, whether they come from this store or from sync_changes().
+    """
+    
+    def __init__(self, db_path):
+        """Open (and create if needed) the credential store
+        
+        Args:
+            db_path (str): SQLite database file, or ':memory:'
+        """
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._issue_listeners = []
+        self._redeem_listeners = []
+        self._revoke_listeners = []
+        self._sync_listeners = []
+        # Held while a change is made and its listeners are called, so they
+        # see changes in order
+        self._notify_lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        
+        with self._lock:
+            # Readers never block the writer and commits do not fsync the
+            # database file, only the write-ahead log at checkpoints
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            
+            # Changes before now are in the table itself
+            self._change_seq = self._last_change_seq()
+            self._data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    def issue(self, qr_id, door_id, expiry_date, created_at=None):
+        """Store a newly issued code
+        
+        Args:
+            qr_id (str): QR code ID
+            door_id (str): Door ID
+            expiry_date (str): Expiry date in YYYY-MM-DD format
+            created_at (str, optional): ISO creation time. Defaults to now.
+        
+        Raises:
+            ValueError: If a code with this ID already exists
+        """
+        self.issue_many([(qr_id, door_id, expiry_date, created_at)])
+    
+    def issue_many(self, codes):
+        """Store many newly issued codes in one transaction
+        
+        Args:
+            codes (iterable): (qr_id, door_id, expiry_date, created_at) tuples;
+                              created_at may be None for now
+        
+        Raises:
+            ValueError: If one of the IDs already exists (nothing is stored)
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (qr_id, str(door_id), expiry_date, created_at or now)
+            for qr_id, door_id, expiry_date, created_at in codes
+        ]
+        
+        with self._notify_lock:
+            with self._lock:
+                try:
+                    self._conn.execute('BEGIN IMMEDIATE')
+                    self._conn.executemany(
+                        'INSERT INTO credentials (id, door_id, expiry_date, created_at) '
+                        'VALUES (?, ?, ?, ?)',
+                        rows
+                    )
+                    self._conn.execute('COMMIT')
+                except sqlite3.IntegrityError as e:
+                    self._conn.execute('ROLLBACK')
+                    raise ValueError(f"QR code ID already issued: {e}")
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+                self._skip_own_changes()
+            
+            issued = [(qr_id, door_id, expiry_date) for qr_id, door_id, expiry_date, _ in rows]
+            for callback in self._issue_listeners:
+                callback(issued)
+    
+    def get(self, qr_id):
+        """Look up a code by ID
+        
+        Args:
+            qr_id (str): QR code ID
+        
+        Returns:
+            Credential: The stored code (or None if unknown)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, door_id, expiry_date, created_at, redeemed_at, revoked '
+                'FROM credentials WHERE id = ?',
+                (qr_id,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        return Credential(*row[:5], bool(row[5]))
+    
+    def redeem(self, qr_id, door_id=None, today=None):
+        """Consume a code, at most once
+        
+        The check and the update are a single UPDATE statement, so two kiosks
+        (or two cameras) presenting the same code cannot both redeem it.
+        
+        Args:
+            qr_id (str): QR code ID
+            door_id (str, optional): Door the code claims; it must match the
+                                   door the code was issued for
+            today (date, optional): Current date. Defaults to today.
+        
+        Returns:
+            str: REDEEMED, or why the code was refused: UNKNOWN,
+                 ALREADY_REDEEMED, REVOKED or EXPIRED
+        """
+        today = (today or date.today()).isoformat()
+        door_id = None if door_id is None else str(door_id)
+        
+        with self._notify_lock:
+            with self._lock:
+                cursor = self._conn.execute(
+                    'UPDATE credentials SET redeemed_at = ? '
+                    'WHERE id = ? AND redeemed_at IS NULL AND revoked = 0 AND expiry_date > ? '
+                    'AND (? IS NULL OR door_id = ?)',
+                    (datetime.now().isoformat(), qr_id, today, door_id, door_id)
+                )
+                redeemed = cursor.rowcount == 1
+                if redeemed:
+                    self._skip_own_changes()
+                else:
+                    row = self._conn.execute(
+                        'SELECT redeemed_at, revoked, door_id FROM credentials WHERE id = ?',
+                        (qr_id,)
+                    ).fetchone()
+            
+            if redeemed:
+                for callback in self._redeem_listeners:
+                    callback(qr_id)
+                return REDEEMED
+        
+        return self._refusal(row, door_id)
+    
+    def redeem_unregistered(self, qr_id, door_id, expiry_date):
+        """Consume a code that was never stored, at most once
+        
+        The code is inserted as already redeemed in a single statement, so a
+        second scan of it (on any kiosk) is refused like any used code.
+        
+        Args:
+            qr_id (str): QR code ID
+            door_id (str): Door the code claims
+            expiry_date (str): Expiry date in YYYY-MM-DD format
+        
+        Returns:
+            str: REDEEMED, or why the code was refused: UNKNOWN (stored for
+                 another door), ALREADY_REDEEMED, REVOKED or EXPIRED
+        """
+        door_id = str(door_id)
+        now = datetime.now().isoformat()
+        
+        with self._notify_lock:
+            with self._lock:
+                cursor = self._conn.execute(
+                    'INSERT INTO credentials (id, door_id, expiry_date, created_at, redeemed_at) '
+                    'VALUES (?, ?, ?, ?, ?) ON CONFLICT (id) DO NOTHING',
+                    (qr_id, door_id, expiry_date, now, now)
+                )
+                redeemed = cursor.rowcount == 1
+                if redeemed:
+                    self._skip_own_changes()
+                else:
+                    row = self._conn.execute(
+                        'SELECT redeemed_at, revoked, door_id FROM credentials WHERE id = ?',
+                        (qr_id,)
+                    ).fetchone()
+            
+            if redeemed:
+                # Indexed like an issued code that was redeemed right away
+                for callback in self._issue_listeners:
+                    callback([(qr_id, door_id, expiry_date)])
+                for callback in self._redeem_listeners:
+                    callback(qr_id)
+                return REDEEMED
+        
+        return self._refusal(row, door_id)
+    
+    @staticmethod
+    def _refusal(row, door_id):
+        """Get why a stored code could not be redeemed
+        
+        Args:
+            row (tuple): (redeemed_at, revoked, door_id) of the code, or None
+            door_id (str): Door the code claims, or None
+        
+        Returns:
+            str: UNKNOWN, ALREADY_REDEEMED, REVOKED or EXPIRED
+        """
+        # A code presented for another door counts as unknown
+        if row is None or (door_id is not None and row[2] != door_id):
+            return UNKNOWN
+        if row[1]:
+            return REVOKED
+        if row[0] is not None:
+            return ALREADY_REDEEMED
+        return EXPIRED
+    
+    def add_issue_listener(self, callback):
+        """Register a callback for newly issued codes
+        
+        Args:
+            callback (callable): Called with a list of (qr_id, door_id,
+                               expiry_date) tuples after they were stored
+        """
+        self._issue_listeners.append(callback)
+    
+    def add_redeem_listener(self, callback):
+        """Register a callback for redeemed codes
+        
+        Args:
+            callback (callable): Called with the QR code ID after a code
+                               has been redeemed
+        """
+        self._redeem_listeners.append(callback)
+    
+    def add_revoke_listener(self, callback):
+        """Register a callback for new revocations
+        
+        Args:
+            callback (callable): Called with the QR code ID after a code
+                               has been revoked
+        """
+        self._revoke_listeners.append(callback)
+    
+    def add_sync_listener(self, callback):
+        """Register a callback for changes made by other processes
+        
+        Args:
+            callback (callable): Called by sync_changes() with a list of
+                               (qr_id, door_id, expiry_date, active, revoked)
+                               tuples, the state of each code after a change
+                               in the order of the changes. A change made by
+                               this store may be passed again.
+        """
+        self._sync_listeners.append(callback)
+    
+    def revoke(self, qr_id):
+        """Revoke a code
+        
+        Args:
+            qr_id (str): QR code ID
+        
+        Returns:
+            bool: True if the code existed and was not revoked yet
+        """
+        with self._notify_lock:
+            with self._lock:
+                cursor = self._conn.execute(
+                    'UPDATE credentials SET revoked = 1 WHERE id = ? AND revoked = 0',
+                    (qr_id,)
+                )
+                revoked = cursor.rowcount == 1
+                if revoked:
+                    self._skip_own_changes()
+            
+            if revoked:
+                for callback in self._revoke_listeners:
+                    callback(qr_id)
+        return revoked
+    
+    def revoked_ids(self, batch_size=500):
+        """Get the IDs of all revoked codes
+        
+        Args:
+            batch_size (int, optional): Rows read per lock hold. Defaults to 500.
+        
+        Returns:
+            list: Revoked QR code IDs
+        """
+        revoked = []
+        rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT rowid, id FROM credentials WHERE rowid > ? AND revoked = 1 '
+                    'ORDER BY rowid LIMIT ?',
+                    (rowid, batch_size)
+                ).fetchall()
+            
+            revoked.extend(qr_id for _, qr_id in rows)
+            if len(rows) < batch_size:
+                return revoked
+            rowid = rows[-1][0]
+    
+    def codes(self, batch_size=500):
+        """Get every stored code, for building in-memory indexes
+        
+        The table is read batch_size rows at a time, so other users of the
+        store get the lock in between.
+        
+        Args:
+            batch_size (int, optional): Rows read per lock hold. Defaults to 500.
+        
+        Returns:
+            list: (qr_id, door_id, expiry_date, active) tuples, where active
+                  means not redeemed and not revoked
+        """
+        codes = []
+        rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT rowid, id, door_id, expiry_date, redeemed_at IS NULL AND revoked = 0 '
+                    'FROM credentials WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (rowid, batch_size)
+                ).fetchall()
+            
+            codes.extend(
+                (qr_id, door_id, expiry_date, bool(active))
+                for _, qr_id, door_id, expiry_date, active in rows
+            )
+            if len(rows) < batch_size:
+                return codes
+            rowid = rows[-1][0]
+    
+    def purge(self, qr_ids):
+        """Delete codes, in one short transaction
+        
+        Args:
+            qr_ids (list): IDs of the codes to delete
+        
+        Returns:
+            int: Number of codes deleted
+        """
+        if not qr_ids:
+            return 0
+        
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN IMMEDIATE')
+                params = [(qr_id,) for qr_id in qr_ids]
+                cursor = self._conn.executemany('DELETE FROM credentials WHERE id = ?', params)
+                deleted = cursor.rowcount
+                # Nobody needs to follow changes of a deleted code
+                self._conn.executemany('DELETE FROM credential_changes WHERE id = ?', params)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        
+        return deleted
+    
+    def sync_changes(self, batch_size=500):
+        """Pass changes made by other processes to the sync listeners
+        
+        Codes issued by batch_issue.py, or redeemed or revoked by another
+        kiosk on the same database, reach no other listener of this store.
+        The change log is read from where the previous call stopped,
+        batch_size rows per lock hold; when no other connection has
+        committed since then, nothing is read.
+        
+        Args:
+            batch_size (int, optional): Changes read per lock hold.
+                                      Defaults to 500.
+        
+        Returns:
+            int: Number of changes passed on
+        """
+        with self._lock:
+            # Changes only when other connections commit
+            version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            if version == self._data_version:
+                return 0
+            # Unknown until the log has been read to its end
+            self._data_version = None
+        
+        synced = 0
+        while True:
+            with self._notify_lock:
+                with self._lock:
+                    rows = self._conn.execute(
+                        'SELECT seq, id, door_id, expiry_date, active, revoked '
+                        'FROM credential_changes WHERE seq > ? ORDER BY seq LIMIT ?',
+                        (self._change_seq, batch_size)
+                    ).fetchall()
+                    if rows:
+                        self._change_seq = rows[-1][0]
+                    if len(rows) < batch_size:
+                        self._data_version = version
+                
+                changes = [
+                    (qr_id, door_id, expiry_date, bool(active), bool(revoked))
+                    for _, qr_id, door_id, expiry_date, active, revoked in rows
+                ]
+                if changes:
+                    for callback in self._sync_listeners:
+                        callback(changes)
+            
+            synced += len(rows)
+            if len(rows) < batch_size:
+                return synced
+    
+    def _last_change_seq(self):
+        """Get the sequence number of the newest logged change (lock held)"""
+        return self._conn.execute('SELECT COALESCE(MAX(seq), 0) FROM credential_changes').fetchone()[0]
+    
+    def _skip_own_changes(self):
+        """Move past a change this store just made and tells its listeners about (lock held)
+        
+        Only while no other connection has committed since the log was last
+        read to its end, as their changes would be skipped too.
+        """
+        if self._data_version is None:
+            return
+        seq = self._last_change_seq()
+        # Read after the sequence number: a commit in between changes it
+        if self._conn.execute('PRAGMA data_version').fetchone()[0] == self._data_version:
+            self._change_seq = seq
+    
+    def count_active(self, door_id=None, today=None):
+        """Count codes that can still be redeemed
+        
+        Args:
+            door_id (str, optional): Only count codes for this door
+            today (date, optional): Current date. Defaults to today.
+        
+        Returns:
+            int: Number of active codes
+        """
+        today = (today or date.today()).isoformat()
+        query = ('SELECT COUNT(*) FROM credentials '
+                 'WHERE expiry_date > ? AND redeemed_at IS NULL AND revoked = 0')
+        params = [today]
+        
+        if door_id is not None:
+            query += ' AND door_id = ?'
+            params.append(str(door_id))
+        
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Shared QR decoder pool for SecureLocker application
+"""
+
+import threading
+
+class DecoderPool:
+    """Fixed set of decode threads shared by several scanners
+    
+    Each scanner keeps capturing into its own newest-frame buffer; the pool
+    workers serve those buffers round-robin. A scanner is decoded by at most
+    one worker at a time, so a busy camera cannot starve the others and the
+    number of decode threads stays bounded however many cameras are added.
+    """
+    
+    def __init__(self, workers=2):
+        """Initialize the decoder pool
+        
+        Args:
+            workers (int, optional): Number of decode threads. Defaults to 2.
+        """
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        self._scanners = []
+        self._busy = set()
+        self._next = 0
+        self._threads = []
+        self._running = False
+    
+    def start(self):
+        """Start the decode threads"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        
+        self._threads = [
+            threading.Thread(target=self._worker_loop, daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def stop(self):
+        """Stop the decode threads"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join(timeout=1.0)
+        self._threads = []
+    
+    def add(self, scanner):
+        """Serve a scanner's frame buffer
+        
+        Args:
+            scanner (QRScanner): Started scanner in pipeline mode
+        """
+        with self._cond:
+            if scanner not in self._scanners:
+                self._scanners.append(scanner)
+            self._cond.notify_all()
+    
+    def remove(self, scanner):
+        """Stop serving a scanner
+        
+        Args:
+            scanner (QRScanner): Scanner to remove
+        """
+        with self._cond:
+            if scanner in self._scanners:
+                self._scanners.remove(scanner)
+                self._next = 0
+    
+    def notify(self):
+        """Wake up a worker; called by scanners after capturing a frame"""
+        with self._cond:
+            self._cond.notify()
+    
+    def get_stats(self):
+        """Get per-camera decode statistics
+        
+        Returns:
+            dict: Number of workers and the stats of every scanner, in the
+                  order the scanners were added
+        """
+        with self._cond:
+            scanners = list(self._scanners)
+        
+        return {
+            'workers': self.workers,
+            'cameras': [
+                dict(scanner.get_stats(), source=scanner.source.describe())
+                for scanner in scanners
+            ]
+        }
+    
+    def _pick(self):
+        """Pick the next idle scanner with a frame waiting, round-robin
+        
+        Returns:
+            QRScanner: Scanner to decode next (or None if there is none)
+        """
+        count = len(self._scanners)
+        for offset in range(count):
+            index = (self._next + offset) % count
+            scanner = self._scanners[index]
+            if scanner not in self._busy and scanner.frame_pending:
+                self._next = index + 1
+                return scanner
+        return None
+    
+    def _worker_loop(self):
+        """Decode thread: decode the next scanner's newest frame"""
+        while True:
+            with self._cond:
+                scanner = None
+                while self._running:
+                    scanner = self._pick()
+                    if scanner is not None:
+                        break
+                    self._cond.wait(timeout=0.5)
+                
+                if scanner is None:
+                    return
+                self._busy.add(scanner)
+            
+            try:
+                scanner.decode_next()
+            finally:
+                with self._cond:
+                    self._busy.discard(scanner)
+                    # Another frame of this scanner may be waiting
+                    self._cond.notify()
\ No newline at end of file
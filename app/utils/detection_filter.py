@@ -0,0 +1,95 @@
+"""
+Detection filtering utilities for SecureLocker application
+"""
+
+import threading
+import time
+from collections import deque
+
+class DetectionConfirmer:
+    """Confirms QR detections over several frames and suppresses repeats
+    
+    A payload only fires once it has been decoded in at least confirm_frames
+    of the last window_frames decoded frames, so a single misread cannot
+    trigger a screen change. Once fired, the same payload is suppressed for
+    dedup_seconds.
+    """
+    
+    def __init__(self, confirm_frames=2, window_frames=3, dedup_seconds=3.0,
+                 clock=time.monotonic):
+        """Initialize the detection confirmer
+        
+        Args:
+            confirm_frames (int, optional): Frames a payload must appear in.
+                                          Defaults to 2.
+            window_frames (int, optional): Number of recent frames considered.
+                                         Defaults to 3.
+            dedup_seconds (float, optional): Window in which an identical
+                                           payload is not fired again.
+                                           Defaults to 3.0.
+            clock (callable, optional): Time source. Defaults to time.monotonic.
+        """
+        self.confirm_frames = max(1, confirm_frames)
+        self.window_frames = max(self.confirm_frames, window_frames)
+        self.dedup_seconds = dedup_seconds
+        self.clock = clock
+        
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=self.window_frames)
+        self._last_fired = {}
+        self.counters = {
+            'frames': 0,
+            'confirmed': 0,
+            'suppressed': 0
+        }
+    
+    def reset(self):
+        """Forget the frame history (recently fired payloads are kept)"""
+        with self._lock:
+            self._history.clear()
+    
+    def get_stats(self):
+        """Get the confirmation counters
+        
+        Returns:
+            dict: Frames seen, payloads confirmed and payloads suppressed
+        """
+        with self._lock:
+            return dict(self.counters)
+    
+    def update(self, payloads):
+        """Record the payloads decoded from one frame
+        
+        Args:
+            payloads (list): Payloads decoded from the frame (may be empty)
+        
+        Returns:
+            list: Payloads that are confirmed and should be reported now
+        """
+        now = self.clock()
+        current = set(payloads)
+        confirmed = []
+        
+        with self._lock:
+            self.counters['frames'] += 1
+            self._history.append(current)
+            
+            # Drop payloads whose suppression window has passed
+            for payload, fired_at in list(self._last_fired.items()):
+                if now - fired_at >= self.dedup_seconds:
+                    del self._last_fired[payload]
+            
+            for payload in current:
+                seen = sum(1 for frame_payloads in self._history if payload in frame_payloads)
+                if seen < self.confirm_frames:
+                    continue
+                
+                if payload in self._last_fired:
+                    self.counters['suppressed'] += 1
+                    continue
+                
+                self._last_fired[payload] = now
+                self.counters['confirmed'] += 1
+                confirmed.append(payload)
+        
+        return confirmed
\ No newline at end of file
@@ -0,0 +1,339 @@
+"""
+Expiry scheduler for SecureLocker application
+
+Keeps every stored code in a heap ordered by expiry date. Live codes are
+also counted per door and expiry date, so the live count of a door is
+exact at any moment without touching the heap or the store. A background
+thread pops expired codes off the heap and deletes them from the credential
+store in small, time-bounded batches, so neither the UI nor the store is
+ever held up by a large purge. Codes issued, redeemed or revoked by another
+process (e.g. batch_issue.py) are picked up from the store's change log by
+the same thread, a few hundred changes at a time.
+"""
+
+import heapq
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import date
+
+class ExpiryScheduler:
+    """Retires expired codes and keeps live counts per door
+    
+    A code is live while it has not expired, been redeemed or been revoked.
+    The scheduler follows the credential store through its listeners, so
+    the counts never need a scan of the table after start().
+    """
+    
+    def __init__(self, store, interval=60.0, batch_size=500, batch_budget=0.02,
+                 batch_pause=0.05, sync_interval=5.0, clock=None, on_error=None):
+        """Initialize the expiry scheduler
+        
+        Args:
+            store (CredentialStore): Store to follow and purge
+            interval (float, optional): Seconds between purge passes.
+                                      Defaults to 60.
+            batch_size (int, optional): Most codes deleted per transaction.
+                                      Defaults to 500.
+            batch_budget (float, optional): Seconds one batch may take; the
+                                          batch size is halved whenever a
+                                          batch takes longer. Defaults to 0.02.
+            batch_pause (float, optional): Pause between batches in seconds,
+                                         so other store users get the lock.
+                                         Defaults to 0.05.
+            sync_interval (float, optional): Seconds between reads of changes
+                                           made by other processes.
+                                           Defaults to 5.
+            clock (callable, optional): Returns the current date. Defaults
+                                      to date.today.
+            on_error (callable, optional): Called with an error message when
+                                         a purge pass fails
+        """
+        self.store = store
+        self.interval = interval
+        self.max_batch_size = max(1, batch_size)
+        self.batch_size = self.max_batch_size
+        self.batch_budget = batch_budget
+        self.batch_pause = batch_pause
+        self.sync_interval = sync_interval
+        self.clock = clock or date.today
+        self.on_error = on_error
+        
+        self._lock = threading.Lock()
+        self._heap = []
+        self._indexed = set()
+        self._live = {}
+        self._counts = Counter()
+        self._by_expiry = defaultdict(Counter)
+        self._expired = deque()
+        self._recording = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        
+        # Purge counters
+        self.purged = 0
+        self.passes = 0
+        self.errors = 0
+        self.longest_batch_ms = 0.0
+    
+    def load(self):
+        """Index every code in the store
+        
+        The store is read in batches without holding the lock, so neither
+        live_counts() nor other store users are held up. Listener events that
+        arrive meanwhile are recorded and applied again to the new index.
+        
+        Returns:
+            int: Number of codes indexed
+        """
+        with self._lock:
+            self._recording = []
+        
+        try:
+            codes = self.store.codes()
+        except Exception:
+            with self._lock:
+                self._recording = None
+            raise
+        
+        today = self.clock().isoformat()
+        with self._lock:
+            self._heap = [(expiry_date, qr_id) for qr_id, _, expiry_date, _ in codes]
+            heapq.heapify(self._heap)
+            self._indexed = {qr_id for qr_id, _, _, _ in codes}
+            self._live = {}
+            self._counts = Counter()
+            self._by_expiry = defaultdict(Counter)
+            for qr_id, door_id, expiry_date, active in codes:
+                if active:
+                    self._add_live(qr_id, door_id, expiry_date)
+            
+            for event, value in self._recording:
+                if event == 'issued':
+                    self._index_issued(value, today)
+                elif event == 'synced':
+                    self._index_synced(value, today)
+                else:
+                    self._remove_live(value)
+            self._recording = None
+        
+        return len(codes)
+    
+    def start(self):
+        """Index the store, follow it and start the purge thread"""
+        if self._thread is not None:
+            return
+        
+        self.load()
+        self.store.add_issue_listener(self._on_issued)
+        self.store.add_redeem_listener(self._on_retired)
+        self.store.add_revoke_listener(self._on_retired)
+        self.store.add_sync_listener(self._on_synced)
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._purge_loop, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the purge thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+    
+    def live_count(self, door_id):
+        """Get the number of live codes for a door
+        
+        Args:
+            door_id (str): Door ID
+        
+        Returns:
+            int: Live codes
+        """
+        return self.live_counts().get(str(door_id), 0)
+    
+    def live_counts(self):
+        """Get the number of live codes of every door
+        
+        Returns:
+            dict: Door ID to number of live codes
+        """
+        today = self.clock().isoformat()
+        with self._lock:
+            counts = Counter(self._counts)
+            # Codes that expired since the last purge pass; at most a few dates
+            for expiry_date, doors in self._by_expiry.items():
+                if expiry_date <= today:
+                    counts.subtract(doors)
+        
+        return {door_id: count for door_id, count in counts.items() if count > 0}
+    
+    def get_stats(self):
+        """Get scheduler statistics
+        
+        Returns:
+            dict: Indexed, live and waiting-to-purge codes, purge counters
+                  and the longest batch in milliseconds
+        """
+        live = sum(self.live_counts().values())
+        with self._lock:
+            return {
+                'indexed': len(self._heap),
+                'live': live,
+                'pending_purge': len(self._expired),
+                'purged': self.purged,
+                'passes': self.passes,
+                'errors': self.errors,
+                'longest_batch_ms': round(self.longest_batch_ms, 2)
+            }
+    
+    def _on_issued(self, codes):
+        """Store listener: index newly issued codes"""
+        today = self.clock().isoformat()
+        with self._lock:
+            if self._recording is not None:
+                self._recording.append(('issued', codes))
+            self._index_issued(codes, today)
+    
+    def _on_retired(self, qr_id):
+        """Store listener: a code was redeemed or revoked"""
+        with self._lock:
+            if self._recording is not None:
+                self._recording.append(('retired', qr_id))
+            self._remove_live(qr_id)
+    
+    def _on_synced(self, changes):
+        """Store sync listener: codes changed by another process"""
+        today = self.clock().isoformat()
+        with self._lock:
+            if self._recording is not None:
+                self._recording.append(('synced', changes))
+            self._index_synced(changes, today)
+    
+    def _index_issued(self, codes, today):
+        """Index newly issued codes (lock held)"""
+        for qr_id, door_id, expiry_date in codes:
+            self._index(qr_id, expiry_date)
+            if expiry_date > today:
+                self._add_live(qr_id, door_id, expiry_date)
+    
+    def _index_synced(self, changes, today):
+        """Apply the state of changed codes, in order (lock held)"""
+        for qr_id, door_id, expiry_date, active, _ in changes:
+            self._index(qr_id, expiry_date)
+            if active and expiry_date > today:
+                self._add_live(qr_id, door_id, expiry_date)
+            else:
+                self._remove_live(qr_id)
+    
+    def _index(self, qr_id, expiry_date):
+        """Put a code on the heap, if it is not there yet (lock held)"""
+        if qr_id not in self._indexed:
+            self._indexed.add(qr_id)
+            heapq.heappush(self._heap, (expiry_date, qr_id))
+    
+    def _add_live(self, qr_id, door_id, expiry_date):
+        """Count a live code, if it is not counted yet (lock held)"""
+        if qr_id in self._live:
+            return
+        self._live[qr_id] = (door_id, expiry_date)
+        self._counts[door_id] += 1
+        self._by_expiry[expiry_date][door_id] += 1
+    
+    def _remove_live(self, qr_id):
+        """Stop counting a code, if it is live (lock held)"""
+        entry = self._live.pop(qr_id, None)
+        if entry is None:
+            return
+        
+        door_id, expiry_date = entry
+        self._counts[door_id] -= 1
+        doors = self._by_expiry[expiry_date]
+        doors[door_id] -= 1
+        if not doors[door_id]:
+            del doors[door_id]
+            if not doors:
+                del self._by_expiry[expiry_date]
+    
+    def _advance(self, chunk=1000):
+        """Pop every code that has expired by today off the heap
+        
+        Codes expire at the start of their expiry date. The lock is taken
+        for at most chunk codes at a time.
+        
+        Args:
+            chunk (int, optional): Codes popped per lock hold
+        """
+        today = self.clock().isoformat()
+        while True:
+            with self._lock:
+                heap = self._heap
+                for _ in range(chunk):
+                    if not heap or heap[0][0] > today:
+                        return
+                    _, qr_id = heapq.heappop(heap)
+                    self._indexed.discard(qr_id)
+                    self._remove_live(qr_id)
+                    self._expired.append(qr_id)
+    
+    def _purge_pass(self):
+        """Delete expired codes from the store in time-bounded batches
+        
+        Returns:
+            int: Number of codes deleted
+        """
+        self._advance()
+        purged = 0
+        
+        while not self._stop_event.is_set():
+            start = time.monotonic()
+            deadline = start + self.batch_budget
+            
+            with self._lock:
+                count = min(self.batch_size, len(self._expired))
+                batch = [self._expired.popleft() for _ in range(count)]
+            if not batch:
+                break
+            
+            try:
+                deleted = self.store.purge(batch)
+            except Exception:
+                # Retried on the next pass
+                with self._lock:
+                    self._expired.extendleft(reversed(batch))
+                raise
+            purged += deleted
+            self.purged += deleted
+            
+            now = time.monotonic()
+            self.longest_batch_ms = max(self.longest_batch_ms, (now - start) * 1000)
+            
+            # Fit the batch size to the time budget
+            if now > deadline:
+                self.batch_size = max(1, self.batch_size // 2)
+            elif now - start < self.batch_budget / 2:
+                self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+            
+            self._stop_event.wait(self.batch_pause)
+        
+        self.passes += 1
+        return purged
+    
+    def _purge_loop(self):
+        """Purge thread: follow other processes' changes, purge every interval"""
+        next_pass = 0.0
+        while True:
+            try:
+                # Cheap while no other process writes; small batches otherwise
+                self.store.sync_changes(self.max_batch_size)
+                
+                if time.monotonic() >= next_pass:
+                    next_pass = time.monotonic() + self.interval
+                    self._purge_pass()
+            except Exception as e:
+                self.errors += 1
+                if self.on_error:
+                    self.on_error(f"Expiry purge failed: {str(e)}")
+            
+            if self._stop_event.wait(min(self.sync_interval, self.interval)):
+                break
\ No newline at end of file
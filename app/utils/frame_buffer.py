@@ -0,0 +1,137 @@
+"""
+Frame buffer utilities for SecureLocker application
+"""
+
+import threading
+import time
+
+class LatestFrameBuffer:
+    """One-slot buffer that only ever holds the newest camera frame
+    
+    The capture stage overwrites the slot with every new frame, so a slow
+    consumer always picks up the freshest frame instead of working through
+    a backlog. Frames that are overwritten before any decoder took them are
+    counted as dropped.
+    """
+    
+    def __init__(self, on_put=None):
+        """Initialize an empty frame buffer
+        
+        Args:
+            on_put (callable, optional): Called without arguments after every
+                                       new frame, e.g. to wake up a decoder
+                                       pool that serves several buffers.
+        """
+        self._cond = threading.Condition()
+        self._frame = None
+        self._stamp = None
+        self._seq = 0
+        self._taken_seq = 0
+        self._closed = False
+        self.on_put = on_put
+        self.dropped = 0
+    
+    @property
+    def closed(self):
+        """bool: True once the buffer has been closed"""
+        return self._closed
+    
+    @property
+    def pending(self):
+        """bool: True if the newest frame has not been taken yet"""
+        return self._seq > self._taken_seq
+    
+    def put(self, frame):
+        """Store a new frame, replacing the previous one
+        
+        Args:
+            frame (numpy.ndarray): Newly captured frame
+        
+        Returns:
+            int: Sequence number assigned to the frame
+        """
+        with self._cond:
+            # The previous frame was never handed to a decoder
+            if self._seq > self._taken_seq:
+                self.dropped += 1
+            
+            self._frame = frame
+            self._stamp = time.monotonic()
+            self._seq += 1
+            seq = self._seq
+            self._cond.notify_all()
+        
+        if self.on_put is not None:
+            self.on_put()
+        
+        return seq
+    
+    def take(self, timeout=None, timestamped=False):
+        """Take the newest frame that has not been taken yet
+        
+        Args:
+            timeout (float, optional): Seconds to wait for a fresh frame.
+                                     Waits forever if None.
+            timestamped (bool, optional): Also return the time.monotonic()
+                                        time the frame was stored.
+                                        Defaults to False.
+        
+        Returns:
+            numpy.ndarray: Newest frame (or None on timeout or when closed
+                           and drained), or a (frame, timestamp) tuple if
+                           timestamped is True
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._closed or self._seq > self._taken_seq,
+                timeout
+            )
+            if self._seq <= self._taken_seq:
+                return (None, None) if timestamped else None
+            
+            self._taken_seq = self._seq
+            self._cond.notify_all()
+            return (self._frame, self._stamp) if timestamped else self._frame
+    
+    def wait_taken(self, timeout=None):
+        """Wait until the current frame has been taken by a consumer
+        
+        Lets a producer that must not lose frames (e.g. a file replayed as
+        fast as possible) run at the pace of the decoders.
+        
+        Args:
+            timeout (float, optional): Seconds to wait. Waits forever if None.
+        
+        Returns:
+            bool: True if the frame was taken or the buffer is closed
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._closed or self._seq <= self._taken_seq,
+                timeout
+            )
+    
+    def wait_newer(self, seq, timeout=None):
+        """Wait for a frame newer than the given sequence number
+        
+        Unlike take(), this does not mark the frame as consumed, so it can be
+        used for the preview without starving the decoders.
+        
+        Args:
+            seq (int): Sequence number of the last frame seen by the caller
+            timeout (float, optional): Seconds to wait. Waits forever if None.
+        
+        Returns:
+            tuple: (seq, frame) of the newest frame, or (seq, None) on timeout
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed or self._seq > seq, timeout)
+            if self._seq <= seq:
+                return seq, None
+            return self._seq, self._frame
+    
+    def close(self):
+        """Close the buffer and wake up all waiting consumers"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
\ No newline at end of file
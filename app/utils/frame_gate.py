@@ -0,0 +1,135 @@
+"""
+Frame gating utilities for SecureLocker application
+"""
+
+import threading
+import cv2
+import numpy as np
+
+class FrameGate:
+    """Cheap pre-decode check that skips unchanged or blurry frames
+    
+    Each frame is reduced to a small thumbnail and compared with the last
+    frame that was let through. Sharpness is scored with the variance of the
+    Laplacian on a reduced copy. Only frames that changed and are sharp
+    enough are passed on to the decoder. An unchanged frame still passes when
+    it is clearly sharper than the reference, and a pass is forced after too
+    many skipped frames so a code held perfectly still is retried.
+    """
+    
+    def __init__(self, diff_threshold=4.0, sharpness_threshold=60.0,
+                 sharper_ratio=1.5, max_skipped=15, thumb_size=(32, 24),
+                 sharpness_width=320):
+        """Initialize the frame gate
+        
+        Args:
+            diff_threshold (float, optional): Mean absolute thumbnail difference
+                                            that counts as a change. Defaults to 4.0.
+            sharpness_threshold (float, optional): Minimum Laplacian variance.
+                                                 Defaults to 60.0.
+            sharper_ratio (float, optional): How much sharper an unchanged frame
+                                           must be to pass. Defaults to 1.5.
+            max_skipped (int, optional): Force a pass after this many skipped
+                                       frames. Defaults to 15.
+            thumb_size (tuple, optional): Thumbnail size used for the
+                                        difference. Defaults to (32, 24).
+            sharpness_width (int, optional): Width the frame is reduced to
+                                           before scoring sharpness. Defaults to 320.
+        """
+        self.diff_threshold = diff_threshold
+        self.sharpness_threshold = sharpness_threshold
+        self.sharper_ratio = sharper_ratio
+        self.max_skipped = max_skipped
+        self.thumb_size = thumb_size
+        self.sharpness_width = sharpness_width
+        
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Forget the reference frame and clear all counters"""
+        with self._lock:
+            self._reference = None
+            self._reference_sharpness = 0.0
+            self._skipped = 0
+            self.last_diff = 0.0
+            self.last_sharpness = 0.0
+            self.counters = {
+                'checked': 0,
+                'passed': 0,
+                'unchanged': 0,
+                'blurry': 0,
+                'sharper': 0,
+                'forced': 0
+            }
+    
+    def get_stats(self):
+        """Get the gate decision counters
+        
+        Returns:
+            dict: Counters plus the last difference and sharpness scores
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats['last_diff'] = round(self.last_diff, 2)
+            stats['last_sharpness'] = round(self.last_sharpness, 2)
+        return stats
+    
+    def sharpness(self, gray):
+        """Score the sharpness of a grayscale frame
+        
+        Args:
+            gray (numpy.ndarray): Single-channel 8-bit image
+        
+        Returns:
+            float: Variance of the Laplacian (higher is sharper)
+        """
+        height, width = gray.shape[:2]
+        if width > self.sharpness_width:
+            scale = self.sharpness_width / width
+            gray = cv2.resize(gray, (self.sharpness_width, max(1, int(height * scale))),
+                              interpolation=cv2.INTER_AREA)
+        return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    
+    def check(self, gray):
+        """Decide whether a frame is worth decoding
+        
+        Args:
+            gray (numpy.ndarray): Single-channel 8-bit image
+        
+        Returns:
+            bool: True if the frame should be decoded
+        """
+        thumb = cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+        sharpness = self.sharpness(gray)
+        
+        with self._lock:
+            self.counters['checked'] += 1
+            self.last_sharpness = sharpness
+            
+            if self._reference is None:
+                diff = float('inf')
+            else:
+                diff = float(np.mean(cv2.absdiff(thumb, self._reference)))
+            self.last_diff = diff if self._reference is not None else 0.0
+            
+            if sharpness < self.sharpness_threshold:
+                self.counters['blurry'] += 1
+                self._skipped += 1
+                return False
+            
+            if diff < self.diff_threshold:
+                if sharpness >= self._reference_sharpness * self.sharper_ratio:
+                    self.counters['sharper'] += 1
+                elif self._skipped >= self.max_skipped:
+                    self.counters['forced'] += 1
+                else:
+                    self.counters['unchanged'] += 1
+                    self._skipped += 1
+                    return False
+            
+            self._reference = thumb
+            self._reference_sharpness = sharpness
+            self._skipped = 0
+            self.counters['passed'] += 1
+            return True
\ No newline at end of file
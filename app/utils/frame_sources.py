@@ -0,0 +1,348 @@
+"""
+Frame sources for the SecureLocker QR scanner
+
+A frame source hands BGR frames to QRScanner. Besides the live camera,
+recorded video, image directories and in-memory generators can be replayed,
+either paced in real time or as fast as possible.
+"""
+
+import os
+import time
+import cv2
+
+from app.utils.capture_profiles import (
+    apply_capture_profile, get_capture_profile, select_capture_profile
+)
+
+# File extensions read by ImageDirectorySource
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+class FramePacer:
+    """Sleeps between frames to replay a source at a fixed frame rate"""
+    
+    def __init__(self, fps, realtime=True):
+        """Initialize the pacer
+        
+        Args:
+            fps (float): Target frames per second
+            realtime (bool, optional): Pace frames in real time. If False,
+                                     frames are delivered as fast as possible.
+        """
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.realtime = realtime
+        self.reset()
+    
+    def reset(self):
+        """Restart the pacing schedule"""
+        self._start = None
+        self._count = 0
+    
+    def wait(self):
+        """Wait until the next frame is due"""
+        if not self.realtime or not self.interval:
+            return
+        
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        
+        due = self._start + self._count * self.interval
+        self._count += 1
+        
+        if due > now:
+            time.sleep(due - now)
+        elif now - due > self.interval * 5:
+            # Fell far behind (e.g. the reader was paused), restart the schedule
+            self._start = now
+            self._count = 1
+
+class FrameSource:
+    """Base class for frame sources"""
+    
+    # True for sources that deliver frames at their own pace (cameras)
+    live = False
+    
+    # False for recorded sources replayed as fast as possible
+    realtime = True
+    
+    def open(self):
+        """Open the source
+        
+        Returns:
+            bool: True if the source was opened successfully
+        """
+        raise NotImplementedError
+    
+    def read(self):
+        """Read the next frame
+        
+        Returns:
+            tuple: (success flag, BGR frame or None)
+        """
+        raise NotImplementedError
+    
+    def release(self):
+        """Release the source"""
+        pass
+    
+    def frame_decoded(self):
+        """Called by the scanner when a QR code was decoded from a frame of this source"""
+        pass
+    
+    def read_error_message(self):
+        """Get the error reported when read() returns no frame
+        
+        Returns:
+            str: Error message; recorded sources have simply run out of frames
+        """
+        return f"Source exhausted: no more frames from {self.describe()}"
+    
+    def describe(self):
+        """Get a short description of the source
+        
+        Returns:
+            str: Human readable description
+        """
+        return self.__class__.__name__
+
+class CameraSource(FrameSource):
+    """Live camera through cv2.VideoCapture"""
+    
+    live = True
+    
+    def __init__(self, camera_id=0, profile=None, profile_cache_path=None):
+        """Initialize the camera source
+        
+        Args:
+            camera_id (int, optional): Camera device ID. Defaults to 0.
+            profile (str or CaptureProfile, optional): Capture profile to
+                                                     apply, 'auto' to probe
+                                                     for the lowest-latency
+                                                     one, or None for the
+                                                     driver defaults.
+            profile_cache_path (str, optional): Cache for the 'auto' probe
+        """
+        self.camera_id = camera_id
+        self.profile = profile
+        self.profile_cache_path = profile_cache_path
+        self.cap = None
+        
+        # Settings the driver accepted for the applied profile
+        self.negotiated = None
+    
+    def open(self):
+        """Open the camera and apply the capture profile"""
+        profile = self.profile
+        if profile == 'auto':
+            # Probing opens the camera itself, so it has to run first
+            profile = select_capture_profile(self.camera_id, self.profile_cache_path)
+        
+        self.cap = cv2.VideoCapture(self.camera_id)
+        if not self.cap.isOpened():
+            return False
+        
+        if profile is not None:
+            self.negotiated = apply_capture_profile(self.cap, get_capture_profile(profile))
+        
+        return True
+    
+    def read(self):
+        """Read the next camera frame"""
+        if self.cap is None:
+            return False, None
+        return self.cap.read()
+    
+    def release(self):
+        """Release the camera"""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
+    def read_error_message(self):
+        """Get the error reported when the camera returns no frame"""
+        return "Failed to read from camera"
+    
+    def describe(self):
+        """Describe the camera source"""
+        return f"camera {self.camera_id}"
+
+class VideoFileSource(FrameSource):
+    """Recorded video file"""
+    
+    def __init__(self, path, realtime=True, loop=False, fps=None):
+        """Initialize the video file source
+        
+        Args:
+            path (str): Path to the video file
+            realtime (bool, optional): Replay at the recorded frame rate.
+                                     Defaults to True.
+            loop (bool, optional): Restart at the end of the file. Defaults to False.
+            fps (float, optional): Override the frame rate stored in the file.
+        """
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.fps = fps
+        self.cap = None
+        self._pacer = None
+    
+    def open(self):
+        """Open the video file"""
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        
+        fps = self.fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._pacer = FramePacer(fps, self.realtime)
+        return True
+    
+    def read(self):
+        """Read the next video frame"""
+        if self.cap is None:
+            return False, None
+        
+        self._pacer.wait()
+        ret, frame = self.cap.read()
+        
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        
+        return ret, frame
+    
+    def release(self):
+        """Close the video file"""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
+    def describe(self):
+        """Describe the video file source"""
+        return f"video {self.path}"
+
+class ImageDirectorySource(FrameSource):
+    """Directory of still images, read in file name order"""
+    
+    def __init__(self, path, fps=10.0, realtime=True, loop=False):
+        """Initialize the image directory source
+        
+        Args:
+            path (str): Directory containing the images
+            fps (float, optional): Replay frame rate. Defaults to 10.
+            realtime (bool, optional): Pace frames in real time. Defaults to True.
+            loop (bool, optional): Restart after the last image. Defaults to False.
+        """
+        self.path = path
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.files = []
+        self._index = 0
+        self._pacer = FramePacer(fps, realtime)
+    
+    def open(self):
+        """List the images in the directory"""
+        if not os.path.isdir(self.path):
+            return False
+        
+        self.files = sorted(
+            os.path.join(self.path, name)
+            for name in os.listdir(self.path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._index = 0
+        self._pacer.reset()
+        return bool(self.files)
+    
+    def read(self):
+        """Read the next image"""
+        # Skip unreadable files, but give up after a full pass without a frame
+        for _ in range(len(self.files)):
+            if self._index >= len(self.files):
+                if not self.loop:
+                    break
+                self._index = 0
+            
+            path = self.files[self._index]
+            self._index += 1
+            
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is not None:
+                self._pacer.wait()
+                return True, frame
+        
+        return False, None
+    
+    def describe(self):
+        """Describe the image directory source"""
+        return f"images {self.path}"
+
+class GeneratorSource(FrameSource):
+    """In-memory frames from an iterable or a generator function"""
+    
+    def __init__(self, frames, fps=30.0, realtime=False):
+        """Initialize the generator source
+        
+        Args:
+            frames (iterable or callable): BGR frames, or a function returning
+                                         a fresh iterable each time the source
+                                         is opened.
+            fps (float, optional): Frame rate used for real-time pacing.
+                                 Defaults to 30.
+            realtime (bool, optional): Pace frames in real time. Defaults to False.
+        """
+        self.frames = frames
+        self.fps = fps
+        self.realtime = realtime
+        self._iterator = None
+        self._pacer = FramePacer(fps, realtime)
+    
+    def open(self):
+        """Start iterating over the frames"""
+        frames = self.frames() if callable(self.frames) else self.frames
+        self._iterator = iter(frames)
+        self._pacer.reset()
+        return True
+    
+    def read(self):
+        """Read the next generated frame"""
+        if self._iterator is None:
+            return False, None
+        
+        try:
+            frame = next(self._iterator)
+        except StopIteration:
+            return False, None
+        
+        self._pacer.wait()
+        return True, frame
+    
+    def release(self):
+        """Stop iterating"""
+        self._iterator = None
+
+def create_frame_source(spec=None, realtime=True, loop=False, capture_profile=None,
+                        profile_cache_path=None):
+    """Create a frame source from a simple specification
+    
+    Args:
+        spec (int or str, optional): Camera ID, video file path or image
+                                   directory. Defaults to camera 0.
+        realtime (bool, optional): Pace recorded sources in real time.
+        loop (bool, optional): Loop recorded sources.
+        capture_profile (str, optional): Capture profile for cameras
+        profile_cache_path (str, optional): Cache for the 'auto' profile probe
+    
+    Returns:
+        FrameSource: The frame source
+    """
+    if spec is None:
+        spec = 0
+    
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), capture_profile, profile_cache_path)
+    
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime, loop=loop)
+    
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
\ No newline at end of file
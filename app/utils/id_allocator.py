@@ -0,0 +1,146 @@
+"""
+QR code ID allocation utilities for SecureLocker application
+
+IDs are drawn from the operating system's cryptographic random source and
+checked against an in-memory index of IDs in use, so no two codes ever share
+an ID. Random bytes are mapped to ID characters with a single
+bytes.translate() call: bytes that would bias the mapping are deleted in the
+same call (rejection sampling), so every character is equally likely.
+"""
+
+import secrets
+import string
+import threading
+
+# Default ID alphabet and length (as generated by QRGenerator)
+DEFAULT_ALPHABET = string.ascii_uppercase + string.digits
+DEFAULT_LENGTH = 8
+
+class IDAllocator:
+    """Hands out unique random QR code IDs, one at a time or in bulk
+    
+    Every ID handed out is reserved in the index until it is released.
+    """
+    
+    def __init__(self, alphabet=DEFAULT_ALPHABET, length=DEFAULT_LENGTH, reserved=None):
+        """Initialize the ID allocator
+        
+        Args:
+            alphabet (str, optional): ID characters (ASCII, at most 256)
+            length (int, optional): Default ID length. Defaults to 8.
+            reserved (iterable, optional): IDs already in use, e.g. the codes
+                                         in the credential store
+        """
+        if not 1 < len(alphabet) <= 256 or len(set(alphabet)) != len(alphabet):
+            raise ValueError("ID alphabet must have 2 to 256 distinct characters")
+        
+        self.alphabet = alphabet
+        self.length = length
+        
+        # Bytes below the largest multiple of the alphabet size map evenly
+        # onto the alphabet; the rest are rejected
+        self._accepted = 256 - 256 % len(alphabet)
+        self._table = bytes(
+            ord(alphabet[value % len(alphabet)]) if value < self._accepted else 0
+            for value in range(256)
+        )
+        self._rejected = bytes(range(self._accepted, 256))
+        
+        self._lock = threading.Lock()
+        self._live = set(reserved or ())
+        
+        # Candidates drawn that were already in use
+        self.collisions = 0
+    
+    def __len__(self):
+        """Get the number of reserved IDs"""
+        return len(self._live)
+    
+    def __contains__(self, qr_id):
+        """Check whether an ID is reserved"""
+        return qr_id in self._live
+    
+    @property
+    def space(self):
+        """int: Number of possible IDs of the default length"""
+        return len(self.alphabet) ** self.length
+    
+    def _random_text(self, count):
+        """Draw uniformly distributed random ID characters
+        
+        Args:
+            count (int): Number of characters
+        
+        Returns:
+            str: Random characters
+        """
+        text = b''
+        while len(text) < count:
+            missing = count - len(text)
+            # Enough bytes that rejections rarely need a second round
+            raw = secrets.token_bytes(missing * 256 // self._accepted + 16)
+            text += raw.translate(self._table, self._rejected)
+        return text[:count].decode('ascii')
+    
+    def allocate(self, count=1, length=None):
+        """Allocate and reserve new unique IDs
+        
+        Args:
+            count (int, optional): Number of IDs. Defaults to 1.
+            length (int, optional): ID length. Defaults to self.length.
+        
+        Returns:
+            list: New IDs, none of which was reserved before
+        
+        Raises:
+            RuntimeError: If the ID space is nearly exhausted
+        """
+        length = length or self.length
+        ids = []
+        
+        with self._lock:
+            if len(self._live) + count > len(self.alphabet) ** length // 2:
+                raise RuntimeError("Not enough free QR code IDs")
+            
+            while len(ids) < count:
+                needed = count - len(ids)
+                text = self._random_text(needed * length)
+                candidates = [text[i:i + length] for i in range(0, len(text), length)]
+                
+                # Drop duplicates within the batch and IDs already in use
+                fresh = [qr_id for qr_id in dict.fromkeys(candidates) if qr_id not in self._live]
+                self.collisions += len(candidates) - len(fresh)
+                
+                self._live.update(fresh)
+                ids.extend(fresh)
+        
+        return ids
+    
+    def allocate_one(self, length=None):
+        """Allocate and reserve one new unique ID
+        
+        Args:
+            length (int, optional): ID length. Defaults to self.length.
+        
+        Returns:
+            str: New ID
+        """
+        return self.allocate(1, length)[0]
+    
+    def reserve(self, qr_ids):
+        """Mark IDs as in use
+        
+        Args:
+            qr_ids (iterable): IDs issued elsewhere
+        """
+        with self._lock:
+            self._live.update(qr_ids)
+    
+    def release(self, qr_ids):
+        """Make IDs available again
+        
+        Args:
+            qr_ids (iterable): IDs no longer in use
+        """
+        with self._lock:
+            self._live.difference_update(qr_ids)
\ No newline at end of file
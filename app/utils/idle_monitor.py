@@ -0,0 +1,119 @@
+"""
+Idle detection utilities for SecureLocker application
+"""
+
+import threading
+import time
+import cv2
+import numpy as np
+
+class IdleMonitor:
+    """Detects when nothing moves in front of the camera
+    
+    Every frame is reduced to a small grayscale thumbnail and compared with
+    the previous one. When no difference above the motion threshold has been
+    seen for idle_timeout seconds the monitor goes idle, and the scanner
+    drops to idle_fps and stops decoding. The first frame with motion wakes
+    it up again.
+    """
+    
+    def __init__(self, idle_timeout=30.0, motion_threshold=3.0, idle_fps=2.0,
+                 thumb_size=(32, 24), clock=time.monotonic):
+        """Initialize the idle monitor
+        
+        Args:
+            idle_timeout (float, optional): Seconds without motion before going
+                                          idle. Defaults to 30.
+            motion_threshold (float, optional): Mean absolute thumbnail
+                                              difference that counts as motion.
+                                              Defaults to 3.0.
+            idle_fps (float, optional): Frame rate while idle. Defaults to 2.
+            thumb_size (tuple, optional): Thumbnail size used for the
+                                        difference. Defaults to (32, 24).
+            clock (callable, optional): Time source in seconds
+        """
+        self.idle_timeout = idle_timeout
+        self.motion_threshold = motion_threshold
+        self.idle_interval = 1.0 / idle_fps
+        self.thumb_size = thumb_size
+        self.clock = clock
+        
+        self._lock = threading.Lock()
+        self.reset()
+    
+    @property
+    def idle(self):
+        """bool: True while no motion has been seen for idle_timeout"""
+        return self._idle
+    
+    def reset(self):
+        """Start a new active period and clear all counters"""
+        with self._lock:
+            self._previous = None
+            self._idle = False
+            self._idle_since = None
+            self._last_motion = self.clock()
+            self.last_diff = 0.0
+            self.counters = {
+                'frames': 0,
+                'idle_frames': 0,
+                'idle_entries': 0,
+                'wakeups': 0
+            }
+            self._idle_seconds = 0.0
+    
+    def get_stats(self):
+        """Get idle statistics
+        
+        Returns:
+            dict: Frame and transition counters, the current state and the
+                  total time spent idle
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            idle_seconds = self._idle_seconds
+            if self._idle:
+                idle_seconds += self.clock() - self._idle_since
+            stats['idle'] = self._idle
+            stats['idle_seconds'] = round(idle_seconds, 1)
+            stats['last_diff'] = round(self.last_diff, 2)
+        return stats
+    
+    def update(self, frame):
+        """Check a frame for motion and update the idle state
+        
+        Args:
+            frame (numpy.ndarray): BGR or grayscale frame
+        
+        Returns:
+            bool: True if the scanner should stay idle for this frame
+        """
+        # Shrink first so the colour conversion only touches the thumbnail
+        thumb = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        
+        now = self.clock()
+        
+        with self._lock:
+            self.counters['frames'] += 1
+            
+            if self._previous is not None:
+                self.last_diff = float(np.mean(cv2.absdiff(thumb, self._previous)))
+            self._previous = thumb
+            
+            if self.last_diff >= self.motion_threshold:
+                self._last_motion = now
+                if self._idle:
+                    self._idle = False
+                    self._idle_seconds += now - self._idle_since
+                    self.counters['wakeups'] += 1
+            elif not self._idle and now - self._last_motion >= self.idle_timeout:
+                self._idle = True
+                self._idle_since = now
+                self.counters['idle_entries'] += 1
+            
+            if self._idle:
+                self.counters['idle_frames'] += 1
+            
+            return self._idle
\ No newline at end of file
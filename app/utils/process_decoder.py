@@ -0,0 +1,289 @@
+"""
+Process-based QR decoding for SecureLocker application
+
+Decoding runs in worker processes so it does not compete with the Tk main
+thread for the GIL. Frames are handed over through a fixed ring of
+shared-memory slots: the caller copies the grayscale image into a free slot
+and only the slot number and image shape travel through the task queue, so
+frames are never pickled. Workers send back the decoded payloads and
+polygons only.
+
+Requires Python 3.8+ (multiprocessing.shared_memory).
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import queue
+import threading
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python older than 3.8
+    shared_memory = None
+
+from app.utils.qr_decoders import DecodedQR, QRDecoder, create_decoder
+
+# Default slot size in bytes: one 1080p grayscale frame
+DEFAULT_SLOT_SIZE = 1920 * 1080
+
+# Seconds a caller waits for a free slot or for its result
+DECODE_TIMEOUT = 5.0
+
+def _attach_shared_memory(name):
+    """Attach to the parent's shared memory block from a worker process
+    
+    Only the parent owns (and unlinks) the block, so the worker does not
+    track it.
+    
+    Args:
+        name (str): Shared memory block name
+    
+    Returns:
+        SharedMemory: Attached block
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always tracks attached blocks, but spawned workers
+        # share the parent's resource tracker, which already knows the block
+        return shared_memory.SharedMemory(name=name)
+
+def _worker_main(shm_name, slot_size, backend, tasks, results):
+    """Worker process: decode frames from the shared-memory ring
+    
+    Args:
+        shm_name (str): Name of the shared memory block holding the slots
+        slot_size (int): Size of one slot in bytes
+        backend (str): Decoder backend name
+        tasks (multiprocessing.Queue): (call ID, slot, height, width) tasks,
+                                       None to exit
+        results (multiprocessing.Queue): (call ID, slot, decoded) results
+    """
+    shm = _attach_shared_memory(shm_name)
+    decoder = create_decoder(backend)
+    
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            
+            call_id, slot, height, width = task
+            gray = np.ndarray((height, width), np.uint8, buffer=shm.buf, offset=slot * slot_size)
+            
+            try:
+                decoded = [
+                    (obj.data, [(int(x), int(y)) for x, y in obj.polygon])
+                    for obj in decoder.decode(gray)
+                ]
+            except Exception:
+                decoded = []
+            
+            # Release the view before the block can be closed
+            del gray
+            results.put((call_id, slot, decoded))
+    finally:
+        shm.close()
+
+class ProcessDecoder(QRDecoder):
+    """Decoder backend that runs another backend in worker processes
+    
+    decode() may be called from several threads at once; each call occupies
+    one slot of the shared-memory ring until its result comes back. Use as
+    many decode threads as there are processes to keep all of them busy.
+    """
+    
+    name = 'process'
+    
+    @classmethod
+    def is_available(cls):
+        """Check if shared memory is supported (Python 3.8+)"""
+        return shared_memory is not None
+    
+    def __init__(self, backend=None, processes=None, slots=None, slot_size=DEFAULT_SLOT_SIZE):
+        """Initialize the process decoder
+        
+        Args:
+            backend (str, optional): Backend run by the workers. Defaults to
+                                   the first available backend.
+            processes (int, optional): Worker processes. Defaults to the
+                                     number of CPU cores.
+            slots (int, optional): Shared-memory frame slots. Defaults to
+                                 twice the number of processes.
+            slot_size (int, optional): Largest grayscale image in bytes.
+                                     Larger images are decoded in-process.
+        """
+        if not self.is_available():
+            raise RuntimeError("Process decoding requires Python 3.8 or newer")
+        
+        # Also used for images that do not fit into a slot
+        self.local_decoder = create_decoder(backend)
+        self.backend = self.local_decoder.name
+        self.processes = max(1, processes or multiprocessing.cpu_count())
+        self.parallel = self.processes
+        self.slots = max(self.processes, slots or 2 * self.processes)
+        self.slot_size = slot_size
+        
+        self._lock = threading.Lock()
+        self._shm = None
+        self._ring = None
+        self._free_slots = queue.Queue()
+        self._workers = []
+        self._tasks = None
+        self._results = None
+        self._results_thread = None
+        self._pending = {}
+        self._call_ids = itertools.count()
+        self._started = False
+        self._closed = False
+        
+        # Decode counters
+        self.counters = {
+            'remote': 0,
+            'local': 0,
+            'timeouts': 0
+        }
+    
+    def start(self):
+        """Create the shared-memory ring and start the worker processes"""
+        with self._lock:
+            if self._started or self._closed:
+                return
+            self._started = True
+            
+            self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_size)
+            self._ring = np.ndarray((self.slots, self.slot_size), np.uint8, buffer=self._shm.buf)
+            for slot in range(self.slots):
+                self._free_slots.put(slot)
+            
+            # Spawned workers do not inherit the Tk process state or threads
+            context = multiprocessing.get_context('spawn')
+            self._tasks = context.Queue()
+            self._results = context.Queue()
+            self._workers = [
+                context.Process(
+                    target=_worker_main,
+                    args=(self._shm.name, self.slot_size, self.backend, self._tasks, self._results),
+                    daemon=True
+                )
+                for _ in range(self.processes)
+            ]
+            for worker in self._workers:
+                worker.start()
+            
+            self._results_thread = threading.Thread(target=self._results_loop, daemon=True)
+            self._results_thread.start()
+        
+        # Worker processes and the shared memory must not outlive the app
+        atexit.register(self.close)
+    
+    def close(self):
+        """Stop the worker processes and free the shared memory"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            started = self._started
+        
+        if not started:
+            return
+        
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        
+        # Wakes up the results thread
+        self._results.put(None)
+        self._results_thread.join(timeout=1.0)
+        
+        # Callers still waiting give up with an empty result
+        with self._lock:
+            for waiter in self._pending.values():
+                waiter[0].set()
+            self._pending.clear()
+        
+        self._ring = None
+        self._shm.close()
+        self._shm.unlink()
+    
+    def get_stats(self):
+        """Get decode counters
+        
+        Returns:
+            dict: Decodes done by the workers and in-process, and calls that
+                  timed out
+        """
+        with self._lock:
+            stats = dict(self.counters)
+        stats['processes'] = self.processes
+        stats['slots'] = self.slots
+        return stats
+    
+    def decode(self, gray):
+        """Decode QR codes from a grayscale image in a worker process
+        
+        Args:
+            gray (numpy.ndarray): Single-channel 8-bit image
+        
+        Returns:
+            list: DecodedQR results
+        """
+        if not self._started:
+            self.start()
+        
+        height, width = gray.shape[:2]
+        if self._closed or height * width > self.slot_size:
+            with self._lock:
+                self.counters['local'] += 1
+            return self.local_decoder.decode(gray)
+        
+        try:
+            slot = self._free_slots.get(timeout=DECODE_TIMEOUT)
+        except queue.Empty:
+            with self._lock:
+                self.counters['timeouts'] += 1
+            return []
+        
+        # The only copy of the frame: straight into the shared slot
+        np.copyto(self._ring[slot, :height * width].reshape(height, width), gray)
+        
+        done = threading.Event()
+        waiter = [done, []]
+        call_id = next(self._call_ids)
+        with self._lock:
+            self._pending[call_id] = waiter
+        
+        self._tasks.put((call_id, slot, height, width))
+        
+        if not done.wait(DECODE_TIMEOUT):
+            # The slot stays reserved until the worker answers
+            with self._lock:
+                self._pending.pop(call_id, None)
+                self.counters['timeouts'] += 1
+            return []
+        
+        with self._lock:
+            self.counters['remote'] += 1
+        return waiter[1]
+    
+    def _results_loop(self):
+        """Results thread: free slots and wake up the waiting callers"""
+        while True:
+            message = self._results.get()
+            if message is None:
+                break
+            
+            call_id, slot, decoded = message
+            self._free_slots.put(slot)
+            
+            with self._lock:
+                waiter = self._pending.pop(call_id, None)
+            if waiter is not None:
+                waiter[1] = [DecodedQR(data, polygon) for data, polygon in decoded]
+                waiter[0].set()
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+QR code archive export for SecureLocker application
+
+Writes many QR code images into one ZIP or tar archive, or into a pack: a
+single file of PNG images back to back with a JSON Lines index of their
+offsets next to it. No file is created per image. PNG encoding runs on
+worker threads while the archive is written in order; only a bounded
+number of images is in flight at a time, so memory stays the same however
+large the batch is (apart from the small per-image entry of a ZIP central
+directory, which is written at the end).
+"""
+
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Archive formats and their file extensions
+ARCHIVE_EXTENSIONS = {
+    'zip': '.zip',
+    'tar': '.tar',
+    'pack': '.qrpack'
+}
+
+# Index file written next to a pack
+PACK_INDEX_SUFFIX = '.index.jsonl'
+
+# Size of a ZIP local file header before the file name and extra field
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+def encode_png(image, compress_level=6):
+    """Encode an image as PNG
+    
+    Args:
+        image (PIL.Image.Image): Image to encode
+        compress_level (int, optional): zlib level 0-9. Defaults to 6.
+    
+    Returns:
+        bytes: PNG data
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', compress_level=compress_level)
+    return buffer.getvalue()
+
+def load_pack_index(pack_path):
+    """Read the index of a pack
+    
+    Args:
+        pack_path (str): Pack file
+    
+    Returns:
+        dict: Image name to (offset, size) in the pack
+    """
+    index = {}
+    with open(pack_path + PACK_INDEX_SUFFIX, encoding='utf-8') as f:
+        for line in f:
+            if line.endswith('\n'):
+                entry = json.loads(line)
+                index[entry['name']] = (entry['offset'], entry['size'])
+    return index
+
+def read_packed_image(pack_path, offset, size):
+    """Read one PNG image from a pack
+    
+    Args:
+        pack_path (str): Pack file
+        offset (int): Offset of the image in the pack
+        size (int): Size of the image in bytes
+    
+    Returns:
+        bytes: PNG data
+    """
+    with open(pack_path, 'rb') as f:
+        f.seek(offset)
+        return f.read(size)
+
+class QRArchiveWriter:
+    """Streams PNG images into a ZIP, tar or pack archive"""
+    
+    def __init__(self, target, archive_format=None, workers=2, max_pending=None,
+                 compress_level=6, keep_bytes=None, on_written=None):
+        """Open the archive for writing
+        
+        Args:
+            target (str or file): Archive path, or a writable binary stream
+                                  (for ZIP and tar, which need no seeking)
+            archive_format (str, optional): 'zip', 'tar' or 'pack'. Defaults
+                                          to the format of the path's
+                                          extension.
+            workers (int, optional): PNG encoding threads. Defaults to 2.
+            max_pending (int, optional): Images encoded or waiting to be
+                                       written at most. Defaults to four per
+                                       worker.
+            compress_level (int, optional): PNG zlib level 0-9. Defaults to 6.
+            keep_bytes (int, optional): Pack only: keep this many bytes of an
+                                      existing pack (and their index entries)
+                                      and append after them
+            on_written (callable, optional): Called with (name, offset, size)
+                                           when an image is in the archive;
+                                           offset is where its PNG data
+                                           starts
+        
+        Raises:
+            ValueError: If the format is unknown, or keep_bytes is used with
+                        anything but a pack path
+        """
+        if archive_format is None and isinstance(target, str):
+            extension = os.path.splitext(target)[1].lower()
+            archive_format = next(
+                (name for name, ext in ARCHIVE_EXTENSIONS.items() if ext == extension), None
+            )
+        if archive_format not in ARCHIVE_EXTENSIONS:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        if keep_bytes is not None and (archive_format != 'pack' or not isinstance(target, str)):
+            raise ValueError("keep_bytes needs a pack path")
+        
+        self.archive_format = archive_format
+        self.max_pending = max(1, max_pending or 4 * workers)
+        self.compress_level = compress_level
+        self.on_written = on_written
+        
+        self.count = 0
+        self.bytes_written = 0
+        
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._index = None
+        self._close_archive = True
+        
+        if archive_format == 'zip':
+            self._archive = zipfile.ZipFile(target, 'w')
+        elif archive_format == 'tar':
+            if isinstance(target, str):
+                self._archive = tarfile.open(target, 'w')
+            else:
+                self._archive = tarfile.open(fileobj=target, mode='w|')
+        else:
+            self._archive = self._open_pack(target, keep_bytes)
+    
+    def _open_pack(self, target, keep_bytes):
+        """Open a pack and its index
+        
+        Args:
+            target (str or file): Pack path or writable binary stream
+            keep_bytes (int): Bytes of an existing pack to keep, or None
+        
+        Returns:
+            file: Pack opened for writing at its end
+        """
+        self._offset = 0
+        if not isinstance(target, str):
+            # The caller's stream stays open
+            self._close_archive = False
+            return target
+        
+        index_path = target + PACK_INDEX_SUFFIX
+        if keep_bytes is None or not os.path.exists(target):
+            self._index = open(index_path, 'w', encoding='utf-8')
+            return open(target, 'wb')
+        
+        # Drop images after keep_bytes, e.g. from an interrupted run
+        kept = []
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    entry = json.loads(line)
+                    if entry['offset'] + entry['size'] <= keep_bytes:
+                        kept.append(line)
+        
+        self._index = open(index_path, 'w', encoding='utf-8')
+        self._index.writelines(kept)
+        self._index.flush()
+        
+        pack = open(target, 'r+b')
+        pack.truncate(keep_bytes)
+        pack.seek(keep_bytes)
+        self._offset = keep_bytes
+        return pack
+    
+    def add_image(self, name, image):
+        """Queue an image; it is encoded on a worker thread and written in order
+        
+        Blocks while max_pending images are already in flight.
+        
+        Args:
+            name (str): Name of the image in the archive
+            image (PIL.Image.Image): Image to add (must not be changed
+                                     afterwards)
+        """
+        future = self._executor.submit(encode_png, image, self.compress_level)
+        self._pending.append((name, future))
+        
+        while len(self._pending) > self.max_pending:
+            self._write_next()
+    
+    def add_bytes(self, name, data):
+        """Write already encoded PNG data, after every queued image
+        
+        Args:
+            name (str): Name of the image in the archive
+            data (bytes): PNG data
+        
+        Returns:
+            int: Offset of the data in the archive
+        """
+        self.flush()
+        return self._write(name, data)
+    
+    def flush(self):
+        """Wait for every queued image and write it"""
+        while self._pending:
+            self._write_next()
+    
+    def _write_next(self):
+        """Write the oldest queued image once it is encoded"""
+        name, future = self._pending.popleft()
+        self._write(name, future.result())
+    
+    def _write(self, name, data):
+        """Append one image to the archive
+        
+        Args:
+            name (str): Name of the image in the archive
+            data (bytes): PNG data
+        
+        Returns:
+            int: Offset of the data in the archive
+        """
+        if self.archive_format == 'zip':
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            # PNG data is already compressed
+            info.compress_type = zipfile.ZIP_STORED
+            self._archive.writestr(info, data)
+            offset = (info.header_offset + _ZIP_LOCAL_HEADER_SIZE
+                      + len(info.filename.encode('utf-8')) + len(info.extra))
+        elif self.archive_format == 'tar':
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = time.time()
+            # The data follows the header blocks
+            offset = self._archive.offset + len(
+                info.tobuf(self._archive.format, self._archive.encoding, self._archive.errors)
+            )
+            self._archive.addfile(info, io.BytesIO(data))
+            # Only needed for reading; would grow with the batch
+            self._archive.members.clear()
+        else:
+            offset = self._offset
+            self._archive.write(data)
+            # An index entry never points past the data on disk
+            self._archive.flush()
+            self._offset += len(data)
+            if self._index is not None:
+                self._index.write(json.dumps({'name': name, 'offset': offset, 'size': len(data)}) + '\n')
+                self._index.flush()
+        
+        self.count += 1
+        self.bytes_written += len(data)
+        if self.on_written:
+            self.on_written(name, offset, len(data))
+        return offset
+    
+    def close(self):
+        """Write the remaining images and finish the archive"""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+            if self._close_archive:
+                self._archive.close()
+            if self._index is not None:
+                self._index.close()
+    
+    def __enter__(self):
+        """Use the writer as a context manager that closes the archive"""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Finish the archive, dropping queued images after an error"""
+        if exc_type is not None:
+            # Keep what was written; images still queued are dropped
+            for _, future in self._pending:
+                future.cancel()
+            self._pending.clear()
+        self.close()
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+QR code render cache for SecureLocker application
+
+Caches the work of QRGenerator.generate_qr_image() per payload and QR
+policy, on two levels: the module matrix (the expensive part: encoding,
+masking and error correction), and the rendered image per box size and
+border. Both levels are LRU caches with a memory cap.
+
+It only pays off for callers that render the same payload more than once
+(e.g. redisplaying or reprinting a code). Newly issued codes are rendered
+once, so the admin screen does not use it.
+"""
+
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Least-recently-used cache bounded by the memory its values use"""
+    
+    def __init__(self, max_bytes):
+        """Initialize an empty cache
+        
+        Args:
+            max_bytes (int): Memory cap; the least recently used entries are
+                             evicted to stay below it
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        """Get the number of cached entries"""
+        return len(self._entries)
+    
+    def get(self, key):
+        """Look up a value and mark it as recently used
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The cached value (or None if not cached)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value, size):
+        """Add a value, evicting the least recently used ones if needed
+        
+        Values larger than the whole cache are not stored.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            size (int): Memory used by the value in bytes
+        """
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            
+            self._entries[key] = (value, size)
+            self.bytes += size
+            
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def get_stats(self):
+        """Get cache statistics
+        
+        Returns:
+            dict: Entries, memory use and cap, hits, misses, hit rate and
+                  evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+class QRCache:
+    """Two-level cache of QR code matrices and rendered images"""
+    
+    def __init__(self, matrix_bytes=1024 * 1024, image_bytes=16 * 1024 * 1024):
+        """Initialize the QR code cache
+        
+        Args:
+            matrix_bytes (int, optional): Memory cap of the matrix level.
+                                        Defaults to 1 MiB.
+            image_bytes (int, optional): Memory cap of the image level.
+                                       Defaults to 16 MiB.
+        """
+        self.matrices = LRUCache(matrix_bytes)
+        self.images = LRUCache(image_bytes)
+    
+    def get_matrix(self, payload, policy=None):
+        """Get the cached module matrix of a payload
+        
+        Args:
+            payload (str): QR code payload
+            policy (QRPolicy, optional): Version and error correction level
+                                       the matrix was encoded with
+        
+        Returns:
+            numpy.ndarray: Read-only boolean matrix, True for dark modules
+                           (or None if not cached)
+        """
+        return self.matrices.get((payload, policy))
+    
+    def put_matrix(self, payload, matrix, policy=None):
+        """Cache the module matrix of a payload
+        
+        Args:
+            payload (str): QR code payload
+            matrix (numpy.ndarray): Boolean module matrix
+            policy (QRPolicy, optional): Version and error correction level
+                                       the matrix was encoded with
+        """
+        # Shared by every caller, so nobody may change it
+        matrix.setflags(write=False)
+        self.matrices.put((payload, policy), matrix, matrix.nbytes)
+    
+    def get_image(self, payload, box_size, border, size=None, policy=None):
+        """Get a copy of a cached rendered image
+        
+        Args:
+            payload (str): QR code payload
+            box_size (int): Pixels per module
+            border (int): Quiet zone in modules
+            size (int, optional): Exact image size, if rendered at one
+            policy (QRPolicy, optional): Version and error correction level
+                                       the image was encoded with
+        
+        Returns:
+            PIL.Image.Image: Copy of the image, safe to change (or None if
+                             not cached)
+        """
+        image = self.images.get((payload, box_size, border, size, policy))
+        return image.copy() if image is not None else None
+    
+    def put_image(self, payload, box_size, border, image, size=None, policy=None):
+        """Cache a copy of a rendered image
+        
+        Args:
+            payload (str): QR code payload
+            box_size (int): Pixels per module
+            border (int): Quiet zone in modules
+            image (PIL.Image.Image): Rendered image
+            size (int, optional): Exact image size, if rendered at one
+            policy (QRPolicy, optional): Version and error correction level
+                                       the image was encoded with
+        """
+        # PIL keeps one byte per pixel, also for 1-bit images
+        width, height = image.size
+        self.images.put((payload, box_size, border, size, policy), image.copy(),
+                        width * height * len(image.getbands()))
+    
+    def clear(self):
+        """Remove every cached matrix and image"""
+        self.matrices.clear()
+        self.images.clear()
+    
+    def get_stats(self):
+        """Get cache statistics
+        
+        Returns:
+            dict: Statistics of the matrix and the image level
+        """
+        return {
+            'matrix': self.matrices.get_stats(),
+            'image': self.images.get_stats()
+        }
\ No newline at end of file
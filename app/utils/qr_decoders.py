@@ -0,0 +1,240 @@
+"""
+QR decoder backends for SecureLocker application
+"""
+
+import json
+import os
+import platform
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+import cv2
+
+try:
+    from pyzbar.pyzbar import decode as zbar_decode, ZBarSymbol
+except ImportError:
+    # pyzbar or the zbar shared library is not installed on this machine
+    zbar_decode = None
+
+# A decoded QR code: text payload and corner points in image coordinates
+DecodedQR = namedtuple('DecodedQR', ['data', 'polygon'])
+
+class QRDecoder:
+    """Base class for QR decoder backends"""
+    
+    name = None
+    
+    # Number of decode() calls the backend runs in parallel; the scanner
+    # uses at least this many decode threads
+    parallel = 1
+    
+    @classmethod
+    def is_available(cls):
+        """Check if the backend can run on this machine
+        
+        Returns:
+            bool: True if the backend is usable
+        """
+        return True
+    
+    def decode(self, gray):
+        """Decode QR codes from a grayscale image
+        
+        Args:
+            gray (numpy.ndarray): Single-channel 8-bit image
+        
+        Returns:
+            list: DecodedQR results
+        """
+        raise NotImplementedError
+
+class PyzbarDecoder(QRDecoder):
+    """Decoder backend using the zbar library"""
+    
+    name = 'pyzbar'
+    
+    @classmethod
+    def is_available(cls):
+        """Check if pyzbar and the zbar shared library are installed"""
+        return zbar_decode is not None
+    
+    def decode(self, gray):
+        """Decode QR codes from a grayscale image with zbar"""
+        return [
+            DecodedQR(obj.data.decode('utf-8'), [(x, y) for x, y in obj.polygon])
+            for obj in zbar_decode(gray, symbols=[ZBarSymbol.QRCODE])
+        ]
+
+class OpenCVDecoder(QRDecoder):
+    """Decoder backend using cv2.QRCodeDetector"""
+    
+    name = 'opencv'
+    
+    def __init__(self):
+        """Initialize the decoder"""
+        # QRCodeDetector keeps state, so each thread gets its own instance
+        self._local = threading.local()
+    
+    def decode(self, gray):
+        """Decode QR codes from a grayscale image with OpenCV"""
+        detector = getattr(self._local, 'detector', None)
+        if detector is None:
+            detector = self._local.detector = cv2.QRCodeDetector()
+        
+        ok, payloads, points, _ = detector.detectAndDecodeMulti(gray)
+        if not ok or points is None:
+            return []
+        
+        return [
+            DecodedQR(payload, [(int(x), int(y)) for x, y in corners])
+            for payload, corners in zip(payloads, points)
+            if payload
+        ]
+
+# Registered decoder backends by name
+DECODERS = {
+    PyzbarDecoder.name: PyzbarDecoder,
+    OpenCVDecoder.name: OpenCVDecoder
+}
+
+def create_decoder(name=None):
+    """Create a decoder backend
+    
+    Args:
+        name (str, optional): Backend name. If None, the first available
+                            backend is used.
+    
+    Returns:
+        QRDecoder: Decoder instance
+    """
+    if name is None:
+        for decoder_class in DECODERS.values():
+            if decoder_class.is_available():
+                return decoder_class()
+        raise RuntimeError("No QR decoder backend available")
+    
+    if name not in DECODERS:
+        raise ValueError(f"Unknown QR decoder '{name}'")
+    if not DECODERS[name].is_available():
+        raise RuntimeError(f"QR decoder '{name}' is not available on this machine")
+    
+    return DECODERS[name]()
+
+def calibration_samples():
+    """Render sample frames used to calibrate the decoder backends
+    
+    Returns:
+        list: (gray frame, expected payload) tuples
+    """
+    # Imported here so the decoders do not depend on the generator
+    from app.utils.synthetic_frames import SyntheticFrameGenerator
+    
+    frames = SyntheticFrameGenerator(frame_size=(960, 540), seed=1)
+    samples = []
+    
+    for condition in ('baseline', 'large', 'rotated', 'perspective'):
+        for frame, payload in frames.frames(condition, 2):
+            samples.append((cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), payload))
+    
+    return samples
+
+def benchmark_decoder(decoder, samples, rounds=2):
+    """Measure decode speed and success rate of a backend
+    
+    Args:
+        decoder (QRDecoder): Decoder to measure
+        samples (list): (gray frame, expected payload) tuples
+        rounds (int, optional): Passes over the samples. Defaults to 2.
+    
+    Returns:
+        dict: Success rate and mean decode time in milliseconds
+    """
+    successes = 0
+    elapsed = 0.0
+    
+    for _ in range(rounds):
+        for frame, payload in samples:
+            start = time.perf_counter()
+            try:
+                results = decoder.decode(frame)
+            except Exception:
+                results = []
+            elapsed += time.perf_counter() - start
+            
+            if any(obj.data == payload for obj in results):
+                successes += 1
+    
+    attempts = rounds * len(samples)
+    return {
+        'success_rate': successes / attempts,
+        'mean_ms': elapsed * 1000 / attempts
+    }
+
+def _machine_key():
+    """Key identifying this machine's decode characteristics"""
+    return f"{platform.system()}-{platform.machine()}-opencv{cv2.__version__}"
+
+def select_decoder(cache_path=None, min_success_rate=0.9, samples=None):
+    """Pick the fastest decoder backend with an acceptable success rate
+    
+    A previous calibration result for this machine is read from cache_path
+    when available; otherwise every available backend is benchmarked on the
+    calibration samples and the result is cached.
+    
+    Args:
+        cache_path (str, optional): JSON file caching the calibration result
+        min_success_rate (float, optional): Minimum share of samples a backend
+                                          must decode. Defaults to 0.9.
+        samples (list, optional): Calibration samples. Defaults to
+                                calibration_samples().
+    
+    Returns:
+        QRDecoder: Selected decoder instance
+    """
+    key = _machine_key()
+    cache = {}
+    
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                cache = json.load(f)
+            name = cache.get(key, {}).get('decoder')
+            if name in DECODERS and DECODERS[name].is_available():
+                return DECODERS[name]()
+        except (OSError, ValueError):
+            cache = {}
+    
+    if samples is None:
+        samples = calibration_samples()
+    
+    results = {}
+    for name, decoder_class in DECODERS.items():
+        if decoder_class.is_available():
+            results[name] = benchmark_decoder(decoder_class(), samples)
+    
+    if not results:
+        raise RuntimeError("No QR decoder backend available")
+    
+    # Fastest backend that reads enough samples, else the most reliable one
+    acceptable = [name for name in results if results[name]['success_rate'] >= min_success_rate]
+    if acceptable:
+        selected = min(acceptable, key=lambda name: results[name]['mean_ms'])
+    else:
+        selected = max(results, key=lambda name: results[name]['success_rate'])
+    
+    if cache_path:
+        cache[key] = {
+            'decoder': selected,
+            'results': results,
+            'calibrated': datetime.now().isoformat()
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            with open(cache_path, 'w') as f:
+                json.dump(cache, f, indent=2)
+        except OSError:
+            # Calibration simply runs again on the next boot
+            pass
+    
+    return DECODERS[selected]()
\ No newline at end of file
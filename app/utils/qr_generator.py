@@ -5,22 +5,105 @@ QR code generator utilities for SecureLocker application
 import json
 import qrcode
 import string
-import random
 import tempfile
 import os
+from collections import namedtuple
 from datetime import datetime
+import numpy as np
 from PIL import Image
 
+from app.utils.id_allocator import IDAllocator
+
+# Error correction levels, weakest first; a stronger level survives more
+# damage but needs a larger symbol for the same payload
+ERROR_CORRECTION_LEVELS = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H
+}
+
+# QR code version (minimum; larger payloads still get a larger version, None
+# for the smallest that fits) and error correction level
+QRPolicy = namedtuple('QRPolicy', ['version', 'error_correction'])
+
+# Level H at the smallest version that fits the payload
+DEFAULT_QR_POLICY = QRPolicy(None, 'H')
+
+def render_qr_matrix(matrix, size=None, box_size=10, border=4):
+    """Rasterize a QR code module matrix as a crisp 1-bit image
+    
+    With a size, the image is exactly size x size pixels: every module gets
+    the same whole number of pixels (as many as fit) and the remaining
+    pixels are added as white padding around the centred code, so module
+    edges stay sharp instead of being resampled.
+    
+    Args:
+        matrix (numpy.ndarray): Boolean module matrix without quiet zone,
+                                True for dark modules
+        size (int, optional): Image width and height in pixels. Defaults to
+                            box_size pixels per module.
+        box_size (int, optional): Pixels per module without a size.
+                                Defaults to 10.
+        border (int, optional): Quiet zone in modules. Defaults to 4.
+    
+    Returns:
+        Image: 1-bit PIL Image
+    
+    Raises:
+        ValueError: If the code with its quiet zone does not fit into size
+    """
+    modules = matrix.shape[0]
+    
+    if size is None:
+        # Quiet zone, then every module as a box of pixels
+        pixels = np.repeat(np.repeat(np.pad(matrix, border), box_size, axis=0), box_size, axis=1)
+        return Image.fromarray(~pixels)
+    
+    total = modules + 2 * border
+    if size < total:
+        raise ValueError(f"A {modules}-module QR code needs at least {total} pixels")
+    
+    # Whole pixels per module, the rest is padding split around the code
+    box_size = size // total
+    offset = (size - total * box_size) // 2 + border * box_size
+    
+    # Module of every pixel row/column, and whether it falls on the code
+    index = np.arange(size) - offset
+    module = index // box_size
+    inside = (index >= 0) & (module < modules)
+    module = np.clip(module, 0, modules - 1)
+    
+    dark = matrix[np.ix_(module, module)] & inside[:, None] & inside[None, :]
+    return Image.fromarray(~dark)
+
 class QRGenerator:
     """Class for generating QR codes for package lockers"""
     
-    def __init__(self):
-        """Initialize the QR code generator"""
+    def __init__(self, token_codec=None, id_allocator=None, cache=None, policy=None):
+        """Initialize the QR code generator
+        
+        Args:
+            token_codec (QRTokenCodec, optional): Encode QR codes as compact
+                                                signed tokens instead of JSON
+            id_allocator (IDAllocator, optional): Source of unique IDs, shared
+                                                with other generators. Defaults
+                                                to a private allocator.
+            cache (QRCache, optional): Cache of QR code matrices and images,
+                                     keyed by payload
+            policy (QRPolicy, optional): QR code version and error correction
+                                       level (see app.utils.qr_policy).
+                                       Defaults to DEFAULT_QR_POLICY.
+        """
         # Character set for generating unique IDs
         self.chars = string.ascii_uppercase + string.digits
         
         # Default QR code settings
         self.qr_code_length = 8  # Length of generated QR code IDs
+        self.token_codec = token_codec
+        self.id_allocator = id_allocator or IDAllocator(self.chars, self.qr_code_length)
+        self.cache = cache
+        self.policy = policy or DEFAULT_QR_POLICY
     
     def generate_unique_id(self, length=None):
         """Generate a unique ID for QR codes
@@ -29,12 +112,13 @@ class QRGenerator:
             length (int, optional): Length of the ID. Defaults to self.qr_code_length.
             
         Returns:
-            str: Generated unique ID
+            str: Generated unique ID (cryptographically random, never handed
+                 out before by the ID allocator)
         """
         if length is None:
             length = self.qr_code_length
             
-        return ''.join(random.choices(self.chars, k=length))
+        return self.id_allocator.allocate_one(length)
     
     def generate_qr_data(self, door_id, expiry_date):
         """Generate QR code data
@@ -59,38 +143,93 @@ class QRGenerator:
         
         return qr_data
     
-    def generate_qr_image(self, qr_data, box_size=10, border=4):
+    def encode_payload(self, qr_data):
+        """Get the text stored in the QR code
+        
+        Args:
+            qr_data (dict): QR code data
+        
+        Returns:
+            str: Signed token, or JSON if no token codec is set or the data
+                 does not fit the token format
+        """
+        if self.token_codec is not None:
+            try:
+                return self.token_codec.encode(qr_data['doorId'], qr_data['expiryDate'], qr_data['id'])
+            except ValueError:
+                pass
+        
+        return json.dumps(qr_data)
+    
+    def generate_qr_matrix(self, payload):
+        """Encode a payload as a QR code module matrix
+        
+        Args:
+            payload (str): Text stored in the QR code
+        
+        Returns:
+            numpy.ndarray: Boolean matrix without quiet zone, True for dark
+                           modules (read-only if cached)
+        """
+        if self.cache is not None:
+            matrix = self.cache.get_matrix(payload, self.policy)
+            if matrix is not None:
+                return matrix
+        
+        # Generate QR code; fit only grows the version if the payload needs it
+        qr = qrcode.QRCode(
+            version=self.policy.version,
+            error_correction=ERROR_CORRECTION_LEVELS[self.policy.error_correction],
+            border=0,
+        )
+        qr.add_data(payload)
+        qr.make(fit=True)
+        
+        matrix = np.array(qr.get_matrix(), dtype=bool)
+        
+        if self.cache is not None:
+            self.cache.put_matrix(payload, matrix, self.policy)
+        return matrix
+    
+    def generate_qr_image(self, qr_data, box_size=10, border=4, size=None):
         """Generate QR code image from data
         
         Args:
             qr_data (dict): QR code data
             box_size (int, optional): Size of each box in QR code. Defaults to 10.
             border (int, optional): Border size. Defaults to 4.
+            size (int, optional): Render at exactly this width and height in
+                                pixels instead of box_size (see
+                                render_qr_matrix)
             
         Returns:
-            Image: PIL Image object with QR code
+            Image: 1-bit PIL Image with the QR code (a copy if it came from
+                   the cache, so it may be changed)
         """
-        # Convert data to JSON
-        qr_json = json.dumps(qr_data)
+        # Convert data to a token or JSON
+        payload = self.encode_payload(qr_data)
         
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=box_size,
-            border=border,
-        )
-        qr.add_data(qr_json)
-        qr.make(fit=True)
+        if size is not None:
+            # The box size follows from the image size
+            box_size = None
+        
+        if self.cache is not None:
+            qr_image = self.cache.get_image(payload, box_size, border, size, self.policy)
+            if qr_image is not None:
+                return qr_image
         
-        # Create image
-        qr_image = qr.make_image(fill_color="black", back_color="white")
+        matrix = self.generate_qr_matrix(payload)
+        qr_image = render_qr_matrix(matrix, size, box_size, border)
         
+        if self.cache is not None:
+            self.cache.put_image(payload, box_size, border, qr_image, size, self.policy)
         return qr_image
     
     def save_qr_image(self, qr_data, filename=None):
         """Generate and save QR code image to file
         
+        For many codes use export_qr_images(), which needs no file per image.
+        
         Args:
             qr_data (dict): QR code data
             filename (str, optional): Filename to save QR code. 
@@ -111,4 +250,28 @@ class QRGenerator:
         # Save image
         qr_image.save(filename)
         
-        return filename
\ No newline at end of file
+        return filename
+    
+    def export_qr_images(self, qr_data_list, writer, box_size=10, border=4, size=None):
+        """Generate QR code images straight into an archive
+        
+        Images are rendered here and PNG-encoded on the writer's worker
+        threads, so rendering and encoding overlap.
+        
+        Args:
+            qr_data_list (iterable): QR code data dicts
+            writer (QRArchiveWriter): Archive the images are written to, named
+                                      qr_<id>.png
+            box_size (int, optional): Size of each box in QR code. Defaults to 10.
+            border (int, optional): Border size. Defaults to 4.
+            size (int, optional): Render at exactly this width and height in
+                                pixels instead of box_size
+        
+        Returns:
+            int: Number of images added
+        """
+        count = 0
+        for qr_data in qr_data_list:
+            writer.add_image(f"qr_{qr_data['id']}.png", self.generate_qr_image(qr_data, box_size, border, size))
+            count += 1
+        return count
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+QR code version and error correction selection for SecureLocker application
+
+Error correction level H with the smallest fitting version spends about
+half of the symbol on error correction, so codes have far more modules
+than the payload needs. At the same printed size every module is then
+smaller, which is slower to decode and harder to read from a distance.
+
+The selection renders each candidate policy (the smallest version per
+error correction level) into degraded synthetic frames, runs them through
+the QRScanner decode path and picks the smallest symbol that still meets
+a target read rate. The choice is stored per payload format, because the
+token and JSON payloads need very different symbol sizes.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+import qrcode
+
+from app.utils.qr_decoders import create_decoder
+from app.utils.qr_generator import ERROR_CORRECTION_LEVELS, QRGenerator, QRPolicy
+from app.utils.qr_scanner import QRScanner
+from app.utils.qr_token import QRTokenCodec
+from app.utils.synthetic_frames import SyntheticFrameGenerator
+
+# Synthetic frame conditions a policy must survive: a distant code, and the
+# damage error correction is there for
+DEFAULT_POLICY_CONDITIONS = ('small', 'blur', 'noise', 'dim', 'glare', 'combined')
+
+# Highest QR code version
+MAX_QR_VERSION = 40
+
+def policy_name(policy):
+    """Get the name of a policy used in stored results
+    
+    Args:
+        policy (QRPolicy): QR code version and error correction level
+    
+    Returns:
+        str: Name such as 'v3-M'
+    """
+    return f"v{policy.version}-{policy.error_correction}"
+
+def _policy_generator(payload_format, policy=None):
+    """Create a QR generator for measurements
+    
+    Args:
+        payload_format (str): 'token' or 'json'
+        policy (QRPolicy, optional): Policy to generate codes with
+    
+    Returns:
+        QRGenerator: Generator producing payloads of the real length
+    """
+    # Any key gives tokens of the real length
+    token_codec = QRTokenCodec(b'qr policy measurement') if payload_format == 'token' else None
+    return QRGenerator(token_codec=token_codec, policy=policy)
+
+def qr_policy_candidates(payload):
+    """Get the policies worth measuring for a payload
+    
+    For every error correction level the smallest version that fits the
+    payload is a candidate. Of candidates with the same version only the
+    strongest level is kept: a weaker one has the same symbol size and
+    recovers less.
+    
+    Args:
+        payload (str): Representative QR code payload
+    
+    Returns:
+        list: QRPolicy candidates, smallest symbol first
+    """
+    candidates = {}
+    for level, constant in ERROR_CORRECTION_LEVELS.items():
+        qr = qrcode.QRCode(error_correction=constant, border=0)
+        qr.add_data(payload)
+        qr.best_fit()
+        # Levels are weakest first, so a later level replaces an earlier one
+        candidates[qr.version] = QRPolicy(qr.version, level)
+    
+    return [candidates[version] for version in sorted(candidates)]
+
+def measure_qr_policy(policy, payload_format, scanner, conditions=DEFAULT_POLICY_CONDITIONS,
+                      samples=20, seed=0):
+    """Measure the read rate of a policy on degraded synthetic frames
+    
+    Args:
+        policy (QRPolicy): Policy to measure
+        payload_format (str): 'token' or 'json'
+        scanner (QRScanner): Scanner whose decode path is used
+        conditions (tuple, optional): Condition names from CONDITIONS
+        samples (int, optional): Frames per condition. Defaults to 20.
+        seed (int, optional): Random seed, the same for every policy so they
+                            see the same distortions. Defaults to 0.
+    
+    Returns:
+        dict: Overall read rate, read rate per condition, mean decode time
+              and symbol size in modules
+    """
+    generator = _policy_generator(payload_format, policy)
+    frames = SyntheticFrameGenerator(seed=seed, generator=generator)
+    
+    rates = {}
+    reads = 0
+    decode_time = 0.0
+    for condition in conditions:
+        condition_reads = 0
+        for frame, payload in frames.frames(condition, samples):
+            start = time.perf_counter()
+            results = scanner.decode_frame(frame)
+            decode_time += time.perf_counter() - start
+            if any(result.data == payload for result in results):
+                condition_reads += 1
+        
+        rates[condition] = round(condition_reads / samples, 4)
+        reads += condition_reads
+    
+    total = samples * len(conditions)
+    return {
+        'version': policy.version,
+        'error_correction': policy.error_correction,
+        'modules': 17 + 4 * policy.version,
+        'read_rate': round(reads / total, 4),
+        'conditions': rates,
+        'mean_ms': round(decode_time / total * 1000, 3)
+    }
+
+def measure_qr_policies(payload_format, decoder=None, pyramid_scales=(0.5, 1.0),
+                        conditions=DEFAULT_POLICY_CONDITIONS, samples=20, seed=0):
+    """Measure every candidate policy of a payload format
+    
+    Args:
+        payload_format (str): 'token' or 'json'
+        decoder (str, optional): Decoder backend name. Defaults to the first
+                               available backend.
+        pyramid_scales (tuple, optional): Pyramid levels used by the scanner
+        conditions (tuple, optional): Condition names from CONDITIONS
+        samples (int, optional): Frames per condition. Defaults to 20.
+        seed (int, optional): Random seed for the synthetic frames
+    
+    Returns:
+        dict: Measurement per policy name, smallest symbol first
+    """
+    generator = _policy_generator(payload_format)
+    payload = generator.encode_payload(generator.generate_qr_data('1', '2030-12-31'))
+    scanner = QRScanner(decoder=create_decoder(decoder), pyramid_scales=pyramid_scales)
+    
+    return {
+        policy_name(policy): measure_qr_policy(policy, payload_format, scanner, conditions, samples, seed)
+        for policy in qr_policy_candidates(payload)
+    }
+
+def choose_qr_policy(results, target_read_rate=0.95):
+    """Pick the smallest symbol that meets the target read rate
+    
+    Args:
+        results (dict): Measurement per policy name, from measure_qr_policies()
+        target_read_rate (float, optional): Minimum share of frames read.
+                                          Defaults to 0.95.
+    
+    Returns:
+        QRPolicy: Selected policy (the most reliable one if none meets the
+                  target, None if nothing was measured)
+    """
+    if not results:
+        return None
+    
+    # Smallest symbol that reads well enough, else the most reliable one
+    acceptable = [result for result in results.values() if result['read_rate'] >= target_read_rate]
+    if acceptable:
+        selected = min(acceptable, key=lambda result: result['version'])
+    else:
+        selected = max(results.values(), key=lambda result: (result['read_rate'], -result['version']))
+    
+    return QRPolicy(selected['version'], selected['error_correction'])
+
+def load_qr_policy(policy_path, payload_format):
+    """Read the stored policy of a payload format
+    
+    Args:
+        policy_path (str): JSON file storing the selected policies
+        payload_format (str): 'token' or 'json'
+    
+    Returns:
+        QRPolicy: Stored policy (None if nothing usable is stored)
+    """
+    if not policy_path or not os.path.exists(policy_path):
+        return None
+    
+    try:
+        with open(policy_path) as f:
+            version, level = json.load(f)[payload_format]['policy']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    
+    if level not in ERROR_CORRECTION_LEVELS or not isinstance(version, int) \
+            or not 1 <= version <= MAX_QR_VERSION:
+        return None
+    
+    return QRPolicy(version, level)
+
+def store_qr_policy(policy_path, payload_format, policy, results):
+    """Store the selected policy and measurements of a payload format
+    
+    Args:
+        policy_path (str): JSON file storing the selected policies
+        payload_format (str): 'token' or 'json'
+        policy (QRPolicy): Selected policy
+        results (dict): Measurement per policy name
+    """
+    stored = {}
+    if os.path.exists(policy_path):
+        try:
+            with open(policy_path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+    
+    stored[payload_format] = {
+        'policy': list(policy),
+        'results': results,
+        'measured': datetime.now().isoformat()
+    }
+    
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(policy_path)), exist_ok=True)
+        with open(policy_path, 'w') as f:
+            json.dump(stored, f, indent=2)
+    except OSError:
+        # Codes keep the default policy until the next measurement
+        pass
+
+def configured_qr_policy(config):
+    """Get the QR policy new codes are generated with
+    
+    Args:
+        config (AppConfig): Application configuration
+    
+    Returns:
+        QRPolicy: Stored policy of the configured payload format in 'auto'
+                  mode (None for the generator default)
+    """
+    if config.qr_policy != 'auto':
+        return None
+    return load_qr_policy(config.qr_policy_path, config.qr_payload_format)
\ No newline at end of file
@@ -2,27 +2,128 @@
 QR code scanner utilities for SecureLocker application
 """
 
+import threading
+import time
+from collections import deque
 import cv2
-from pyzbar.pyzbar import decode
 import numpy as np
 
+from app.utils.frame_buffer import LatestFrameBuffer
+from app.utils.frame_sources import CameraSource
+from app.utils.qr_decoders import DecodedQR, create_decoder
+
+# Smallest side (in pixels) worth decoding at a reduced pyramid level
+MIN_PYRAMID_SIZE = 160
+
+# Number of recent frame latencies kept for the percentiles in get_stats()
+LATENCY_SAMPLES = 200
+
+# Camera read retries before a read failure is reported, and the first and
+# longest wait between them (doubled after every failed read)
+READ_RETRIES = 5
+READ_BACKOFF_INITIAL = 0.05
+READ_BACKOFF_MAX = 2.0
+
 class QRScanner:
     """Class for handling QR code scanning functionality"""
     
-    def __init__(self, on_qr_detected=None, on_error=None, camera_id=0):
+    def __init__(self, on_qr_detected=None, on_error=None, camera_id=0,
+                 pipeline=False, decode_workers=1, pyramid_scales=(0.5, 1.0),
+                 roi_padding=0.5, roi_full_scan_interval=10, frame_gate=None,
+                 decoder=None, confirmer=None, source=None, idle_monitor=None,
+                 decoder_pool=None):
         """Initialize the QR scanner
         
         Args:
             on_qr_detected (callable, optional): Callback for detected QR code.
             on_error (callable, optional): Callback for scanner errors.
             camera_id (int, optional): Camera device ID. Defaults to 0.
+            pipeline (bool, optional): Run capture and decoding on separate
+                                     threads. Defaults to False.
+            decode_workers (int, optional): Number of decode threads used in
+                                          pipeline mode. Defaults to 1.
+            pyramid_scales (tuple, optional): Scales of the grayscale levels to
+                                            decode, tried in order until one
+                                            finds a code. Defaults to (0.5, 1.0).
+            roi_padding (float, optional): Padding added around the last
+                                         detection, as a fraction of its size.
+                                         Defaults to 0.5.
+            roi_full_scan_interval (int, optional): Force a full-frame scan
+                                                  after this many region
+                                                  scans. Defaults to 10.
+            frame_gate (FrameGate, optional): Gate that skips unchanged or
+                                            blurry frames before decoding.
+            decoder (QRDecoder, optional): Decoder backend. Defaults to the
+                                         first available backend.
+            confirmer (DetectionConfirmer, optional): Requires a payload to be
+                                                    seen over several frames
+                                                    and suppresses repeats.
+            source (FrameSource, optional): Where frames come from. Defaults
+                                          to the camera given by camera_id.
+            idle_monitor (IdleMonitor, optional): Lowers the frame rate and
+                                                suspends decoding while
+                                                nothing moves.
+            decoder_pool (DecoderPool, optional): Decode threads shared with
+                                                other scanners. Implies
+                                                pipeline mode; the scanner
+                                                then only runs a capture thread.
         """
         self.camera_id = camera_id
         self.on_qr_detected = on_qr_detected
         self.on_error = on_error
-        self.cap = None
+        self.source = source if source is not None else CameraSource(camera_id)
         self.running = False
         self.last_frame = None
+        
+        # Set by stop() to interrupt idle and retry waits
+        self._stop_event = threading.Event()
+        
+        # Pipeline mode settings
+        self.decoder_pool = decoder_pool
+        self.pipeline = pipeline or decoder_pool is not None
+        self.decode_workers = max(1, decode_workers)
+        self._buffer = None
+        self._threads = []
+        self._preview_seq = 0
+        self._overlay = []
+        
+        # Decoder backend
+        self.decoder = decoder if decoder is not None else create_decoder()
+        
+        # Grayscale decode pyramid
+        self.pyramid_scales = tuple(pyramid_scales) or (1.0,)
+        
+        # Region of interest around the last detection
+        self.roi_padding = roi_padding
+        self.roi_full_scan_interval = max(1, roi_full_scan_interval)
+        self._roi = None
+        self._roi_scans = 0
+        self._roi_lock = threading.Lock()
+        
+        # Optional pre-decode gating stage
+        self.frame_gate = frame_gate
+        
+        # Optional temporal confirmation of detections
+        self.confirmer = confirmer
+        
+        # Optional low-power mode while nothing moves
+        self.idle_monitor = idle_monitor
+        self._last_read = 0.0
+        
+        # Frame counters
+        self._stats_lock = threading.Lock()
+        self._captured = 0
+        self._decoded = 0
+        self._roi_decodes = 0
+        self._full_decodes = 0
+        self._gated = 0
+        self._idle_skipped = 0
+        self._read_retries = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._started_at = None
+        
+        # Guards the detection callback when several decoders run at once
+        self._callback_lock = threading.RLock()
     
     def start(self):
         """Start the camera capture
@@ -31,16 +132,35 @@ class QRScanner:
             bool: True if camera started successfully, False otherwise
         """
         try:
-            self.cap = cv2.VideoCapture(self.camera_id)
-            
-            if not self.cap.isOpened():
+            if not self.source.open():
+                self.source.release()
                 if self.on_error:
-                    self.on_error("Could not open camera")
+                    if self.source.live:
+                        self.on_error("Could not open camera")
+                    else:
+                        self.on_error(f"Could not open {self.source.describe()}")
                 return False
             
             self.running = True
-            return True
+            self._started_at = time.monotonic()
+            self._stop_event.clear()
+            self._roi = None
+            self._overlay = []
             
+            if self.frame_gate is not None:
+                self.frame_gate.reset()
+            
+            if self.idle_monitor is not None:
+                self.idle_monitor.reset()
+            
+            if self.confirmer is not None:
+                self.confirmer.reset()
+            
+            if self.pipeline:
+                self._start_pipeline()
+            
+            return True
+        
         except Exception as e:
             if self.on_error:
                 self.on_error(str(e))
@@ -49,75 +169,527 @@ class QRScanner:
     def stop(self):
         """Stop the camera capture"""
         self.running = False
-        if self.cap is not None:
-            self.cap.release()
-            self.cap = None
+        self._stop_event.set()
+        
+        if self.decoder_pool is not None:
+            self.decoder_pool.remove(self)
+        
+        if self._buffer is not None:
+            self._buffer.close()
+        
+        # Wait for pipeline threads, but never for the calling thread
+        # (stop() may be called from the detection callback)
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join(timeout=1.0)
+        self._threads = []
+        
+        self.source.release()
+    
+    @property
+    def idle(self):
+        """bool: True while the idle monitor has suspended decoding"""
+        return self.idle_monitor is not None and self.idle_monitor.idle
     
-    def get_frame(self):
+    @property
+    def finished(self):
+        """bool: True once the pipeline capture thread has stopped delivering frames"""
+        return self._buffer is not None and self._buffer.closed
+    
+    @property
+    def frame_pending(self):
+        """bool: True if a captured frame is waiting to be decoded"""
+        return self._buffer is not None and self._buffer.pending
+    
+    def get_stats(self):
+        """Get frame counters
+        
+        Returns:
+            dict: Number of frames captured, decoded and dropped, decode
+                  throughput and capture-to-result latency percentiles
+        """
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            stats = {
+                'captured': self._captured,
+                'decoded': self._decoded,
+                'dropped': 0,
+                'roi_decodes': self._roi_decodes,
+                'full_decodes': self._full_decodes,
+                'gated': self._gated,
+                'idle_skipped': self._idle_skipped,
+                'read_retries': self._read_retries,
+                'decode_fps': round(self._decoded / elapsed, 2) if elapsed else 0.0,
+                'latency_p50_ms': None,
+                'latency_p95_ms': None
+            }
+        
+        if latencies:
+            for pct in (50, 95):
+                index = min(len(latencies) - 1, int(len(latencies) * pct / 100))
+                stats[f'latency_p{pct}_ms'] = round(latencies[index] * 1000, 2)
+        
+        if self._buffer is not None:
+            stats['dropped'] = self._buffer.dropped
+        
+        if self.frame_gate is not None:
+            stats['gate'] = self.frame_gate.get_stats()
+        
+        if self.confirmer is not None:
+            stats['confirmation'] = self.confirmer.get_stats()
+        
+        if self.idle_monitor is not None:
+            stats['idle'] = self.idle_monitor.get_stats()
+        
+        # Camera settings the driver accepted for the capture profile
+        negotiated = getattr(self.source, 'negotiated', None)
+        if negotiated is not None:
+            stats['capture'] = negotiated
+        
+        return stats
+    
+    def get_frame(self, rgb=True):
         """Get the current frame from camera and scan for QR codes
         
+        In pipeline mode this returns the newest captured frame without
+        decoding it; decoding happens on the decode worker threads.
+        
+        Args:
+            rgb (bool, optional): Convert the frame to RGB. If False the
+                                camera's BGR frame is returned, so a renderer
+                                can scale it before converting. Defaults to True.
+        
         Returns:
             numpy.ndarray: Current frame (or None if error)
         """
-        if not self.running or self.cap is None:
+        if not self.running:
             return None
         
+        if self.pipeline:
+            return self._get_pipeline_frame(rgb)
+        
         try:
-            ret, frame = self.cap.read()
+            ret, frame = self._read_frame()
             if not ret:
-                if self.on_error:
-                    self.on_error("Failed to read from camera")
+                if self.running and self.on_error:
+                    self.on_error(self._read_error_message())
                 return None
+            captured_at = time.monotonic()
+            
+            # Nothing moving: show the frame but skip decoding
+            idle = self._check_idle(frame)
             
             # Convert to RGB for display (Tkinter requires RGB)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if not idle:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if rgb:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
-            # Save as last frame
-            self.last_frame = rgb_frame
+            # Scan for QR codes. The RGB frame is a new array and is drawn on
+            # directly; the BGR frame may be handed out again by the source,
+            # so detections are drawn on a copy of it
+            decoded = False if idle else self._scan_qr_codes(frame, gray, draw=rgb)
+            if decoded and not rgb and self._overlay:
+                frame = frame.copy()
+                self._draw_detections(frame, self._overlay)
             
-            # Scan for QR codes
-            self._scan_qr_codes(rgb_frame)
+            # Save as last frame
+            self.last_frame = frame
             
-            return rgb_frame
+            with self._stats_lock:
+                self._captured += 1
+                if idle:
+                    self._idle_skipped += 1
+                elif decoded:
+                    self._decoded += 1
+                    self._latencies.append(time.monotonic() - captured_at)
+                else:
+                    self._gated += 1
             
+            return frame
+        
         except Exception as e:
             if self.on_error:
                 self.on_error(f"Camera error: {str(e)}")
             return None
     
-    def _scan_qr_codes(self, frame):
+    def _read_frame(self):
+        """Read a frame, retrying failed camera reads with exponential backoff
+        
+        While idle, the read is first delayed to the idle frame rate. Recorded
+        sources are not retried: a failed read means they have ended.
+        
+        Returns:
+            tuple: (success, BGR frame)
+        """
+        if self.idle:
+            delay = self.idle_monitor.idle_interval - (time.monotonic() - self._last_read)
+            if delay > 0:
+                self._stop_event.wait(delay)
+        
+        backoff = READ_BACKOFF_INITIAL
+        for attempt in range(READ_RETRIES + 1):
+            ret, frame = self.source.read()
+            if ret or not self.source.live or attempt == READ_RETRIES:
+                break
+            
+            with self._stats_lock:
+                self._read_retries += 1
+            
+            # Give the camera time to recover instead of spinning on it
+            if self._stop_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, READ_BACKOFF_MAX)
+        
+        self._last_read = time.monotonic()
+        return ret, frame
+    
+    def _check_idle(self, frame):
+        """Update the idle monitor with a frame
+        
+        Args:
+            frame (numpy.ndarray): BGR frame
+        
+        Returns:
+            bool: True if decoding is suspended for this frame
+        """
+        if self.idle_monitor is None:
+            return False
+        
+        was_idle = self.idle_monitor.idle
+        idle = self.idle_monitor.update(frame)
+        
+        # The code tracked before the idle period is gone by now
+        if was_idle and not idle:
+            with self._roi_lock:
+                self._roi = None
+        
+        return idle
+    
+    def _read_error_message(self):
+        """Get the error reported when the source returns no frame
+        
+        Returns:
+            str: Error message
+        """
+        return self.source.read_error_message()
+    
+    def _start_pipeline(self):
+        """Start the capture thread and the decode worker threads"""
+        self._preview_seq = 0
+        self._threads = [threading.Thread(target=self._capture_loop, daemon=True)]
+        
+        if self.decoder_pool is not None:
+            # The shared pool decodes; wake it up for every captured frame
+            self._buffer = LatestFrameBuffer(on_put=self.decoder_pool.notify)
+            self.decoder_pool.add(self)
+        else:
+            self._buffer = LatestFrameBuffer()
+            for _ in range(self.decode_workers):
+                self._threads.append(threading.Thread(target=self._decode_loop, daemon=True))
+        
+        for thread in self._threads:
+            thread.start()
+    
+    def _get_pipeline_frame(self, rgb=True, timeout=0.5):
+        """Get the newest captured frame for display
+        
+        Args:
+            rgb (bool, optional): Convert the frame to RGB. Defaults to True.
+            timeout (float, optional): Seconds to wait for a new frame
+        
+        Returns:
+            numpy.ndarray: Newest frame (or None if none arrived)
+        """
+        seq, frame = self._buffer.wait_newer(self._preview_seq, timeout)
+        if frame is None:
+            return None
+        
+        self._preview_seq = seq
+        overlay = self._overlay
+        
+        # Frames in the buffer are shared with the decoders, so detections
+        # are drawn on a display copy instead
+        if rgb:
+            # Convert to RGB for display (Tkinter requires RGB)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        elif overlay:
+            frame = frame.copy()
+        
+        self._draw_detections(frame, overlay)
+        self.last_frame = frame
+        
+        return frame
+    
+    def _capture_loop(self):
+        """Capture thread: keep the frame buffer filled with the newest frame"""
+        while self.running:
+            try:
+                ret, frame = self._read_frame()
+            except Exception as e:
+                if self.running and self.on_error:
+                    self.on_error(f"Camera error: {str(e)}")
+                break
+            
+            if not ret:
+                if self.running and self.on_error:
+                    self.on_error(self._read_error_message())
+                break
+            
+            with self._stats_lock:
+                self._captured += 1
+            
+            # Nothing moving: the decoders skip this frame
+            self._check_idle(frame)
+            
+            # Fast replay of a recorded source waits for the decoders
+            # instead of dropping frames
+            if not self.source.live and not self.source.realtime:
+                while self.running and not self._buffer.wait_taken(timeout=0.5):
+                    pass
+            
+            self._buffer.put(frame)
+        
+        # Wake up the preview and the decoders
+        self._buffer.close()
+    
+    def _decode_loop(self):
+        """Decode worker: always decode the freshest frame available"""
+        while self.running:
+            if not self.decode_next(timeout=0.5) and self._buffer.closed:
+                break
+    
+    def decode_next(self, timeout=0.0):
+        """Decode the newest captured frame in pipeline mode
+        
+        Called by the scanner's own decode threads or by a shared DecoderPool.
+        
+        Args:
+            timeout (float, optional): Seconds to wait for a frame. Defaults to 0.
+        
+        Returns:
+            bool: False if no frame was waiting
+        """
+        frame, captured_at = self._buffer.take(timeout, timestamped=True)
+        if frame is None:
+            return False
+        
+        if self.idle:
+            with self._stats_lock:
+                self._idle_skipped += 1
+            return True
+        
+        decoded = self._scan_qr_codes(frame, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), draw=False)
+        
+        with self._stats_lock:
+            if decoded:
+                self._decoded += 1
+                self._latencies.append(time.monotonic() - captured_at)
+            else:
+                self._gated += 1
+        
+        return True
+    
+    def decode_frame(self, frame):
+        """Decode QR codes from a single BGR frame
+        
+        Runs the same grayscale pyramid decode as the scanning loop, but
+        without the region tracking, gating or confirmation state, so it
+        can be used on independent frames (e.g. benchmarks).
+        
+        Args:
+            frame (numpy.ndarray): BGR frame
+        
+        Returns:
+            list: DecodedQR results
+        """
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return self.decode_gray(frame)
+    
+    def decode_gray(self, gray):
+        """Decode QR codes from a grayscale image using the resolution pyramid
+        
+        Each level is decoded in turn and the search stops at the first level
+        that finds a code, so the full-resolution pass only runs when the
+        downscaled levels come up empty.
+        
+        Args:
+            gray (numpy.ndarray): Single-channel 8-bit image
+        
+        Returns:
+            list: DecodedQR results with polygons in full-resolution coordinates
+        """
+        height, width = gray.shape[:2]
+        
+        for scale in self.pyramid_scales:
+            if scale < 1.0:
+                # Skip levels too small to hold a readable code
+                if min(height, width) * scale < MIN_PYRAMID_SIZE:
+                    continue
+                level = cv2.resize(gray, None, fx=scale, fy=scale,
+                                   interpolation=cv2.INTER_AREA)
+            else:
+                level = gray
+            
+            decoded_objects = self.decoder.decode(level)
+            if decoded_objects:
+                return [
+                    DecodedQR(
+                        obj.data,
+                        [(int(x / scale), int(y / scale)) for x, y in obj.polygon]
+                    )
+                    for obj in decoded_objects
+                ]
+        
+        return []
+    
+    def _decode_tracked(self, gray):
+        """Decode a frame, scanning only the region of interest when possible
+        
+        After a detection, the next frames decode only a padded crop around
+        the last seen code. A miss, or reaching the full-scan interval, falls
+        back to decoding the whole frame.
+        
+        Args:
+            gray (numpy.ndarray): Single-channel 8-bit image
+        
+        Returns:
+            list: DecodedQR results with polygons in full-frame coordinates
+        """
+        with self._roi_lock:
+            roi = self._roi
+            if roi is not None and self._roi_scans < self.roi_full_scan_interval:
+                self._roi_scans += 1
+            else:
+                roi = None
+        
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            results = self.decode_gray(gray[y0:y1, x0:x1])
+            
+            with self._stats_lock:
+                self._roi_decodes += 1
+            
+            if results:
+                results = [
+                    DecodedQR(obj.data, [(x + x0, y + y0) for x, y in obj.polygon])
+                    for obj in results
+                ]
+                self._update_roi(results, gray.shape)
+                return results
+        
+        # No region, region missed, or a periodic full scan is due
+        results = self.decode_gray(gray)
+        
+        with self._stats_lock:
+            self._full_decodes += 1
+        
+        self._update_roi(results, gray.shape, full_scan=True)
+        return results
+    
+    def _update_roi(self, results, shape, full_scan=False):
+        """Update the region of interest from the latest detections
+        
+        Args:
+            results (list): DecodedQR results in full-frame coordinates
+            shape (tuple): Shape of the full frame
+            full_scan (bool, optional): Results come from a full-frame scan,
+                                      which restarts the region scan count.
+        """
+        if not results:
+            with self._roi_lock:
+                self._roi = None
+            return
+        
+        height, width = shape[:2]
+        xs = [x for obj in results for x, _ in obj.polygon]
+        ys = [y for obj in results for _, y in obj.polygon]
+        
+        pad = int(max(max(xs) - min(xs), max(ys) - min(ys)) * self.roi_padding)
+        roi = (
+            max(0, min(xs) - pad),
+            max(0, min(ys) - pad),
+            min(width, max(xs) + pad),
+            min(height, max(ys) + pad)
+        )
+        
+        with self._roi_lock:
+            if full_scan:
+                self._roi_scans = 0
+            self._roi = roi
+    
+    def _draw_detections(self, frame, decoded_objects):
+        """Draw the outline of decoded QR codes on a frame
+        
+        Args:
+            frame (numpy.ndarray): Frame to draw on
+            decoded_objects (list): DecodedQR results
+        """
+        for obj in decoded_objects:
+            # Draw rectangle around QR code
+            points = obj.polygon
+            if len(points) > 4:
+                hull = cv2.convexHull(np.array(points, np.int32))
+                cv2.polylines(frame, [hull], True, (0, 255, 0), 3)
+            else:
+                pts = np.array([point for point in points], np.int32)
+                pts = pts.reshape((-1, 1, 2))
+                cv2.polylines(frame, [pts], True, (0, 255, 0), 3)
+    
+    def _scan_qr_codes(self, frame, gray=None, draw=True):
         """Scan frame for QR codes
         
         Args:
             frame (numpy.ndarray): Frame to scan
+            gray (numpy.ndarray, optional): Grayscale version of the frame
+                                          used for decoding.
+            draw (bool, optional): Draw detections on the frame. If False
+                                 they are kept for the next preview frame.
+        
+        Returns:
+            bool: False if the frame was skipped without decoding
         """
         if not self.running:
-            return
+            return False
         
         try:
+            if gray is None:
+                gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+            
+            # Skip unchanged or blurry frames, unless a code is being tracked
+            if self.frame_gate is not None and self._roi is None:
+                if not self.frame_gate.check(gray):
+                    return False
+            
             # Scan for QR codes
-            decoded_objects = decode(frame)
-            
-            for obj in decoded_objects:
-                # Draw rectangle around QR code
-                points = obj.polygon
-                if len(points) > 4:
-                    hull = cv2.convexHull(np.array([point for point in points]))
-                    cv2.polylines(frame, [hull], True, (0, 255, 0), 3)
-                else:
-                    pts = np.array([point for point in points], np.int32)
-                    pts = pts.reshape((-1, 1, 2))
-                    cv2.polylines(frame, [pts], True, (0, 255, 0), 3)
-                
-                # Get data
-                qr_data = obj.data.decode('utf-8')
-                
-                # Stop scanning and call callback
-                if self.on_qr_detected:
-                    self.on_qr_detected(qr_data)
-                    break
-                    
+            decoded_objects = self._decode_tracked(gray)
+            if decoded_objects:
+                # Lets a camera session time its first decodable frame
+                self.source.frame_decoded()
+            
+            if draw:
+                self._draw_detections(frame, decoded_objects)
+            else:
+                self._overlay = decoded_objects
+            
+            # Get data, confirmed over several frames when configured
+            payloads = [obj.data for obj in decoded_objects]
+            if self.confirmer is not None:
+                payloads = self.confirmer.update(payloads)
+            
+            # Stop scanning and call callback
+            if payloads and self.on_qr_detected:
+                with self._callback_lock:
+                    # Another decoder may already have reported a code
+                    if self.running:
+                        self.on_qr_detected(payloads[0])
+        
         except Exception as e:
             # Don't call error handler here to avoid excessive error messages
             # during scanning. Just skip this frame.
-            pass
\ No newline at end of file
+            pass
+        
+        return True
\ No newline at end of file
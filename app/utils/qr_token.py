@@ -0,0 +1,242 @@
+"""
+Compact signed QR token format for SecureLocker application
+
+A token packs the QR code data into 21 bytes instead of a JSON document:
+
+    version   1 byte   token format version
+    door      2 bytes  door number (unsigned, big endian)
+    expiry    2 bytes  expiry date as days since 1970-01-01
+    id        8 bytes  the QR code ID (ASCII)
+    mac       8 bytes  HMAC-SHA256 of the fields above, truncated
+
+The bytes are Base45 encoded (RFC 9285), whose alphabet is the QR
+alphanumeric character set, so the 32-character token fits a small
+alphanumeric-mode symbol.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import struct
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+# Current token format version
+TOKEN_VERSION = 1
+
+# version, door, expiry day, id
+TOKEN_HEADER = struct.Struct('>BHH8s')
+
+# Length of the truncated HMAC in bytes
+MAC_SIZE = 8
+
+# Length of a token in bytes, and of its Base45 text
+TOKEN_SIZE = TOKEN_HEADER.size + MAC_SIZE
+TOKEN_TEXT_LENGTH = TOKEN_SIZE // 2 * 3 + TOKEN_SIZE % 2 * 2
+
+# Environment variable holding the signing key (hex), overriding the key file
+TOKEN_KEY_ENV = 'SECURELOCKER_QR_KEY'
+
+# Base45 alphabet (QR alphanumeric mode characters)
+BASE45_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:'
+BASE45_VALUES = {char: value for value, char in enumerate(BASE45_CHARS)}
+
+EPOCH = date(1970, 1, 1)
+
+# Decoded token contents
+QRToken = namedtuple('QRToken', ['version', 'door_id', 'expiry_day', 'qr_id'])
+
+def b45encode(data):
+    """Encode bytes with Base45
+    
+    Args:
+        data (bytes): Data to encode
+    
+    Returns:
+        str: Base45 text
+    """
+    chars = []
+    for index in range(0, len(data) - 1, 2):
+        value = data[index] * 256 + data[index + 1]
+        value, c = divmod(value, 45)
+        e, d = divmod(value, 45)
+        chars.extend((BASE45_CHARS[c], BASE45_CHARS[d], BASE45_CHARS[e]))
+    
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        chars.extend((BASE45_CHARS[c], BASE45_CHARS[d]))
+    
+    return ''.join(chars)
+
+def b45decode(text):
+    """Decode Base45 text
+    
+    Args:
+        text (str): Base45 text
+    
+    Returns:
+        bytes: Decoded data
+    
+    Raises:
+        ValueError: If the text is not valid Base45
+    """
+    try:
+        values = [BASE45_VALUES[char] for char in text]
+    except KeyError:
+        raise ValueError("Invalid Base45 character")
+    
+    if len(values) % 3 == 1:
+        raise ValueError("Invalid Base45 length")
+    
+    data = bytearray()
+    for index in range(0, len(values), 3):
+        chunk = values[index:index + 3]
+        if len(chunk) == 3:
+            value = chunk[0] + chunk[1] * 45 + chunk[2] * 2025
+            if value > 0xFFFF:
+                raise ValueError("Invalid Base45 value")
+            data.extend(divmod(value, 256))
+        else:
+            value = chunk[0] + chunk[1] * 45
+            if value > 0xFF:
+                raise ValueError("Invalid Base45 value")
+            data.append(value)
+    
+    return bytes(data)
+
+def load_token_key(key_path=None):
+    """Load the token signing key
+    
+    The key comes from the SECURELOCKER_QR_KEY environment variable (hex) if
+    set, otherwise from key_path. A missing key file is created with a new
+    random key.
+    
+    Args:
+        key_path (str, optional): File holding the key
+    
+    Returns:
+        bytes: Signing key
+    """
+    env_key = os.environ.get(TOKEN_KEY_ENV)
+    if env_key:
+        return bytes.fromhex(env_key)
+    
+    if key_path and os.path.exists(key_path):
+        with open(key_path, 'rb') as f:
+            return f.read()
+    
+    key = secrets.token_bytes(32)
+    
+    if key_path:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(key_path)), exist_ok=True)
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key)
+        except FileExistsError:
+            # Created by another process in the meantime
+            with open(key_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            # Tokens only stay valid until the application restarts
+            pass
+    
+    return key
+
+class QRTokenCodec:
+    """Encodes and verifies compact signed QR tokens"""
+    
+    def __init__(self, key):
+        """Initialize the token codec
+        
+        Args:
+            key (bytes): HMAC signing key
+        """
+        # Keyed once; copied for every token
+        self._mac = hmac.new(key, digestmod=hashlib.sha256)
+    
+    def _sign(self, header):
+        """Compute the truncated MAC of a token header"""
+        mac = self._mac.copy()
+        mac.update(header)
+        return mac.digest()[:MAC_SIZE]
+    
+    def encode(self, door_id, expiry_date, qr_id):
+        """Create a signed token
+        
+        Args:
+            door_id (str or int): Door number (0-65535)
+            expiry_date (str): Expiry date in YYYY-MM-DD format
+            qr_id (str): 8-character ASCII QR code ID
+        
+        Returns:
+            str: Base45 token
+        
+        Raises:
+            ValueError: If a field does not fit the token format
+        """
+        door = int(door_id)
+        expiry_day = (datetime.strptime(expiry_date, '%Y-%m-%d').date() - EPOCH).days
+        id_bytes = qr_id.encode('ascii')
+        
+        if not 0 <= door <= 0xFFFF:
+            raise ValueError(f"Door ID {door_id} does not fit a token")
+        if not 0 <= expiry_day <= 0xFFFF:
+            raise ValueError(f"Expiry date {expiry_date} does not fit a token")
+        if len(id_bytes) != 8:
+            raise ValueError("Token QR code IDs must be 8 characters long")
+        
+        header = TOKEN_HEADER.pack(TOKEN_VERSION, door, expiry_day, id_bytes)
+        return b45encode(header + self._sign(header))
+    
+    def decode(self, text):
+        """Decode and verify a token
+        
+        Args:
+            text (str): Base45 token
+        
+        Returns:
+            QRToken: Token contents (or None if the token is malformed, has an
+                     unknown version or a wrong signature)
+        """
+        if len(text) != TOKEN_TEXT_LENGTH:
+            return None
+        
+        try:
+            data = b45decode(text)
+        except ValueError:
+            return None
+        
+        header, mac = data[:TOKEN_HEADER.size], data[TOKEN_HEADER.size:]
+        if not hmac.compare_digest(mac, self._sign(header)):
+            return None
+        
+        version, door, expiry_day, id_bytes = TOKEN_HEADER.unpack(header)
+        if version != TOKEN_VERSION:
+            return None
+        
+        try:
+            qr_id = id_bytes.decode('ascii')
+        except UnicodeDecodeError:
+            return None
+        
+        return QRToken(version, door, expiry_day, qr_id)
+    
+    def to_qr_data(self, token):
+        """Convert a decoded token to QR code data
+        
+        Args:
+            token (QRToken): Decoded token
+        
+        Returns:
+            tuple: (QR code data dict with the same keys as the JSON format,
+                    expiry datetime)
+        """
+        expiry_date = datetime.combine(EPOCH + timedelta(days=token.expiry_day), datetime.min.time())
+        qr_data = {
+            'id': token.qr_id,
+            'doorId': str(token.door_id),
+            'expiryDate': expiry_date.strftime('%Y-%m-%d')
+        }
+        return qr_data, expiry_date
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Revocation filter for SecureLocker application
+
+The RevocationFilter keeps a Bloom filter of all revoked IDs in memory, plus
+an exact set of the most recent revocations: a code the Bloom filter has
+never seen is certainly not revoked, and a code in the exact set certainly
+is.
+
+Almost no codes are ever revoked, so the common "not revoked" answer costs
+no I/O: the code goes straight to its redemption, which the store needs
+anyway to make it single use, without a revocation lookup first. A known
+revocation is refused without touching the store at all.
+
+The filter is updated incrementally: revocations made in this process
+arrive through the store's revoke listener, and those made by other
+processes (e.g. main.py --revoke) through its sync listener. The
+redemption itself still refuses a revoked code, so a revocation the filter
+has not picked up yet is never accepted.
+"""
+
+import hashlib
+import math
+import sys
+import threading
+from collections import OrderedDict
+
+class RevocationFilter:
+    """Bloom filter of revoked QR code IDs with a small exact set
+    
+    is_revoked() answers True (revoked), False (certainly not revoked) or
+    None (the Bloom filter matched an ID the exact set does not know; ask
+    the store). While all revocations fit into the exact set, None is never
+    returned.
+    
+    The filter grows by rebuilding from the store when it holds more IDs
+    than it was sized for, up to max_capacity; past that the false-positive
+    rate rises instead of memory use.
+    """
+    
+    def __init__(self, capacity=10000, fp_rate=0.01, max_capacity=1000000,
+                 exact_size=4096, source=None):
+        """Initialize an empty revocation filter
+        
+        Args:
+            capacity (int, optional): Revoked IDs the Bloom filter is sized
+                                    for at first. Defaults to 10000.
+            fp_rate (float, optional): Target false-positive rate at capacity.
+                                     Defaults to 0.01.
+            max_capacity (int, optional): Largest capacity the filter grows
+                                        to. Defaults to 1000000.
+            exact_size (int, optional): Recent revocations kept exactly.
+                                      Defaults to 4096.
+            source (callable, optional): Returns an iterable of all revoked
+                                       IDs, used by load() and to rebuild a
+                                       full filter
+        """
+        self.fp_rate = fp_rate
+        self.max_capacity = max(1, max_capacity)
+        self.exact_size = exact_size
+        self.source = source
+        
+        self._lock = threading.Lock()
+        self._exact = OrderedDict()
+        self._complete = True
+        self._allocate(min(max(1, capacity), self.max_capacity))
+        
+        # Lookup counters
+        self.lookups = 0
+        self.positives = 0
+        self.false_positives = 0
+        self.unresolved = 0
+        self.rebuilds = 0
+    
+    def _allocate(self, capacity):
+        """Create an empty Bloom filter sized for capacity IDs"""
+        self.capacity = capacity
+        self.bits = max(64, int(math.ceil(-capacity * math.log(self.fp_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, qr_id):
+        """Bit positions of an ID (double hashing of one 128-bit digest)"""
+        digest = hashlib.blake2b(qr_id.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+    
+    def _insert(self, qr_id):
+        """Set the bits of an ID (lock held)"""
+        for position in self._positions(qr_id):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def _remember(self, qr_id):
+        """Add an ID to the exact set, evicting the oldest (lock held)"""
+        self._exact[qr_id] = True
+        self._exact.move_to_end(qr_id)
+        if len(self._exact) > self.exact_size:
+            self._exact.popitem(last=False)
+            self._complete = False
+    
+    def load(self):
+        """Rebuild the filter from the source
+        
+        Returns:
+            int: Number of revoked IDs loaded
+        """
+        if self.source is None:
+            return 0
+        
+        revoked = list(self.source())
+        
+        capacity = self.capacity
+        while capacity < len(revoked) and capacity < self.max_capacity:
+            capacity = min(capacity * 2, self.max_capacity)
+        
+        with self._lock:
+            self._allocate(capacity)
+            self._exact.clear()
+            self._complete = True
+            for qr_id in revoked:
+                self._insert(qr_id)
+                self._remember(qr_id)
+        
+        return len(revoked)
+    
+    def add(self, qr_id):
+        """Record a new revocation
+        
+        Can be registered as a credential store revoke listener.
+        
+        Args:
+            qr_id (str): Revoked QR code ID
+        """
+        with self._lock:
+            if qr_id in self._exact:
+                return
+            self._insert(qr_id)
+            self._remember(qr_id)
+            full = self.count > self.capacity and self.capacity < self.max_capacity
+        
+        # Resize from the store, which already contains the new revocation
+        if full and self.source is not None:
+            self.rebuilds += 1
+            self.load()
+    
+    def add_changes(self, changes):
+        """Record the revocations among changed codes
+        
+        Can be registered as a credential store sync listener, to follow
+        revocations made by other processes.
+        
+        Args:
+            changes (list): (qr_id, door_id, expiry_date, active, revoked)
+                            tuples
+        """
+        for qr_id, _, _, _, revoked in changes:
+            if revoked:
+                self.add(qr_id)
+    
+    def is_revoked(self, qr_id):
+        """Check whether a code has been revoked, from memory only
+        
+        Args:
+            qr_id (str): QR code ID
+        
+        Returns:
+            bool: True if revoked, False if certainly not revoked, or None if
+                  only the credential store can tell
+        """
+        with self._lock:
+            self.lookups += 1
+            array = self._array
+            for position in self._positions(qr_id):
+                if not array[position >> 3] & (1 << (position & 7)):
+                    return False
+            
+            self.positives += 1
+            if qr_id in self._exact:
+                return True
+            if self._complete:
+                # Every revocation is in the exact set: a Bloom false positive
+                self.false_positives += 1
+                return False
+            self.unresolved += 1
+            return None
+    
+    def expected_fp_rate(self):
+        """Get the Bloom filter false-positive rate at its current fill
+        
+        Returns:
+            float: Probability that an ID that was never added matches
+        """
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+    
+    def memory_bytes(self):
+        """Get the approximate memory used by the filter
+        
+        Returns:
+            int: Bytes used by the bit array and the exact set
+        """
+        with self._lock:
+            exact = sys.getsizeof(self._exact) + sum(sys.getsizeof(qr_id) for qr_id in self._exact)
+            return sys.getsizeof(self._array) + exact
+    
+    def get_stats(self):
+        """Get filter statistics
+        
+        Returns:
+            dict: Size, memory use, expected and observed false-positive
+                  rates and lookup counters
+        """
+        negatives = self.lookups - self.positives + self.false_positives
+        return {
+            'revoked': self.count,
+            'capacity': self.capacity,
+            'bits': self.bits,
+            'hashes': self.hashes,
+            'exact': len(self._exact),
+            'exact_complete': self._complete,
+            'memory_bytes': self.memory_bytes(),
+            'expected_fp_rate': round(self.expected_fp_rate(), 6),
+            'lookups': self.lookups,
+            'positives': self.positives,
+            'false_positives': self.false_positives,
+            'unresolved': self.unresolved,
+            'observed_fp_rate': round(self.false_positives / negatives, 6) if negatives else 0.0,
+            'rebuilds': self.rebuilds
+        }
\ No newline at end of file
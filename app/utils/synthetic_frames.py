@@ -0,0 +1,149 @@
+"""
+Synthetic camera frames with QR codes for SecureLocker scanner testing
+"""
+
+import cv2
+import numpy as np
+
+from app.utils.qr_generator import QRGenerator
+
+# Named capture conditions and the distortions applied for each of them
+CONDITIONS = {
+    'baseline': {},
+    'small': {'scale': 0.45},
+    'large': {'scale': 1.6},
+    'rotated': {'rotation': 35},
+    'perspective': {'perspective': 0.18},
+    'blur': {'blur': 2.0},
+    'noise': {'noise': 14.0},
+    'dim': {'brightness': 0.45, 'contrast': 0.55},
+    'glare': {'glare': 0.7},
+    'combined': {'scale': 0.7, 'rotation': 15, 'perspective': 0.1,
+                 'blur': 1.2, 'noise': 8.0, 'brightness': 0.7}
+}
+
+class SyntheticFrameGenerator:
+    """Renders QR codes with QRGenerator and composites them into camera-like frames"""
+    
+    def __init__(self, frame_size=(1280, 720), seed=0, generator=None):
+        """Initialize the synthetic frame generator
+        
+        Args:
+            frame_size (tuple, optional): Frame (width, height). Defaults to 1280x720.
+            seed (int, optional): Random seed for reproducible frames. Defaults to 0.
+            generator (QRGenerator, optional): QR code generator to use.
+        """
+        self.frame_size = frame_size
+        self.rng = np.random.default_rng(seed)
+        self.generator = generator or QRGenerator()
+    
+    def render_code(self, qr_data, box_size=4):
+        """Render a QR code as a grayscale array
+        
+        Args:
+            qr_data (dict): QR code data
+            box_size (int, optional): Pixels per module. Defaults to 4.
+        
+        Returns:
+            numpy.ndarray: Grayscale QR code image including the quiet zone
+        """
+        image = self.generator.generate_qr_image(qr_data, box_size=box_size)
+        return np.array(image.convert('L'))
+    
+    def background(self):
+        """Create a smooth, textured background
+        
+        Returns:
+            numpy.ndarray: BGR background frame
+        """
+        width, height = self.frame_size
+        
+        # Low-frequency texture scaled up from a few random pixels
+        coarse = self.rng.integers(60, 200, size=(6, 8, 3), dtype=np.uint8)
+        return cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC)
+    
+    def compose(self, code, scale=1.0, rotation=0.0, perspective=0.0, blur=0.0,
+                noise=0.0, brightness=1.0, contrast=1.0, glare=0.0):
+        """Composite a rendered code into a camera-like frame
+        
+        Args:
+            code (numpy.ndarray): Grayscale QR code image
+            scale (float, optional): Code size relative to 45% of the frame height
+            rotation (float, optional): In-plane rotation in degrees
+            perspective (float, optional): Random corner displacement, as a
+                                         fraction of the code size
+            blur (float, optional): Gaussian blur sigma in pixels
+            noise (float, optional): Gaussian noise standard deviation
+            brightness (float, optional): Brightness multiplier
+            contrast (float, optional): Contrast multiplier around mid-gray
+            glare (float, optional): Strength of a bright glare spot (0-1)
+        
+        Returns:
+            tuple: (BGR frame, 4x2 array of code corners in the frame)
+        """
+        width, height = self.frame_size
+        frame = self.background()
+        
+        # Destination square, centred at a random spot that keeps it in view
+        size = 0.45 * min(width, height) * scale
+        half = size / 2
+        margin = half * 1.5
+        cx = self.rng.uniform(min(margin, width / 2), max(width - margin, width / 2))
+        cy = self.rng.uniform(min(margin, height / 2), max(height - margin, height / 2))
+        
+        corners = np.array([[-half, -half], [half, -half], [half, half], [-half, half]])
+        angle = np.deg2rad(rotation)
+        rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        corners = corners @ rot.T
+        if perspective:
+            corners += self.rng.uniform(-perspective, perspective, size=(4, 2)) * size
+        corners += [cx, cy]
+        
+        src = np.float32([[0, 0], [code.shape[1], 0], [code.shape[1], code.shape[0]], [0, code.shape[0]]])
+        matrix = cv2.getPerspectiveTransform(src, np.float32(corners))
+        
+        warped = cv2.warpPerspective(code, matrix, (width, height), flags=cv2.INTER_LINEAR)
+        mask = cv2.warpPerspective(np.full(code.shape, 255, np.uint8), matrix, (width, height))
+        alpha = (mask.astype(np.float32) / 255.0)[:, :, None]
+        
+        result = frame.astype(np.float32) * (1 - alpha) + warped[:, :, None].astype(np.float32) * alpha
+        
+        # Lighting
+        result = (result - 128.0) * contrast + 128.0
+        result *= brightness
+        if glare:
+            yy, xx = np.mgrid[0:height, 0:width]
+            gx = self.rng.uniform(0, width)
+            gy = self.rng.uniform(0, height)
+            sigma = 0.25 * min(width, height)
+            spot = np.exp(-((xx - gx) ** 2 + (yy - gy) ** 2) / (2 * sigma ** 2))
+            result += (255.0 * glare * spot)[:, :, None]
+        
+        if blur:
+            result = cv2.GaussianBlur(result, (0, 0), blur)
+        
+        if noise:
+            result += self.rng.normal(0, noise, size=result.shape)
+        
+        return np.clip(result, 0, 255).astype(np.uint8), corners
+    
+    def frames(self, condition, count, door_ids=('1', '2', '3', '4'),
+               expiry_date='2030-12-31'):
+        """Generate frames for a named condition
+        
+        Args:
+            condition (str or dict): Name from CONDITIONS or explicit distortions
+            count (int): Number of frames
+            door_ids (tuple, optional): Door IDs cycled through the payloads
+            expiry_date (str, optional): Expiry date written into the payloads
+        
+        Yields:
+            tuple: (BGR frame, expected payload string)
+        """
+        params = CONDITIONS[condition] if isinstance(condition, str) else condition
+        
+        for index in range(count):
+            door_id = door_ids[index % len(door_ids)]
+            qr_data = self.generator.generate_qr_data(door_id, expiry_date)
+            frame, _ = self.compose(self.render_code(qr_data), **params)
+            yield frame, self.generator.encode_payload(qr_data)
\ No newline at end of file
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+SecureLocker batch QR code issuance
+Issues QR codes for many lockers at once, without the UI
+
+Usage:
+    python batch_issue.py --input manifest.csv --output codes/
+    python batch_issue.py --door 1 2 3 --count 500 --days 7 --output codes/
+
+The input CSV has door and expiry (YYYY-MM-DD) columns. Running the same
+command again after an interruption resumes the batch. With --archive the
+images go into a single codes.zip, codes.tar or codes.qrpack file in the
+output directory instead of one PNG file each.
+"""
+
+import argparse
+import csv
+import sys
+from datetime import datetime, timedelta
+
+from app.config import AppConfig
+from app.utils.batch_issuer import BatchIssuer
+from app.utils.credential_store import CredentialStore
+from app.utils.id_allocator import IDAllocator
+from app.utils.qr_archive import ARCHIVE_EXTENSIONS
+from app.utils.qr_policy import configured_qr_policy
+from app.utils.qr_token import load_token_key
+
+def parse_args():
+    """Parse command line arguments
+    
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Issue a batch of SecureLocker QR codes")
+    parser.add_argument('--input', help="CSV file with door and expiry columns")
+    parser.add_argument('--door', nargs='+', help="Door IDs to issue codes for")
+    parser.add_argument('--count', type=int, default=1, help="Codes per door (with --door)")
+    parser.add_argument('--expiry', help="Expiry date YYYY-MM-DD (with --door)")
+    parser.add_argument('--days', type=int, help="Expire this many days from today (with --door)")
+    parser.add_argument('--output', required=True, help="Directory for the images and manifest")
+    parser.add_argument('--processes', type=int, help="Worker processes (default: CPU cores)")
+    parser.add_argument('--archive', choices=sorted(ARCHIVE_EXTENSIONS),
+                        help="Write the images into one archive instead of a file each")
+    parser.add_argument('--no-register', action='store_true',
+                        help="Do not record the codes in the credential store")
+    return parser.parse_args()
+
+def read_requests(args, config):
+    """Build the list of codes to issue
+    
+    Args:
+        args (argparse.Namespace): Parsed arguments
+        config (AppConfig): Application configuration
+    
+    Returns:
+        list: (door_id, expiry_date) pairs
+    """
+    if args.input:
+        with open(args.input, newline='', encoding='utf-8') as f:
+            return [(row['door'].strip(), row['expiry'].strip()) for row in csv.DictReader(f)]
+    
+    if not args.door:
+        sys.exit("Either --input or --door is required")
+    
+    expiry_date = args.expiry
+    if expiry_date is None:
+        days = args.days if args.days is not None else config.default_expiry_days
+        expiry_date = (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+    
+    return [(door_id, expiry_date) for door_id in args.door for _ in range(args.count)]
+
+def main():
+    """Command line entry point"""
+    args = parse_args()
+    config = AppConfig()
+    requests = read_requests(args, config)
+    
+    for door_id, expiry_date in requests:
+        try:
+            datetime.strptime(expiry_date, '%Y-%m-%d')
+        except ValueError:
+            sys.exit(f"Invalid expiry date for door {door_id}: {expiry_date}")
+    
+    token_key = None
+    if config.qr_payload_format == 'token':
+        token_key = load_token_key(config.qr_token_key_path)
+    
+    store = None
+    if not args.no_register:
+        store = CredentialStore(config.credential_db_path)
+    
+    # Never reuse an ID that is already in the store
+    reserved = (qr_id for qr_id, _, _, _ in store.codes()) if store is not None else None
+    
+    issuer = BatchIssuer(
+        args.output,
+        id_allocator=IDAllocator(reserved=reserved),
+        token_key=token_key,
+        store=store,
+        processes=args.processes,
+        policy=configured_qr_policy(config),
+        archive_format=args.archive
+    )
+    
+    def show_progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"\r{done}/{total} codes", end='', flush=True)
+    
+    try:
+        result = issuer.issue(requests, on_progress=show_progress)
+    finally:
+        if store is not None:
+            store.close()
+    
+    print()
+    print(f"Issued {result['issued']} codes ({result['skipped']} already done) "
+          f"in {result['elapsed_s']:.2f} s with {result['processes']} processes: "
+          f"{result['codes_per_sec']:.1f} codes/s")
+    print(f"Manifest: {issuer.manifest_path}")
+    if issuer.archive_path is not None:
+        print(f"Archive: {issuer.archive_path}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for SecureLocker application
+Run a benchmark with: python -m benchmarks.<name>
+"""
\ No newline at end of file
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Credential store benchmark for SecureLocker application
+
+Fills a temporary CredentialStore with active codes and times redemption of
+known codes, lookups of unknown codes and plain lookups by ID, then revokes
+some codes and times the in-memory RevocationFilter against them. Reports
+latency percentiles for each operation and saves the results as JSON so runs
+can be compared across commits and hardware.
+
+Usage:
+    python -m benchmarks.credential_store_benchmark --codes 300000 --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import string
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from app.utils.credential_store import CredentialStore, REDEEMED
+from app.utils.revocation_filter import RevocationFilter
+from benchmarks.scanner_benchmark import git_commit, percentile
+
+# Characters of a QR code ID
+ID_CHARS = string.ascii_uppercase + string.digits
+
+def random_ids(rng, count, length=8):
+    """Generate distinct random QR code IDs
+    
+    Args:
+        rng (random.Random): Random number generator
+        count (int): Number of IDs
+        length (int, optional): ID length. Defaults to 8.
+    
+    Returns:
+        list: Distinct IDs, in random order
+    """
+    ids = set()
+    while len(ids) < count:
+        ids.add(''.join(rng.choices(ID_CHARS, k=length)))
+    return list(ids)
+
+def summarize(timings):
+    """Summarize operation timings
+    
+    Args:
+        timings (list): Durations in seconds
+    
+    Returns:
+        dict: Operations per second and latency percentiles in milliseconds
+    """
+    total = sum(timings)
+    latencies = [t * 1000 for t in timings]
+    return {
+        'operations': len(timings),
+        'ops_per_sec': round(len(timings) / total, 1) if total else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 4),
+        'p95_ms': round(percentile(latencies, 95), 4),
+        'p99_ms': round(percentile(latencies, 99), 4),
+        'max_ms': round(max(latencies), 4) if latencies else 0.0
+    }
+
+def time_calls(func, args_list):
+    """Time a function call for each set of arguments
+    
+    Args:
+        func (callable): Function to time
+        args_list (list): Argument tuples
+    
+    Returns:
+        tuple: (durations in seconds, results)
+    """
+    timings = []
+    results = []
+    for args in args_list:
+        start = time.perf_counter()
+        results.append(func(*args))
+        timings.append(time.perf_counter() - start)
+    return timings, results
+
+def run_benchmark(codes=300000, lookups=5000, doors=500, revoked=1000, seed=0, db_path=None):
+    """Run the credential store benchmark
+    
+    Args:
+        codes (int, optional): Active codes in the store
+        lookups (int, optional): Operations timed per operation type
+        doors (int, optional): Number of doors the codes are spread over
+        revoked (int, optional): Codes revoked for the revocation filter run
+        seed (int, optional): Random seed
+        db_path (str, optional): Database file. Defaults to a temporary file.
+    
+    Returns:
+        dict: Benchmark report
+    """
+    rng = random.Random(seed)
+    ids = random_ids(rng, codes + lookups)
+    issued, unknown = ids[:codes], ids[codes:]
+    today = date.today()
+    
+    temp_dir = None
+    if db_path is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, 'credentials.db')
+    
+    store = CredentialStore(db_path)
+    
+    try:
+        start = time.perf_counter()
+        store.issue_many(
+            (qr_id, str(rng.randint(1, doors)),
+             (today + timedelta(days=rng.randint(1, 30))).isoformat(), None)
+            for qr_id in issued
+        )
+        populate_s = time.perf_counter() - start
+        
+        # Redeem codes that exist, with their own door
+        samples = rng.sample(issued, min(lookups, len(issued)))
+        redeem_args = [(qr_id, store.get(qr_id).door_id) for qr_id in samples]
+        redeem_timings, results = time_calls(store.redeem, redeem_args)
+        
+        # Unknown codes: the index lookup finds nothing
+        miss_timings, _ = time_calls(store.redeem, [(qr_id,) for qr_id in unknown])
+        
+        get_timings, _ = time_calls(store.get, [(qr_id,) for qr_id in rng.sample(issued, len(samples))])
+        
+        # Revocations reach the filter through the store's listener
+        revocation_filter = RevocationFilter(source=store.revoked_ids)
+        revocation_filter.load()
+        store.add_revoke_listener(revocation_filter.add)
+        revoked_ids = set(rng.sample(issued, min(revoked, len(issued))))
+        for qr_id in revoked_ids:
+            store.revoke(qr_id)
+        
+        # Mostly codes that were never revoked, as at the kiosk
+        filter_timings, answers = time_calls(revocation_filter.is_revoked, [(qr_id,) for qr_id in ids])
+        not_revoked = [answer for qr_id, answer in zip(ids, answers) if qr_id not in revoked_ids]
+        # Codes that were never revoked but still needed the store
+        store_fallbacks = sum(answer is not False for answer in not_revoked)
+        
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'machine': {
+                'system': platform.system(),
+                'machine': platform.machine(),
+                'processor': platform.processor(),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version
+            },
+            'settings': {
+                'codes': codes,
+                'lookups': lookups,
+                'doors': doors,
+                'revoked': revoked,
+                'seed': seed
+            },
+            'populate_s': round(populate_s, 2),
+            'redeemed': sum(result == REDEEMED for result in results),
+            'active_after': store.count_active(),
+            'operations': {
+                'redeem': summarize(redeem_timings),
+                'redeem_unknown': summarize(miss_timings),
+                'get': summarize(get_timings),
+                'filter': summarize(filter_timings)
+            },
+            'revocation_filter': dict(
+                revocation_filter.get_stats(),
+                measured_fp_rate=round(store_fallbacks / len(not_revoked), 6) if not_revoked else 0.0
+            )
+        }
+    finally:
+        store.close()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    
+    return report
+
+def print_report(report):
+    """Print a benchmark report as a table
+    
+    Args:
+        report (dict): Report from run_benchmark()
+    """
+    settings = report['settings']
+    print(f"Codes: {settings['codes']}  doors: {settings['doors']}  "
+          f"populated in {report['populate_s']:.2f} s  "
+          f"redeemed: {report['redeemed']}/{settings['lookups']}")
+    print(f"{'operation':<16} {'ops/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    
+    for name, result in report['operations'].items():
+        print(f"{name:<16} {result['ops_per_sec']:>10.1f} {result['p50_ms']:>8.3f} "
+              f"{result['p95_ms']:>8.3f} {result['p99_ms']:>8.3f} {result['max_ms']:>8.3f}")
+    
+    stats = report['revocation_filter']
+    print(f"Revocation filter: {stats['revoked']} revoked, {stats['memory_bytes'] / 1024:.1f} KiB, "
+          f"{stats['hashes']} hashes, expected FP {stats['expected_fp_rate']:.3%}, "
+          f"measured FP {stats['measured_fp_rate']:.3%}")
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the credential store")
+    parser.add_argument('--codes', type=int, default=300000, help="Active codes in the store")
+    parser.add_argument('--lookups', type=int, default=5000, help="Operations timed per type")
+    parser.add_argument('--doors', type=int, default=500, help="Number of doors")
+    parser.add_argument('--revoked', type=int, default=1000, help="Codes revoked for the filter run")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--db', help="Database file (default: a temporary file)")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    report = run_benchmark(
+        codes=args.codes,
+        lookups=args.lookups,
+        doors=args.doors,
+        revoked=args.revoked,
+        seed=args.seed,
+        db_path=args.db
+    )
+    
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
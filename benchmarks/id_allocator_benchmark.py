@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+QR code ID allocator benchmark for SecureLocker application
+
+Allocates and reserves a large number of IDs with IDAllocator, in bulk and
+one at a time, checks that every ID is unique and compares the rate with
+the previous random.choices() generator (which neither reserves IDs nor
+uses a cryptographic random source). Saves the results as JSON so runs can
+be compared across commits and hardware.
+
+Usage:
+    python -m benchmarks.id_allocator_benchmark --ids 1000000 --output results.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import time
+from collections import Counter
+from datetime import datetime
+
+from app.utils.id_allocator import IDAllocator
+from benchmarks.scanner_benchmark import git_commit
+
+def run_bulk(allocator, count, batch):
+    """Allocate IDs in batches
+    
+    Args:
+        allocator (IDAllocator): Allocator to use
+        count (int): Number of IDs
+        batch (int): IDs per allocate() call
+    
+    Returns:
+        tuple: (IDs, seconds)
+    """
+    ids = []
+    start = time.perf_counter()
+    while len(ids) < count:
+        ids.extend(allocator.allocate(min(batch, count - len(ids))))
+    return ids, time.perf_counter() - start
+
+def run_single(allocator, count):
+    """Allocate IDs one at a time
+    
+    Args:
+        allocator (IDAllocator): Allocator to use
+        count (int): Number of IDs
+    
+    Returns:
+        tuple: (IDs, seconds)
+    """
+    start = time.perf_counter()
+    ids = [allocator.allocate_one() for _ in range(count)]
+    return ids, time.perf_counter() - start
+
+def run_baseline(count, alphabet, length):
+    """Generate IDs the way QRGenerator used to, without any uniqueness check
+    
+    Args:
+        count (int): Number of IDs
+        alphabet (str): ID characters
+        length (int): ID length
+    
+    Returns:
+        tuple: (IDs, seconds)
+    """
+    start = time.perf_counter()
+    ids = [''.join(random.choices(alphabet, k=length)) for _ in range(count)]
+    return ids, time.perf_counter() - start
+
+def summarize(ids, seconds):
+    """Summarize one run
+    
+    Args:
+        ids (list): Generated IDs
+        seconds (float): Time taken
+    
+    Returns:
+        dict: Count, time, rate and duplicates
+    """
+    return {
+        'ids': len(ids),
+        'seconds': round(seconds, 3),
+        'ids_per_sec': round(len(ids) / seconds, 1) if seconds else 0.0,
+        'duplicates': len(ids) - len(set(ids))
+    }
+
+def run_benchmark(count=1000000, batch=10000, single=100000, reserved=0):
+    """Run the ID allocator benchmark
+    
+    Args:
+        count (int, optional): IDs allocated in bulk
+        batch (int, optional): IDs per bulk allocate() call
+        single (int, optional): IDs allocated one at a time
+        reserved (int, optional): IDs reserved up front, as if already in
+                                the credential store
+    
+    Returns:
+        dict: Benchmark report
+    """
+    allocator = IDAllocator()
+    if reserved:
+        # Already issued codes
+        allocator.allocate(reserved)
+    
+    bulk_ids, bulk_seconds = run_bulk(allocator, count, batch)
+    single_ids, single_seconds = run_single(allocator, single)
+    baseline_ids, baseline_seconds = run_baseline(single, allocator.alphabet, allocator.length)
+    
+    # Every character should be about equally frequent
+    frequencies = Counter(''.join(bulk_ids[:100000]))
+    expected = sum(frequencies.values()) / len(allocator.alphabet)
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'machine': {
+            'system': platform.system(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'python': platform.python_version()
+        },
+        'settings': {
+            'ids': count,
+            'batch': batch,
+            'single': single,
+            'reserved': reserved,
+            'alphabet': allocator.alphabet,
+            'length': allocator.length
+        },
+        'bulk': summarize(bulk_ids, bulk_seconds),
+        'single': summarize(single_ids, single_seconds),
+        'baseline_random_choices': summarize(baseline_ids, baseline_seconds),
+        'all_unique': len(set(bulk_ids) | set(single_ids)) == len(bulk_ids) + len(single_ids),
+        'reserved_after': len(allocator),
+        'collisions': allocator.collisions,
+        'char_frequency_spread': round((max(frequencies.values()) - min(frequencies.values())) / expected, 4)
+    }
+
+def print_report(report):
+    """Print a benchmark report as a table
+    
+    Args:
+        report (dict): Report from run_benchmark()
+    """
+    settings = report['settings']
+    print(f"Alphabet: {len(settings['alphabet'])} chars  length: {settings['length']}  "
+          f"batch: {settings['batch']}  reserved up front: {settings['reserved']}")
+    print(f"{'run':<24} {'ids':>10} {'seconds':>9} {'ids/s':>12} {'dups':>6}")
+    
+    for name in ('bulk', 'single', 'baseline_random_choices'):
+        result = report[name]
+        print(f"{name:<24} {result['ids']:>10} {result['seconds']:>9.3f} "
+              f"{result['ids_per_sec']:>12.1f} {result['duplicates']:>6}")
+    
+    print(f"All unique: {report['all_unique']}  reserved: {report['reserved_after']}  "
+          f"collisions rejected: {report['collisions']}  "
+          f"char frequency spread: {report['char_frequency_spread']:.2%}")
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the QR code ID allocator")
+    parser.add_argument('--ids', type=int, default=1000000, help="IDs allocated in bulk")
+    parser.add_argument('--batch', type=int, default=10000, help="IDs per bulk call")
+    parser.add_argument('--single', type=int, default=100000, help="IDs allocated one at a time")
+    parser.add_argument('--reserved', type=int, default=0, help="IDs reserved up front")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    report = run_benchmark(
+        count=args.ids,
+        batch=args.batch,
+        single=args.single,
+        reserved=args.reserved
+    )
+    
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+QR code archive export benchmark for SecureLocker application
+
+Compares saving every QR code as its own temporary PNG file, the way
+QRGenerator.save_qr_image() does, with exporting them through
+QRArchiveWriter into a ZIP, tar or pack archive with PNG encoding on
+worker threads. Reports images per second and files created, and peak
+Python memory at two batch sizes (which should be about the same for the
+archives) from separate runs, as tracing memory slows everything down.
+Saves the results as JSON.
+
+Usage:
+    python -m benchmarks.qr_archive_benchmark --codes 2000 --workers 2 --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.utils.qr_archive import ARCHIVE_EXTENSIONS, QRArchiveWriter
+from app.utils.qr_generator import QRGenerator
+from benchmarks.scanner_benchmark import git_commit
+
+def run_files(generator, qr_data_list, directory):
+    """Save every code as a temporary PNG file
+    
+    Args:
+        generator (QRGenerator): Generator to use
+        qr_data_list (list): QR code data dicts
+        directory (str): Directory the files are created in
+    
+    Returns:
+        int: Number of files created
+    """
+    tempfile.tempdir = directory
+    try:
+        for qr_data in qr_data_list:
+            generator.save_qr_image(qr_data)
+    finally:
+        tempfile.tempdir = None
+    return len(os.listdir(directory))
+
+def run_archive(generator, qr_data_list, directory, archive_format, workers):
+    """Export every code into one archive
+    
+    Args:
+        generator (QRGenerator): Generator to use
+        qr_data_list (list): QR code data dicts
+        directory (str): Directory the archive is created in
+        archive_format (str): 'zip', 'tar' or 'pack'
+        workers (int): PNG encoding threads
+    
+    Returns:
+        int: Number of files created
+    """
+    path = os.path.join(directory, 'codes' + ARCHIVE_EXTENSIONS[archive_format])
+    with QRArchiveWriter(path, archive_format, workers=workers) as writer:
+        generator.export_qr_images(qr_data_list, writer)
+    return len(os.listdir(directory))
+
+def measure(run, codes, generator, trace=False):
+    """Time one export method, or record its peak memory
+    
+    Args:
+        run (callable): Takes (QR code data list, directory), returns the
+                        number of files created
+        codes (int): Number of codes
+        generator (QRGenerator): Generator creating the QR code data
+        trace (bool, optional): Record peak Python memory (slows the run)
+    
+    Returns:
+        dict: Rate, files created, output size and peak memory (if traced)
+    """
+    qr_data_list = [generator.generate_qr_data('1', '2030-12-31') for _ in range(codes)]
+    directory = tempfile.mkdtemp(prefix='qr_archive_benchmark_')
+    try:
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        files = run(qr_data_list, directory)
+        elapsed = time.perf_counter() - start
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        
+        size = sum(entry.stat().st_size for entry in os.scandir(directory))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    result = {
+        'codes': codes,
+        'seconds': round(elapsed, 3),
+        'images_per_sec': round(codes / elapsed, 1) if elapsed else 0.0,
+        'files': files,
+        'output_bytes': size
+    }
+    if trace:
+        result['peak_memory_kib'] = round(peak / 1024, 1)
+    return result
+
+def run_benchmark(codes=2000, workers=2, formats=None):
+    """Run the archive export benchmark
+    
+    Every method is timed at codes, and its memory traced at codes and at a
+    quarter of it, to show whether memory grows with the batch.
+    
+    Args:
+        codes (int, optional): Codes in the large batch
+        workers (int, optional): PNG encoding threads of the archive writer
+        formats (list, optional): Archive formats. Defaults to all.
+    
+    Returns:
+        dict: Benchmark report
+    """
+    generator = QRGenerator()
+    methods = {
+        'temp_files': lambda qr_data_list, directory: run_files(generator, qr_data_list, directory)
+    }
+    for archive_format in formats or ARCHIVE_EXTENSIONS:
+        methods[archive_format] = (
+            lambda qr_data_list, directory, archive_format=archive_format:
+            run_archive(generator, qr_data_list, directory, archive_format, workers)
+        )
+    
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'machine': {
+            'system': platform.system(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count(),
+            'python': platform.python_version()
+        },
+        'settings': {
+            'codes': codes,
+            'workers': workers
+        },
+        'methods': {}
+    }
+    
+    for name, run in methods.items():
+        report['methods'][name] = {
+            'timed': measure(run, codes, generator),
+            'traced_quarter': measure(run, max(1, codes // 4), generator, trace=True),
+            'traced': measure(run, codes, generator, trace=True)
+        }
+    
+    return report
+
+def print_report(report):
+    """Print a benchmark report as a table
+    
+    Args:
+        report (dict): Report from run_benchmark()
+    """
+    settings = report['settings']
+    print(f"Codes: {settings['codes']}  encoding threads: {settings['workers']}")
+    print(f"{'method':<12} {'img/s':>9} {'files':>7} {'KiB out':>9} "
+          f"{'peak KiB (1/4)':>15} {'peak KiB':>9}")
+    
+    for name, result in report['methods'].items():
+        timed = result['timed']
+        print(f"{name:<12} {timed['images_per_sec']:>9.1f} {timed['files']:>7} "
+              f"{timed['output_bytes'] / 1024:>9.1f} {result['traced_quarter']['peak_memory_kib']:>15.1f} "
+              f"{result['traced']['peak_memory_kib']:>9.1f}")
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the QR code archive export")
+    parser.add_argument('--codes', type=int, default=2000, help="Codes in the large batch")
+    parser.add_argument('--workers', type=int, default=2, help="PNG encoding threads")
+    parser.add_argument('--formats', nargs='+', choices=sorted(ARCHIVE_EXTENSIONS),
+                        help="Archive formats to run (default: all)")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    report = run_benchmark(codes=args.codes, workers=args.workers, formats=args.formats)
+    
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+QR code rasterizer benchmark for SecureLocker application
+
+Compares two ways of getting a QR code image of a given display size: the
+previous path, which let qrcode's PIL renderer draw the code at box_size 10
+and then resized the image, and render_qr_matrix(), which rasterizes the
+module matrix directly at the target size. Both start from the same module
+matrices, so only rasterization is timed. Reports time per image, the
+intermediate image size, the PNG size of the result and how evenly the
+modules were drawn, and saves the results as JSON.
+
+Usage:
+    python -m benchmarks.qr_render_benchmark --codes 200 --size 250 --output results.json
+"""
+
+import argparse
+import io
+import json
+import platform
+import time
+from datetime import datetime
+import numpy as np
+from qrcode.image.pil import PilImage
+
+from app.utils.qr_generator import QRGenerator, render_qr_matrix
+from app.utils.qr_token import QRTokenCodec
+from benchmarks.scanner_benchmark import git_commit, percentile
+
+def render_pil(matrix, size, box_size=10, border=4):
+    """Previous path: draw with qrcode's PIL renderer, then resize
+    
+    Args:
+        matrix (numpy.ndarray): Boolean module matrix without quiet zone
+        size (int): Target width and height in pixels
+        box_size (int, optional): Pixels per module before resizing
+        border (int, optional): Quiet zone in modules
+    
+    Returns:
+        tuple: (resized image, intermediate image pixel count)
+    """
+    modules = matrix.shape[0]
+    image = PilImage(border, modules, box_size, qrcode_modules=matrix.tolist())
+    for row, col in zip(*np.nonzero(matrix)):
+        image.drawrect(int(row), int(col))
+    width, height = image.size
+    return image.resize((size, size)), width * height
+
+def module_widths(image):
+    """Get the distinct pixel widths of the modules along the middle row
+    
+    Args:
+        image (PIL.Image.Image): Rendered QR code
+    
+    Returns:
+        list: Sorted distinct run lengths of equal pixels, excluding the
+              padding at both ends
+    """
+    row = np.array(image.convert('L'))[image.size[1] // 2] < 128
+    changes = np.flatnonzero(np.diff(row.astype(np.int8))) + 1
+    runs = np.diff(changes)
+    return sorted({int(run) for run in runs})
+
+def png_size(image):
+    """Get the size of an image saved as PNG
+    
+    Args:
+        image (PIL.Image.Image): Image
+    
+    Returns:
+        int: PNG size in bytes
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.tell()
+
+def time_renders(render, matrices):
+    """Time one render function over all matrices
+    
+    Args:
+        render (callable): Takes a matrix, returns an image
+        matrices (list): Module matrices
+    
+    Returns:
+        tuple: (durations in seconds, rendered images)
+    """
+    timings = []
+    images = []
+    for matrix in matrices:
+        start = time.perf_counter()
+        images.append(render(matrix))
+        timings.append(time.perf_counter() - start)
+    return timings, images
+
+def summarize(timings, images, intermediate_pixels):
+    """Summarize one rasterizer
+    
+    Args:
+        timings (list): Durations in seconds
+        images (list): Rendered images
+        intermediate_pixels (int): Largest image drawn on the way
+    
+    Returns:
+        dict: Timing percentiles, sizes and module width spread
+    """
+    latencies = [t * 1000 for t in timings]
+    widths = module_widths(images[0])
+    return {
+        'images_per_sec': round(len(timings) / sum(timings), 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'output_size': list(images[0].size),
+        'output_mode': images[0].mode,
+        'intermediate_pixels': intermediate_pixels,
+        'png_bytes': round(sum(png_size(image) for image in images) / len(images)),
+        'module_widths': widths,
+        # Every run a whole number of equal modules
+        'uniform_modules': all(width % widths[0] == 0 for width in widths),
+        'gray_levels': len(np.unique(np.array(images[0].convert('L'))))
+    }
+
+def run_benchmark(codes=200, size=250, payload_format='token'):
+    """Run the rasterizer benchmark
+    
+    Args:
+        codes (int, optional): Number of QR codes rendered
+        size (int, optional): Target width and height in pixels
+        payload_format (str, optional): 'token' or 'json'
+    
+    Returns:
+        dict: Benchmark report
+    """
+    token_codec = QRTokenCodec(b'benchmark key') if payload_format == 'token' else None
+    generator = QRGenerator(token_codec=token_codec)
+    matrices = [
+        generator.generate_qr_matrix(generator.encode_payload(generator.generate_qr_data('1', '2030-01-01')))
+        for _ in range(codes)
+    ]
+    
+    intermediate = []
+    
+    def pil(matrix):
+        image, pixels = render_pil(matrix, size)
+        intermediate.append(pixels)
+        return image
+    
+    pil_timings, pil_images = time_renders(pil, matrices)
+    numpy_timings, numpy_images = time_renders(lambda matrix: render_qr_matrix(matrix, size), matrices)
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'machine': {
+            'system': platform.system(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'python': platform.python_version(),
+            'numpy': np.__version__
+        },
+        'settings': {
+            'codes': codes,
+            'size': size,
+            'payload_format': payload_format,
+            'modules': int(matrices[0].shape[0])
+        },
+        'renderers': {
+            'pil_resize': summarize(pil_timings, pil_images, max(intermediate)),
+            'numpy_exact': summarize(numpy_timings, numpy_images, size * size)
+        }
+    }
+
+def print_report(report):
+    """Print a benchmark report as a table
+    
+    Args:
+        report (dict): Report from run_benchmark()
+    """
+    settings = report['settings']
+    print(f"Codes: {settings['codes']}  size: {settings['size']} px  "
+          f"payload: {settings['payload_format']} ({settings['modules']} modules)")
+    print(f"{'renderer':<12} {'img/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'drawn px':>9} "
+          f"{'png B':>7} {'module px':>10} {'uniform':>8}")
+    
+    for name, result in report['renderers'].items():
+        uniform = 'yes' if result['uniform_modules'] else 'no'
+        print(f"{name:<12} {result['images_per_sec']:>9.1f} {result['p50_ms']:>8.3f} "
+              f"{result['p95_ms']:>8.3f} {result['intermediate_pixels']:>9} "
+              f"{result['png_bytes']:>7} {result['module_widths'][0]:>10} {uniform:>8}")
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the QR code rasterizers")
+    parser.add_argument('--codes', type=int, default=200, help="QR codes rendered")
+    parser.add_argument('--size', type=int, default=250, help="Target size in pixels")
+    parser.add_argument('--format', choices=['token', 'json'], default='token',
+                        help="Payload format")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    report = run_benchmark(codes=args.codes, size=args.size, payload_format=args.format)
+    
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+QR scanner benchmark for SecureLocker application
+
+Renders QR codes with QRGenerator, composites them into synthetic camera
+frames under different conditions and runs the QRScanner decode path over
+them. Reports frames per second, decode latency percentiles and read rate
+for each condition, and saves the results as JSON so runs can be compared
+across commits and hardware.
+
+Usage:
+    python -m benchmarks.scanner_benchmark --frames 50 --output results.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import cv2
+
+from app.utils.qr_scanner import QRScanner
+from app.utils.qr_decoders import create_decoder
+from app.utils.process_decoder import ProcessDecoder
+from app.utils.synthetic_frames import CONDITIONS, SyntheticFrameGenerator
+
+def percentile(values, pct):
+    """Get a percentile of a list of values
+    
+    Args:
+        values (list): Values to summarize
+        pct (float): Percentile between 0 and 100
+    
+    Returns:
+        float: Percentile value (nearest rank), or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def git_commit():
+    """Get the current git commit, if available
+    
+    Returns:
+        str: Short commit hash or None
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5
+        )
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_condition(scanner, frames, threads=1):
+    """Decode a list of frames and collect timing and read rate
+    
+    Args:
+        scanner (QRScanner): Scanner whose decode path is measured
+        frames (list): (BGR frame, expected payload) tuples
+        threads (int, optional): Frames decoded at the same time. Defaults to 1.
+    
+    Returns:
+        dict: Summary statistics for the condition
+    """
+    def decode(sample):
+        frame, payload = sample
+        frame_start = time.perf_counter()
+        results = scanner.decode_frame(frame)
+        latency = (time.perf_counter() - frame_start) * 1000
+        return latency, any(obj.data == payload for obj in results)
+    
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            outcomes = list(executor.map(decode, frames))
+    else:
+        outcomes = [decode(sample) for sample in frames]
+    elapsed = time.perf_counter() - start
+    
+    latencies = [latency for latency, _ in outcomes]
+    reads = sum(1 for _, read in outcomes if read)
+    
+    return {
+        'frames': len(frames),
+        'fps': round(len(frames) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'read_rate': round(reads / len(frames), 4) if frames else 0.0
+    }
+
+def run_benchmark(frames_per_condition=30, conditions=None, decoder=None,
+                  pyramid_scales=(0.5, 1.0), frame_size=(1280, 720), seed=0,
+                  processes=0):
+    """Run the scanner benchmark
+    
+    Args:
+        frames_per_condition (int, optional): Frames rendered per condition
+        conditions (list, optional): Condition names. Defaults to all.
+        decoder (str, optional): Decoder backend name. Defaults to the first
+                               available backend.
+        pyramid_scales (tuple, optional): Pyramid levels used by the scanner
+        frame_size (tuple, optional): Frame (width, height)
+        seed (int, optional): Random seed for the synthetic frames
+        processes (int, optional): Decode in this many worker processes, with
+                                 as many frames in flight. Defaults to 0
+                                 (in-process).
+    
+    Returns:
+        dict: Benchmark report
+    """
+    if processes:
+        backend = ProcessDecoder(decoder, processes=processes)
+        backend.start()
+    else:
+        backend = create_decoder(decoder)
+    scanner = QRScanner(decoder=backend, pyramid_scales=pyramid_scales)
+    generator = SyntheticFrameGenerator(frame_size=frame_size, seed=seed)
+    
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'machine': {
+            'system': platform.system(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__
+        },
+        'settings': {
+            'decoder': scanner.decoder.name,
+            'processes': processes,
+            'pyramid_scales': list(pyramid_scales),
+            'frame_size': list(frame_size),
+            'frames_per_condition': frames_per_condition,
+            'seed': seed
+        },
+        'conditions': {}
+    }
+    
+    try:
+        for name in conditions or CONDITIONS:
+            # Render first so only decoding is timed
+            frames = list(generator.frames(name, frames_per_condition))
+            report['conditions'][name] = run_condition(scanner, frames, threads=max(1, processes))
+    finally:
+        if processes:
+            backend.close()
+    
+    return report
+
+def print_report(report):
+    """Print a benchmark report as a table
+    
+    Args:
+        report (dict): Report from run_benchmark()
+    """
+    settings = report['settings']
+    print(f"Decoder: {settings['decoder']}  processes: {settings['processes']}  "
+          f"pyramid: {settings['pyramid_scales']}  "
+          f"frame: {settings['frame_size'][0]}x{settings['frame_size'][1]}")
+    print(f"{'condition':<12} {'fps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'read':>7}")
+    
+    for name, result in report['conditions'].items():
+        print(f"{name:<12} {result['fps']:>8.1f} {result['p50_ms']:>8.2f} "
+              f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['read_rate']:>7.1%}")
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the QR scanner decode path")
+    parser.add_argument('--frames', type=int, default=30, help="Frames per condition")
+    parser.add_argument('--conditions', nargs='+', choices=sorted(CONDITIONS),
+                        help="Conditions to run (default: all)")
+    parser.add_argument('--decoder', help="Decoder backend (pyzbar or opencv)")
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.5, 1.0],
+                        help="Pyramid scales tried in order")
+    parser.add_argument('--width', type=int, default=1280, help="Frame width")
+    parser.add_argument('--height', type=int, default=720, help="Frame height")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="Decode in this many worker processes (default: in-process)")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    report = run_benchmark(
+        frames_per_condition=args.frames,
+        conditions=args.conditions,
+        decoder=args.decoder,
+        pyramid_scales=tuple(args.scales),
+        frame_size=(args.width, args.height),
+        seed=args.seed,
+        processes=args.processes
+    )
+    
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
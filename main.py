@@ -4,12 +4,148 @@ SecureLocker Application
 Main entry point for the application
 """
 
+import argparse
 import tkinter as tk
 from app.config import AppConfig
 from app.ui.app_controller import AppController
+from app.utils.capture_profiles import (
+    probe_capture_profiles, choose_capture_profile, store_capture_profile
+)
+from app.utils.credential_store import CredentialStore
+from app.utils.qr_policy import measure_qr_policies, choose_qr_policy, store_qr_policy
+
+def parse_args():
+    """Parse command line arguments
+    
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="SecureLocker kiosk application")
+    parser.add_argument(
+        '--source',
+        nargs='+',
+        help="Scanner frame source: camera ID, video file or image directory "
+             "(several sources scan with several cameras at once)"
+    )
+    parser.add_argument(
+        '--fast-replay',
+        action='store_true',
+        help="Replay recorded sources as fast as possible instead of in real time"
+    )
+    parser.add_argument(
+        '--probe-camera',
+        type=int,
+        metavar='CAMERA_ID',
+        help="Measure every capture profile on a camera, store the lowest-latency one and exit"
+    )
+    parser.add_argument(
+        '--tune-qr-policy',
+        action='store_true',
+        help="Measure the read rate of QR code versions and error correction levels, "
+             "store the smallest one that meets the target per payload format and exit"
+    )
+    parser.add_argument(
+        '--revoke',
+        nargs='+',
+        metavar='QR_ID',
+        help="Revoke QR codes in the credential store and exit "
+             "(running kiosks pick the revocation up within seconds)"
+    )
+    return parser.parse_args()
+
+def probe_camera(config, camera_id):
+    """Probe the capture profiles of a camera and cache the best one
+    
+    Args:
+        config (AppConfig): Application configuration
+        camera_id (int): Camera device ID
+    """
+    results = probe_capture_profiles(camera_id)
+    
+    print(f"{'profile':<14} {'negotiated':<22} {'fps':>7} {'queued':>7} {'age ms':>8}")
+    for name, result in results.items():
+        if not result.get('opened'):
+            print(f"{name:<14} camera could not be opened")
+            continue
+        
+        negotiated = result['negotiated']
+        settings = f"{negotiated['width']}x{negotiated['height']} {negotiated['fourcc']}"
+        if negotiated['mismatches']:
+            settings += "*"
+        print(f"{name:<14} {settings:<22} {result['delivered_fps']:>7} "
+              f"{str(result['queued_frames']):>7} {str(result['frame_age_ms']):>8}")
+    
+    selected = choose_capture_profile(results)
+    if selected is None:
+        print("No capture profile delivered frames")
+        return
+    
+    store_capture_profile(config.capture_profile_cache_path, camera_id, selected, results)
+    print(f"Selected profile: {selected} (* = driver did not accept every setting)")
+
+def tune_qr_policy(config):
+    """Measure the QR policies of both payload formats and store the best ones
+    
+    Args:
+        config (AppConfig): Application configuration
+    """
+    decoder = config.scanner_decoder if config.scanner_decoder != 'auto' else None
+    
+    for payload_format in ('token', 'json'):
+        results = measure_qr_policies(
+            payload_format,
+            decoder=decoder,
+            pyramid_scales=config.scanner_pyramid_scales,
+            samples=config.qr_policy_samples
+        )
+        
+        print(f"Payload format: {payload_format}")
+        print(f"{'policy':<8} {'modules':>8} {'read rate':>10} {'mean ms':>8}  worst condition")
+        for name, result in results.items():
+            worst = min(result['conditions'], key=result['conditions'].get)
+            print(f"{name:<8} {result['modules']:>8} {result['read_rate']:>10.2%} "
+                  f"{result['mean_ms']:>8.2f}  {worst} ({result['conditions'][worst]:.0%})")
+        
+        selected = choose_qr_policy(results, config.qr_policy_target_read_rate)
+        store_qr_policy(config.qr_policy_path, payload_format, selected, results)
+        print(f"Selected policy: version {selected.version}, level {selected.error_correction}")
+        print()
+
+def revoke_codes(config, qr_ids):
+    """Revoke codes in the credential store
+    
+    Args:
+        config (AppConfig): Application configuration
+        qr_ids (list): IDs of the codes to revoke
+    """
+    store = CredentialStore(config.credential_db_path)
+    try:
+        for qr_id in qr_ids:
+            if store.revoke(qr_id):
+                print(f"Revoked: {qr_id}")
+            elif store.get(qr_id) is None:
+                print(f"Not in the credential store: {qr_id}")
+            else:
+                print(f"Already revoked: {qr_id}")
+    finally:
+        store.close()
 
 def main():
     """Main function to start the application"""
+    args = parse_args()
+    
+    if args.probe_camera is not None:
+        probe_camera(AppConfig(), args.probe_camera)
+        return
+    
+    if args.tune_qr_policy:
+        tune_qr_policy(AppConfig())
+        return
+    
+    if args.revoke:
+        revoke_codes(AppConfig(), args.revoke)
+        return
+    
     # Create the root window
     root = tk.Tk()
     root.title("SecureLocker")
@@ -18,6 +154,10 @@ def main():
     
     # Create app config
     config = AppConfig()
+    if args.source is not None:
+        config.scanner_source = args.source[0] if len(args.source) == 1 else args.source
+    if args.fast_replay:
+        config.scanner_source_realtime = False
     
     # Initialize the app controller
     app = AppController(root, config)